@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import time as datetime_time
+from pathlib import Path
+
+import streamlit_app as app
+from smtp_standin import start_standin_smtp_server
+
+
+def use_fresh_database(directory: Path, host: str, port: int, contact_count: int, domains: int) -> None:
+    app.DATA_DIR = directory
+    app.DB_PATH = app.DATA_DIR / "mailer.sqlite3"
+    app.init_db()
+    app.save_setting("SEND_QUEUE_MODE", "local")
+    app.save_setting("SMTP_HOST", host)
+    app.save_setting("SMTP_PORT", str(port))
+    app.save_setting("SMTP_SSL", "false")
+    app.save_setting("SMTP_USER", "bench@example.com")
+    app.save_setting("SMTP_PASS", "standin-pass")
+    with sqlite3.connect(app.DB_PATH) as db:
+        db.executemany(
+            "insert into contacts(user_id, email, name, channel, token, created_at) values (?, ?, ?, ?, ?, ?)",
+            [
+                (app.current_user_id(), f"creator{index}@example{index % domains}.com", f"クリエイター{index}", f"チャンネル{index}", secrets.token_urlsafe(24), app.now_iso())
+                for index in range(contact_count)
+            ],
+        )
+
+
+def run_scenario(name: str, server, workers: int, account_rate: int, domain_rate: int, batch_size: int) -> dict:
+    app.save_setting("SMTP_SEND_WORKERS", str(workers))
+    app.save_setting("SMTP_ACCOUNT_RATE_PER_MINUTE", str(account_rate))
+    app.save_setting("SMTP_DOMAIN_RATE_PER_MINUTE", str(domain_rate))
+    app.smtp_rate_limiters()["buckets"].clear()
+    campaign_key = app.campaign_key(name)
+    contacts = app.rows("select * from contacts where user_id = ? order by id", (app.current_user_id(),))
+    ok, message = app.create_send_job(name, campaign_key, "${channel}様へ", "${name}様\n本文です。", contacts, 0, datetime_time(0, 0), datetime_time(23, 59))
+    if not ok:
+        raise SystemExit(message)
+
+    server.state.reset()
+    stop_event = threading.Event()
+    worker = threading.Thread(target=app.run_local_send_worker, args=(stop_event, 0.2, batch_size))
+    started = time.perf_counter()
+    worker.start()
+    while app.rows("select 1 from send_jobs where campaign_key = ? and status != 'done' limit 1", (campaign_key,)):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    stop_event.set()
+    worker.join()
+
+    counts = {
+        row["status"]: int(row["count"])
+        for row in app.rows("select status, count(*) as count from sends where campaign_key = ? group by status", (campaign_key,))
+    }
+    stats = server.state.stats()
+    return {
+        "scenario": name,
+        "seconds": elapsed,
+        "messages_per_second": len(contacts) / elapsed if elapsed else 0.0,
+        "sent": counts.get("sent", 0),
+        "failed": counts.get("failed", 0),
+        "queued": counts.get("queued", 0),
+        "delivered": stats["messages"],
+        "connections": stats["connections"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the local send queue worker end to end: create_send_job() into send_queue, send_worker rounds against the SMTP stand-in, results written to sends.")
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--latency-ms", type=int, default=20, help="delay before each SMTP reply")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--account-rate", type=int, default=60000, help="per-account limit in messages per minute")
+    parser.add_argument("--domain-rate", type=int, default=60000, help="per-recipient-domain limit in messages per minute")
+    parser.add_argument("--domains", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    server = start_standin_smtp_server(latency_ms=args.latency_ms)
+    reports = []
+    with tempfile.TemporaryDirectory() as directory:
+        use_fresh_database(Path(directory), server.host, server.port, args.messages, args.domains)
+        for workers in args.workers:
+            reports.append(run_scenario(f"worker x{workers}", server, workers, args.account_rate, args.domain_rate, args.batch_size))
+    server.shutdown()
+
+    print(
+        f"{args.messages} messages to {args.domains} domains, latency={args.latency_ms}ms per reply, batch={args.batch_size}, "
+        f"account limit={args.account_rate}/min, domain limit={args.domain_rate}/min"
+    )
+    print(f"{'scenario':<14}{'seconds':>9}{'msg/s':>9}{'sent':>7}{'failed':>8}{'queued':>8}{'delivered':>11}{'connections':>13}")
+    for report in reports:
+        print(
+            f"{report['scenario']:<14}{report['seconds']:>9.2f}{report['messages_per_second']:>9.1f}{report['sent']:>7}"
+            f"{report['failed']:>8}{report['queued']:>8}{report['delivered']:>11}{report['connections']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
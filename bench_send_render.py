@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import secrets
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from string import Template
+
+import streamlit_app as app
+
+
+SUBJECT_TEMPLATE = "${channel}様へのご相談"
+BODY_TEMPLATE = "${name}様\n\n${channel}を拝見してご連絡しました。\n詳しくはこちらをご確認ください。\n"
+
+
+def use_fresh_database(directory: Path, contact_count: int, accounts: int) -> list:
+    app.DATA_DIR = directory
+    app.DB_PATH = app.DATA_DIR / "mailer.sqlite3"
+    app.init_db()
+    for index in range(accounts):
+        app.save_smtp_account(None, f"送信元{index}", "UniVerse", f"sender{index}@example.com", "smtp.example.com", "587", False, "pass")
+    with sqlite3.connect(app.DB_PATH) as db:
+        db.executemany(
+            "insert into contacts(user_id, email, name, channel, token, created_at) values (?, ?, ?, ?, ?, ?)",
+            [
+                (app.current_user_id(), f"creator{index}@example.com", f"クリエイター{index}", f"チャンネル{index}", secrets.token_urlsafe(24), app.now_iso())
+                for index in range(contact_count)
+            ],
+        )
+    return app.rows("select * from contacts order by id")
+
+
+def per_recipient(subject_template: str, body_template: str, contact) -> tuple[str, str]:
+    base_url = app.unsubscribe_token_base_url()
+    if base_url:
+        unsubscribe_url = base_url + app.quote(str(contact["token"]))
+    else:
+        unsubscribe_url = app.unsubscribe_mailto(app.unsubscribe_reply_to(app.active_smtp_account()), contact)
+    values = app.template_values(contact, unsubscribe_url)
+    return (
+        Template(subject_template).safe_substitute(values),
+        Template(app.ensure_unsubscribe_link_template(body_template)).safe_substitute(values),
+    )
+
+
+def run_scenario(name: str, contacts: list, render) -> dict:
+    started = time.perf_counter()
+    rendered = render(contacts)
+    elapsed = time.perf_counter() - started
+    return {
+        "scenario": name,
+        "seconds": elapsed,
+        "renders_per_second": len(contacts) / elapsed if elapsed else 0.0,
+        "rendered": rendered,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure how fast campaign messages are rendered per recipient, with and without a compiled send context.")
+    parser.add_argument("--contacts", type=int, default=5000)
+    parser.add_argument("--accounts", type=int, default=3, help="saved SMTP accounts, which the per-recipient path looks up on every render")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    reports = []
+    with tempfile.TemporaryDirectory() as directory:
+        contacts = use_fresh_database(Path(directory), args.contacts, args.accounts)
+        for _ in range(args.repeat):
+            reports.append(
+                run_scenario(
+                    "per recipient",
+                    contacts,
+                    lambda contacts: [per_recipient(SUBJECT_TEMPLATE, BODY_TEMPLATE, contact) for contact in contacts],
+                )
+            )
+            reports.append(
+                run_scenario(
+                    "send context",
+                    contacts,
+                    lambda contacts: [
+                        app.render_send_message(context, contact)
+                        for context in [app.build_send_context(SUBJECT_TEMPLATE, BODY_TEMPLATE)]
+                        for contact in contacts
+                    ],
+                )
+            )
+    if reports[0]["rendered"] != reports[1]["rendered"]:
+        raise SystemExit("rendered messages differ between the two paths")
+
+    print(f"{args.contacts} contacts, {args.accounts} saved SMTP accounts, best of {args.repeat}")
+    print(f"{'scenario':<16}{'seconds':>9}{'renders/s':>12}")
+    for name in ("per recipient", "send context"):
+        best = min((report for report in reports if report["scenario"] == name), key=lambda report: report["seconds"])
+        print(f"{name:<16}{best['seconds']:>9.3f}{best['renders_per_second']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
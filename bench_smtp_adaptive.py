@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import streamlit_app as app
+from bench_smtp_send import bench_messages, use_fresh_database
+from smtp_standin import start_async_standin_smtp_server
+
+
+def clear_throttle_memory() -> None:
+    limiters = app.smtp_rate_limiters()
+    limiters["buckets"].clear()
+    limiters["paused_until"].clear()
+    limiters["adaptive"].clear()
+
+
+def sender(engine: str, concurrency: int, account_rate: int, domain_rate: int, backoff_seconds: float):
+    def run(account: dict, messages: list[dict]) -> list:
+        if engine == "asyncio":
+            return asyncio.run(
+                app.send_messages_async(account, messages, concurrency, account_rate, domain_rate, backoff_seconds=backoff_seconds)
+            )
+        return app.send_messages_rate_limited(account, messages, concurrency, account_rate, domain_rate, backoff_seconds=backoff_seconds)
+
+    return run
+
+
+def run_scenario(name: str, server, messages: list[dict], send) -> dict:
+    account = app.active_smtp_account()
+    user_id = app.current_user_id()
+    scope_keys = app.smtp_throttle_scope_keys(account, messages)
+    clear_throttle_memory()
+    app.load_smtp_throttle_state(user_id, scope_keys)
+    server.state.reset()
+    started = time.perf_counter()
+    results = send(account, messages)
+    elapsed = time.perf_counter() - started
+    app.save_smtp_throttle_state(user_id, scope_keys)
+    stats = server.state.stats()
+    factors = {
+        str(row["scope_key"]).split(":", 1)[0]: float(row["rate_factor"])
+        for row in sorted(app.fetch_smtp_throttle_state(), key=lambda row: -float(row["rate_factor"]))
+    }
+    return {
+        "scenario": name,
+        "seconds": elapsed,
+        "messages_per_second": len(messages) / elapsed if elapsed else 0.0,
+        "delivered": stats["messages"],
+        "throttled": stats["throttled"],
+        "failed": sum(1 for result in results if not result or not result[0]),
+        "account_factor": factors.get("account", 1.0),
+        "domain_factor": factors.get("domain", 1.0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send to a rate-limited local SMTP stand-in twice: a first run starting from the configured rates, then a run starting from the rates adaptive throttling persisted.")
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--latency-ms", type=int, default=5, help="delay before each SMTP reply")
+    parser.add_argument("--domains", type=int, default=5)
+    parser.add_argument("--engine", choices=["threads", "asyncio"], default="asyncio")
+    parser.add_argument("--concurrency", type=int, default=8, help="worker threads or asyncio sessions")
+    parser.add_argument("--account-rate", type=int, default=1200, help="configured per-account limit in messages per minute")
+    parser.add_argument("--domain-rate", type=int, default=600, help="configured per-recipient-domain limit in messages per minute")
+    parser.add_argument("--server-rate-limit", type=float, default=10, help="messages per second the stand-in accepts before replying 451")
+    parser.add_argument("--server-domain-rate-limit", type=float, default=3, help="recipients per domain per second the stand-in accepts before replying 450")
+    parser.add_argument("--backoff-seconds", type=float, default=1.0, help="first backoff after a 421/45x reply (the app default is 30)")
+    parser.add_argument("--runs", type=int, default=2, help="back-to-back runs; each starts from the state the previous one saved")
+    args = parser.parse_args()
+
+    server = start_async_standin_smtp_server(
+        latency_ms=args.latency_ms,
+        rate_limit_per_second=args.server_rate_limit,
+        domain_rate_limit_per_second=args.server_domain_rate_limit,
+    )
+    messages = bench_messages(args.messages, args.domains)
+    send = sender(args.engine, args.concurrency, args.account_rate, args.domain_rate, args.backoff_seconds)
+    reports = []
+    with tempfile.TemporaryDirectory() as directory:
+        use_fresh_database(Path(directory), server.host, server.port)
+        for run in range(1, args.runs + 1):
+            reports.append(run_scenario(f"run {run}", server, messages, send))
+    server.shutdown()
+
+    print(
+        f"{args.messages} messages to {args.domains} domains, engine={args.engine} x{args.concurrency}, "
+        f"configured {args.account_rate}/min per account and {args.domain_rate}/min per domain, "
+        f"server accepts {args.server_rate_limit}/s and {args.server_domain_rate_limit}/s per domain, backoff={args.backoff_seconds}s"
+    )
+    print(f"{'scenario':<10}{'seconds':>9}{'msg/s':>9}{'delivered':>11}{'throttled':>11}{'failed':>8}{'account rate':>14}{'domain rate':>13}")
+    for report in reports:
+        print(
+            f"{report['scenario']:<10}{report['seconds']:>9.2f}{report['messages_per_second']:>9.1f}{report['delivered']:>11}"
+            f"{report['throttled']:>11}{report['failed']:>8}{report['account_factor']:>14.0%}{report['domain_factor']:>13.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import streamlit_app as app
+from bench_smtp_send import bench_messages, use_fresh_database
+from smtp_standin import start_async_standin_smtp_server
+
+
+def bench_outgoing(count: int, domains: int, account: dict) -> list[dict]:
+    return [
+        {**message, "contact": {"id": index + 1}, "account": account}
+        for index, message in enumerate(bench_messages(count, domains))
+    ]
+
+
+def counting_writer(writes: list[int], outgoing: list[dict]):
+    def write(batch: list[tuple[int, bool, str]]) -> None:
+        writes.append(len(batch))
+        app.write_direct_send_results(app.current_user_id(), "bench", app.smtp_usage_date(), outgoing, batch)
+
+    return write
+
+
+def threads(workers: int):
+    def run(account: dict, outgoing: list[dict], writer) -> list:
+        return app.send_messages_rate_limited(
+            account,
+            outgoing,
+            workers,
+            60000,
+            60000,
+            lambda index, ok, result: writer([(index, ok, result)]),
+        )
+
+    return run
+
+
+def pipeline(sessions: int, use_aiosmtplib: bool):
+    def run(account: dict, outgoing: list[dict], writer) -> list:
+        client_module = app.aiosmtplib
+        if not use_aiosmtplib:
+            app.aiosmtplib = None
+        try:
+            return asyncio.run(app.send_messages_async(account, outgoing, sessions, 60000, 60000, result_writer=writer))
+        finally:
+            app.aiosmtplib = client_module
+
+    return run
+
+
+def run_scenario(name: str, server, count: int, domains: int, send) -> dict:
+    server.state.reset()
+    app.smtp_rate_limiters()["buckets"].clear()
+    app.execute("delete from sends where campaign_key = 'bench'")
+    account = app.active_smtp_account()
+    outgoing = bench_outgoing(count, domains, account)
+    writes: list[int] = []
+    started = time.perf_counter()
+    results = send(account, outgoing, counting_writer(writes, outgoing))
+    elapsed = time.perf_counter() - started
+    stats = server.state.stats()
+    return {
+        "scenario": name,
+        "seconds": elapsed,
+        "messages_per_second": count / elapsed if elapsed else 0.0,
+        "delivered": stats["messages"],
+        "connections": stats["connections"],
+        "db_writes": len(writes),
+        "recorded": int(app.rows("select count(*) as count from sends where campaign_key = 'bench'")[0]["count"]),
+        "errors": sum(1 for result in results if not result or not result[0]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the threaded sender with the asyncio pipeline against the local asyncio SMTP stand-in.")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=int, default=20, help="delay before each SMTP reply")
+    parser.add_argument("--domains", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="*", default=[8], help="thread counts for the threaded sender (empty to skip)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16, 64], help="concurrent SMTP sessions for the asyncio pipeline")
+    parser.add_argument("--smtplib-sessions", type=int, nargs="*", default=[16], help="pipeline session counts to rerun with smtplib in worker threads instead of aiosmtplib")
+    args = parser.parse_args()
+
+    server = start_async_standin_smtp_server(latency_ms=args.latency_ms)
+    reports = []
+    with tempfile.TemporaryDirectory() as directory:
+        use_fresh_database(Path(directory), server.host, server.port)
+        for workers in args.workers:
+            reports.append(run_scenario(f"threads x{workers}", server, args.messages, args.domains, threads(workers)))
+        if app.aiosmtplib is not None:
+            for sessions in args.sessions:
+                reports.append(run_scenario(f"asyncio x{sessions}", server, args.messages, args.domains, pipeline(sessions, True)))
+        for sessions in args.smtplib_sessions:
+            reports.append(run_scenario(f"asyncio+smtplib x{sessions}", server, args.messages, args.domains, pipeline(sessions, False)))
+    server.shutdown()
+
+    print(f"{args.messages} messages to {args.domains} domains, latency={args.latency_ms}ms per reply, aiosmtplib={'yes' if app.aiosmtplib else 'not installed'}")
+    print(f"{'scenario':<24}{'seconds':>9}{'msg/s':>9}{'delivered':>11}{'connections':>13}{'db writes':>11}{'recorded':>10}{'errors':>8}")
+    for report in reports:
+        print(
+            f"{report['scenario']:<24}{report['seconds']:>9.2f}{report['messages_per_second']:>9.1f}{report['delivered']:>11}"
+            f"{report['connections']:>13}{report['db_writes']:>11}{report['recorded']:>10}{report['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from email.message import EmailMessage
+from pathlib import Path
+
+import streamlit_app as app
+from smtp_standin import start_standin_smtp_server
+
+
+def use_fresh_database(directory: Path, host: str, port: int) -> None:
+    app.DATA_DIR = directory
+    app.DB_PATH = app.DATA_DIR / "mailer.sqlite3"
+    app.init_db()
+    app.save_setting("SMTP_HOST", host)
+    app.save_setting("SMTP_PORT", str(port))
+    app.save_setting("SMTP_SSL", "false")
+    app.save_setting("SMTP_USER", "bench@example.com")
+    app.save_setting("SMTP_PASS", "standin-pass")
+
+
+def connect_per_message(to_email: str, subject: str, body: str, account: dict) -> tuple[bool, str]:
+    message = EmailMessage()
+    message["From"] = app.smtp_mail_from(account)
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.set_content(body)
+    try:
+        with app.open_smtp_connection(account) as smtp:
+            smtp.send_message(message)
+        return True, "送信しました"
+    except Exception as exc:
+        return False, str(exc)
+
+
+def sequential(send):
+    def run(messages: list[dict], account: dict) -> list[tuple[bool, str]]:
+        return [send(message["to_email"], message["subject"], message["body"], account) for message in messages]
+
+    return run
+
+
+def parallel(workers: int, account_rate: int, domain_rate: int, backoff_seconds: float):
+    def run(messages: list[dict], account: dict) -> list[tuple[bool, str]]:
+        app.smtp_rate_limiters()["buckets"].clear()
+        app.smtp_rate_limiters()["paused_until"].clear()
+        return app.send_messages_rate_limited(account, messages, workers, account_rate, domain_rate, backoff_seconds=backoff_seconds)
+
+    return run
+
+
+def bench_messages(count: int, domains: int) -> list[dict]:
+    return [
+        {
+            "to_email": f"creator{index}@example{index % domains}.com",
+            "subject": f"ご相談 {index}",
+            "body": f"こんにちは、creator{index}さん。\n本文です。",
+        }
+        for index in range(count)
+    ]
+
+
+def run_scenario(name: str, server, messages: list[dict], send) -> dict:
+    server.state.reset()
+    account = app.active_smtp_account()
+    started = time.perf_counter()
+    results = send(messages, account)
+    elapsed = time.perf_counter() - started
+    stats = server.state.stats()
+    return {
+        "scenario": name,
+        "seconds": elapsed,
+        "messages_per_second": len(messages) / elapsed if elapsed else 0.0,
+        "delivered": stats["messages"],
+        "connections": stats["connections"],
+        "logins": stats["logins"],
+        "throttled": stats["throttled"],
+        "errors": sum(1 for ok, _ in results if not ok),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure SMTP send throughput (per-message connections, session reuse, rate-limited workers) against the local SMTP stand-in.")
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--latency-ms", type=int, default=20, help="delay before each SMTP reply, roughly one network round trip")
+    parser.add_argument("--max-messages-per-connection", type=int, default=0, help="make the stand-in reply 421 and close after this many messages")
+    parser.add_argument("--server-rate-limit", type=float, default=0, help="messages per second the stand-in accepts before replying 451 (0 for no limit)")
+    parser.add_argument("--workers", type=int, nargs="*", default=[2, 4, 8], help="worker counts for the rate-limited sender (empty to skip)")
+    parser.add_argument("--account-rate", type=int, default=60000, help="per-account limit in messages per minute for the rate-limited sender")
+    parser.add_argument("--domain-rate", type=int, default=60000, help="per-recipient-domain limit in messages per minute")
+    parser.add_argument("--domains", type=int, default=10, help="number of recipient domains to spread messages over")
+    parser.add_argument("--backoff-seconds", type=float, default=1.0, help="first backoff after a 421/45x reply (the app default is 30)")
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    server = start_standin_smtp_server(
+        latency_ms=args.latency_ms,
+        max_messages_per_connection=args.max_messages_per_connection,
+        rate_limit_per_second=args.server_rate_limit,
+    )
+    messages = bench_messages(args.messages, args.domains)
+    reports = []
+    with tempfile.TemporaryDirectory() as directory:
+        use_fresh_database(Path(directory), server.host, server.port)
+        if not args.skip_sequential:
+            reports.append(run_scenario("connect per message", server, messages, sequential(connect_per_message)))
+            reports.append(run_scenario("session reuse", server, messages, sequential(app.send_email)))
+        for workers in args.workers:
+            send = parallel(workers, args.account_rate, args.domain_rate, args.backoff_seconds)
+            reports.append(run_scenario(f"rate limited x{workers}", server, messages, send))
+    server.shutdown()
+
+    print(
+        f"{args.messages} messages to {args.domains} domains, latency={args.latency_ms}ms per reply, "
+        f"account limit={args.account_rate}/min, domain limit={args.domain_rate}/min, server limit={args.server_rate_limit or '-'}/s"
+    )
+    print(f"{'scenario':<22}{'seconds':>9}{'msg/s':>9}{'delivered':>11}{'connections':>13}{'logins':>8}{'throttled':>11}{'errors':>8}")
+    for report in reports:
+        print(
+            f"{report['scenario']:<22}{report['seconds']:>9.2f}{report['messages_per_second']:>9.1f}"
+            f"{report['delivered']:>11}{report['connections']:>13}{report['logins']:>8}{report['throttled']:>11}{report['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
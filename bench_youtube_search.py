@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import streamlit_app as app
+from youtube_api_standin import start_standin_server
+
+
+BENCH_KEYWORDS = [
+    "料理", "レシピ", "ゲーム 実況", "英会話", "旅行 vlog", "猫", "犬", "筋トレ", "メイク", "ファッション",
+    "キャンプ", "釣り", "アニメ", "音楽", "ピアノ", "ギター", "科学", "教育", "cooking", "travel",
+]
+
+
+def use_fresh_database(directory: Path, name: str) -> None:
+    app.DATA_DIR = directory / name
+    app.DB_PATH = app.DATA_DIR / "mailer.sqlite3"
+    app.init_db()
+    app.save_setting("YOUTUBE_API_KEY", "standin-key")
+
+
+def run_scenario(name: str, server, queries: list[dict[str, str]], max_results: int, workers: int, search) -> dict:
+    server.state.reset()
+    started = time.perf_counter()
+    results = search(queries, max_results, workers)
+    elapsed = time.perf_counter() - started
+    found = sum(result["found"] for result in results)
+    return {
+        "scenario": name,
+        "queries": len(queries),
+        "seconds": elapsed,
+        "channels_per_second": found / elapsed if elapsed else 0.0,
+        "found": found,
+        "saved": sum(result["saved"] for result in results),
+        "app_units": sum(result["units_used"] for result in results),
+        "api_units": server.state.stats()["units"],
+        "errors": sum(1 for result in results if result["error"]),
+    }
+
+
+def sequential_search(queries: list[dict[str, str]], max_results: int, workers: int) -> list[dict]:
+    results = []
+    for query in queries:
+        found, saved, units_used = app.search_youtube_channels(
+            query["keyword"],
+            0,
+            0,
+            max_results,
+            query["search_mode"],
+            query["category_id"],
+            query["label"],
+        )
+        results.append({"found": found, "saved": saved, "units_used": units_used, "error": ""})
+    return results
+
+
+def batch_search(queries: list[dict[str, str]], max_results: int, workers: int) -> list[dict]:
+    return app.search_youtube_channels_batch(queries, 0, 0, max_results, workers)
+
+
+def sweep_search(queries: list[dict[str, str]], max_results: int, workers: int) -> list[dict]:
+    sweep = app.sweep_youtube_most_popular(queries, 0, 0, max_results, workers)
+    return sweep["results"] + [{"found": 0, "saved": 0, "units_used": sweep["channel_units"], "error": ""}]
+
+
+def crawl_search(budget_units: int, max_depth: int, workers: int):
+    def search(queries: list[dict[str, str]], max_results: int, _workers: int) -> list[dict]:
+        summary = app.crawl_youtube_related_channels(0, 0, budget_units, max_depth, workers)
+        return [{"found": summary["checked"], "saved": summary["saved"], "units_used": summary["units_used"], "error": summary["error"]}]
+
+    return search
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure search_youtube_channels() throughput and quota use against the local YouTube API stand-in.")
+    parser.add_argument("--keywords", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=0, help="number of categories to add to the sweep")
+    parser.add_argument("--max-results", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--sweep-regions", nargs="*", default=["日本", "アメリカ"], help="regions for the mostPopular sweep over every category (empty to skip)")
+    parser.add_argument("--crawl-units", type=int, default=200, help="budget for the related-channel crawl seeded from the candidates saved above (0 to skip)")
+    parser.add_argument("--crawl-depth", type=int, default=2)
+    parser.add_argument("--channels", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=int, default=120)
+    parser.add_argument("--jitter-ms", type=int, default=40)
+    args = parser.parse_args()
+
+    server = start_standin_server(
+        channel_count=args.channels,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+    )
+    os.environ["YOUTUBE_API_BASE_URL"] = server.base_url
+    keywords = [BENCH_KEYWORDS[index % len(BENCH_KEYWORDS)] + ("" if index < len(BENCH_KEYWORDS) else f" {index}") for index in range(args.keywords)]
+    queries = [app.youtube_search_query("キーワード", keyword) for keyword in keywords] + [
+        app.youtube_search_query("カテゴリー", "", category_id, f"カテゴリー: {name}")
+        for name, category_id in list(app.YOUTUBE_VIDEO_CATEGORIES.items())[: args.categories]
+    ]
+
+    reports = []
+    with tempfile.TemporaryDirectory() as directory:
+        use_fresh_database(Path(directory), "sequential")
+        estimated_units = sum(app.estimate_youtube_units(args.max_results, query["search_mode"]) for query in queries)
+        reports.append(run_scenario("sequential", server, queries, args.max_results, 1, sequential_search))
+        for workers in args.workers:
+            use_fresh_database(Path(directory), f"batch-{workers}")
+            reports.append(run_scenario(f"batch x{workers}", server, queries, args.max_results, workers, batch_search))
+        reports.append(run_scenario(f"batch x{args.workers[-1]} cached", server, queries, args.max_results, args.workers[-1], batch_search))
+        if args.sweep_regions:
+            sweep_queries = app.youtube_most_popular_queries(list(app.YOUTUBE_VIDEO_CATEGORIES), args.sweep_regions)
+            use_fresh_database(Path(directory), "category-batch")
+            reports.append(run_scenario(f"categories batch x{args.workers[-1]}", server, sweep_queries, 50, args.workers[-1], batch_search))
+            use_fresh_database(Path(directory), "sweep")
+            reports.append(run_scenario(f"sweep x{args.workers[-1]}", server, sweep_queries, 50, args.workers[-1], sweep_search))
+        if args.crawl_units:
+            crawl = crawl_search(args.crawl_units, args.crawl_depth, args.workers[-1])
+            reports.append(run_scenario(f"crawl {args.crawl_units} units", server, queries, args.max_results, args.workers[-1], crawl))
+    server.shutdown()
+
+    print(f"{len(queries)} queries, max_results={args.max_results}, latency={args.latency_ms}±{args.jitter_ms}ms, estimated units={estimated_units}")
+    print(f"{'scenario':<22}{'seconds':>9}{'ch/s':>9}{'found':>8}{'saved':>8}{'app units':>11}{'api units':>11}{'saved/unit':>12}{'errors':>8}")
+    for report in reports:
+        print(
+            f"{report['scenario']:<22}{report['seconds']:>9.2f}{report['channels_per_second']:>9.1f}"
+            f"{report['found']:>8}{report['saved']:>8}{report['app_units']:>11}{report['api_units']:>11}"
+            f"{report['saved'] / report['api_units'] if report['api_units'] else 0.0:>12.2f}{report['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+import signal
+import threading
+from pathlib import Path
+
+import streamlit_app as app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send queued campaign messages from the app's local send_queue table until stopped.")
+    parser.add_argument("--data-dir", type=Path, default=app.DATA_DIR, help="directory holding mailer.sqlite3")
+    parser.add_argument("--poll-seconds", type=float, default=5.0, help="longest wait between queue checks when nothing is due")
+    parser.add_argument("--batch-size", type=int, default=50, help="messages claimed per round")
+    parser.add_argument("--once", action="store_true", help="send whatever is due now and exit")
+    args = parser.parse_args()
+
+    app.DATA_DIR = args.data_dir
+    app.DB_PATH = app.DATA_DIR / "mailer.sqlite3"
+    app.init_db()
+
+    if args.once:
+        app.release_stale_local_send_queue()
+        sent = 0
+        while processed := app.process_local_send_queue(args.batch_size):
+            sent += processed
+        print(f"{sent} queued messages processed")
+        return
+
+    stop_event = threading.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: stop_event.set())
+    print(f"Send worker started: {app.DB_PATH}")
+    app.run_local_send_worker(stop_event, args.poll_seconds, args.batch_size)
+    print("Send worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import socketserver
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+
+def build_tls_context(directory: Path) -> ssl.SSLContext:
+    cert_path = directory / "standin.pem"
+    key_path = directory / "standin.key"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=localhost", "-keyout", str(key_path), "-out", str(cert_path),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+class SmtpStandinState:
+    def __init__(
+        self,
+        latency_ms: int = 0,
+        max_messages_per_connection: int = 0,
+        rate_limit_per_second: float = 0,
+        domain_rate_limit_per_second: float = 0,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.max_messages_per_connection = max_messages_per_connection
+        self.rate_limit_per_second = rate_limit_per_second
+        self.domain_rate_limit_per_second = domain_rate_limit_per_second
+        self.connections = 0
+        self.logins = 0
+        self.messages = 0
+        self.throttled = 0
+        self.recipients: list[str] = []
+        self.accepted_at: deque[float] = deque()
+        self.domain_accepted_at: dict[str, deque[float]] = {}
+        self.lock = threading.Lock()
+
+    def accept_transaction(self) -> bool:
+        if not self.rate_limit_per_second:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            while self.accepted_at and self.accepted_at[0] <= now - 1:
+                self.accepted_at.popleft()
+            if len(self.accepted_at) >= self.rate_limit_per_second:
+                self.throttled += 1
+                return False
+            self.accepted_at.append(now)
+            return True
+
+    def accept_recipient(self, recipient: str) -> bool:
+        if not self.domain_rate_limit_per_second:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            accepted_at = self.domain_accepted_at.setdefault(recipient.rsplit("@", 1)[-1].lower(), deque())
+            while accepted_at and accepted_at[0] <= now - 1:
+                accepted_at.popleft()
+            if len(accepted_at) >= self.domain_rate_limit_per_second:
+                self.throttled += 1
+                return False
+            accepted_at.append(now)
+            return True
+
+    def count(self, field: str, recipient: str = "") -> None:
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+            if recipient:
+                self.recipients.append(recipient)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"connections": self.connections, "logins": self.logins, "messages": self.messages, "throttled": self.throttled}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.connections = 0
+            self.logins = 0
+            self.messages = 0
+            self.throttled = 0
+            self.recipients = []
+            self.accepted_at.clear()
+            self.domain_accepted_at.clear()
+
+
+class SmtpStandinHandler(socketserver.StreamRequestHandler):
+    server: "SmtpStandinServer"
+    disable_nagle_algorithm = True
+
+    def reply(self, line: str) -> None:
+        if self.server.state.latency_ms:
+            time.sleep(self.server.state.latency_ms / 1000)
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+        self.wfile.flush()
+
+    def read_line(self) -> str:
+        return self.rfile.readline(65536).decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def start_tls(self) -> None:
+        self.connection = self.server.tls_context.wrap_socket(self.connection, server_side=True)
+        self.rfile = self.connection.makefile("rb")
+        self.wfile = self.connection.makefile("wb")
+
+    def handle(self) -> None:
+        state = self.server.state
+        state.count("connections")
+        tls = authenticated = False
+        sent = 0
+        recipients: list[str] = []
+        self.reply("220 standin ESMTP ready")
+        while True:
+            line = self.read_line()
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                extensions = ["standin", "8BITMIME", "SMTPUTF8", "AUTH PLAIN LOGIN"] + ([] if tls else ["STARTTLS"])
+                for extension in extensions[:-1]:
+                    self.wfile.write(f"250-{extension}\r\n".encode("ascii"))
+                self.reply(f"250 {extensions[-1]}")
+            elif verb == "STARTTLS" and not tls:
+                self.reply("220 2.0.0 Ready to start TLS")
+                self.start_tls()
+                tls = True
+            elif verb == "AUTH":
+                parts = line.split()
+                credentials = parts[2] if len(parts) > 2 else ""
+                if len(parts) >= 2 and parts[1].upper() == "LOGIN":
+                    self.reply("334 " + base64.b64encode(b"Username:").decode("ascii"))
+                    self.read_line()
+                    self.reply("334 " + base64.b64encode(b"Password:").decode("ascii"))
+                    credentials = self.read_line()
+                elif len(parts) == 2:
+                    self.reply("334 ")
+                    credentials = self.read_line()
+                if b"reject" in base64.b64decode(credentials + "==", validate=False):
+                    self.reply("535 5.7.8 Authentication credentials invalid")
+                    continue
+                authenticated = True
+                state.count("logins")
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                if not authenticated:
+                    self.reply("530 5.7.0 Authentication required")
+                elif state.max_messages_per_connection and sent >= state.max_messages_per_connection:
+                    self.reply("421 4.7.0 Too many messages on this connection, closing")
+                    return
+                elif not state.accept_transaction():
+                    self.reply("451 4.7.1 Rate limit exceeded, try again later")
+                else:
+                    recipients = []
+                    self.reply("250 2.1.0 Ok")
+            elif verb == "RCPT":
+                recipient = line.split(":", 1)[-1].strip().strip("<>")
+                if "reject" in recipient:
+                    self.reply("550 5.1.1 Recipient address rejected: User unknown")
+                elif not state.accept_recipient(recipient):
+                    self.reply("450 4.2.1 Too many messages to this domain, try again later")
+                else:
+                    recipients.append(recipient)
+                    self.reply("250 2.1.5 Ok")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.read_line() != ".":
+                    pass
+                sent += 1
+                for recipient in recipients:
+                    state.count("messages", recipient)
+                self.reply("250 2.0.0 Ok: queued")
+            elif verb in ("RSET", "NOOP"):
+                recipients = []
+                self.reply("250 2.0.0 Ok")
+            elif verb == "QUIT":
+                self.reply("221 2.0.0 Bye")
+                return
+            else:
+                self.reply("502 5.5.2 Command not recognized")
+
+
+class SmtpStandinServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], state: SmtpStandinState, tls_context: ssl.SSLContext) -> None:
+        super().__init__(address, SmtpStandinHandler)
+        self.state = state
+        self.tls_context = tls_context
+
+    @property
+    def host(self) -> str:
+        return self.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+def start_standin_smtp_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency_ms: int = 0,
+    max_messages_per_connection: int = 0,
+    rate_limit_per_second: float = 0,
+    domain_rate_limit_per_second: float = 0,
+) -> SmtpStandinServer:
+    tls_context = build_tls_context(Path(tempfile.mkdtemp()))
+    state = SmtpStandinState(latency_ms, max_messages_per_connection, rate_limit_per_second, domain_rate_limit_per_second)
+    server = SmtpStandinServer((host, port), state, tls_context)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def handle_async_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, state: SmtpStandinState, tls_context: ssl.SSLContext) -> None:
+    async def reply(line: str) -> None:
+        if state.latency_ms:
+            await asyncio.sleep(state.latency_ms / 1000)
+        writer.write(line.encode("ascii") + b"\r\n")
+        await writer.drain()
+
+    async def read_line() -> str:
+        return (await reader.readline()).decode("utf-8", errors="replace").rstrip("\r\n")
+
+    state.count("connections")
+    tls = authenticated = False
+    sent = 0
+    recipients: list[str] = []
+    try:
+        await reply("220 standin ESMTP ready")
+        while True:
+            line = await read_line()
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                extensions = ["standin", "8BITMIME", "SMTPUTF8", "AUTH PLAIN LOGIN"] + ([] if tls else ["STARTTLS"])
+                for extension in extensions[:-1]:
+                    writer.write(f"250-{extension}\r\n".encode("ascii"))
+                await reply(f"250 {extensions[-1]}")
+            elif verb == "STARTTLS" and not tls:
+                await reply("220 2.0.0 Ready to start TLS")
+                await writer.start_tls(tls_context)
+                tls = True
+            elif verb == "AUTH":
+                parts = line.split()
+                credentials = parts[2] if len(parts) > 2 else ""
+                if len(parts) >= 2 and parts[1].upper() == "LOGIN":
+                    await reply("334 " + base64.b64encode(b"Username:").decode("ascii"))
+                    await read_line()
+                    await reply("334 " + base64.b64encode(b"Password:").decode("ascii"))
+                    credentials = await read_line()
+                elif len(parts) == 2:
+                    await reply("334 ")
+                    credentials = await read_line()
+                if b"reject" in base64.b64decode(credentials + "==", validate=False):
+                    await reply("535 5.7.8 Authentication credentials invalid")
+                    continue
+                authenticated = True
+                state.count("logins")
+                await reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                if not authenticated:
+                    await reply("530 5.7.0 Authentication required")
+                elif state.max_messages_per_connection and sent >= state.max_messages_per_connection:
+                    await reply("421 4.7.0 Too many messages on this connection, closing")
+                    return
+                elif not state.accept_transaction():
+                    await reply("451 4.7.1 Rate limit exceeded, try again later")
+                else:
+                    recipients = []
+                    await reply("250 2.1.0 Ok")
+            elif verb == "RCPT":
+                recipient = line.split(":", 1)[-1].strip().strip("<>")
+                if "reject" in recipient:
+                    await reply("550 5.1.1 Recipient address rejected: User unknown")
+                elif not state.accept_recipient(recipient):
+                    await reply("450 4.2.1 Too many messages to this domain, try again later")
+                else:
+                    recipients.append(recipient)
+                    await reply("250 2.1.5 Ok")
+            elif verb == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while await read_line() != ".":
+                    pass
+                sent += 1
+                for recipient in recipients:
+                    state.count("messages", recipient)
+                await reply("250 2.0.0 Ok: queued")
+            elif verb in ("RSET", "NOOP"):
+                recipients = []
+                await reply("250 2.0.0 Ok")
+            elif verb == "QUIT":
+                await reply("221 2.0.0 Bye")
+                return
+            else:
+                await reply("502 5.5.2 Command not recognized")
+    except (ConnectionError, ssl.SSLError):
+        return
+    finally:
+        writer.close()
+
+
+class AsyncSmtpStandinServer:
+    def __init__(self, state: SmtpStandinState, tls_context: ssl.SSLContext) -> None:
+        self.state = state
+        self.tls_context = tls_context
+        self.loop = asyncio.new_event_loop()
+        self.server: asyncio.base_events.Server | None = None
+        self.sessions: dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    @property
+    def host(self) -> str:
+        return self.server.sockets[0].getsockname()[0]
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.sessions[writer] = asyncio.current_task()
+        try:
+            await handle_async_session(reader, writer, self.state, self.tls_context)
+        finally:
+            self.sessions.pop(writer, None)
+
+    async def start(self, host: str, port: int) -> None:
+        self.server = await asyncio.start_server(self.serve, host, port)
+
+    async def stop(self) -> None:
+        self.server.close()
+        sessions = list(self.sessions.values())
+        for writer in list(self.sessions):
+            writer.transport.abort()
+        await asyncio.gather(*sessions, return_exceptions=True)
+
+    def shutdown(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def start_async_standin_smtp_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency_ms: int = 0,
+    max_messages_per_connection: int = 0,
+    rate_limit_per_second: float = 0,
+    domain_rate_limit_per_second: float = 0,
+) -> AsyncSmtpStandinServer:
+    tls_context = build_tls_context(Path(tempfile.mkdtemp()))
+    server = AsyncSmtpStandinServer(
+        SmtpStandinState(latency_ms, max_messages_per_connection, rate_limit_per_second, domain_rate_limit_per_second),
+        tls_context,
+    )
+    server.loop.run_until_complete(server.start(host, port))
+    threading.Thread(target=server.loop.run_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local SMTP sink with STARTTLS and AUTH that accepts and counts messages without delivering them.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency-ms", type=int, default=20, help="delay added before each SMTP reply")
+    parser.add_argument("--max-messages-per-connection", type=int, default=0, help="reply 421 and close after this many messages (0 for no limit)")
+    parser.add_argument("--rate-limit", type=float, default=0, help="messages accepted per second before replying 451 (0 for no limit)")
+    parser.add_argument("--domain-rate-limit", type=float, default=0, help="recipients per domain accepted per second before replying 450 (0 for no limit)")
+    parser.add_argument("--asyncio", action="store_true", help="serve every connection from one asyncio loop instead of a thread per connection")
+    args = parser.parse_args()
+
+    if args.asyncio:
+        state = SmtpStandinState(args.latency_ms, args.max_messages_per_connection, args.rate_limit, args.domain_rate_limit)
+        with tempfile.TemporaryDirectory() as directory:
+            server = AsyncSmtpStandinServer(state, build_tls_context(Path(directory)))
+            server.loop.run_until_complete(server.start(args.host, args.port))
+            print(f"SMTP stand-in (asyncio): {server.host}:{server.port} (STARTTLS, any login is accepted)")
+            try:
+                server.loop.run_forever()
+            except KeyboardInterrupt:
+                pass
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        state = SmtpStandinState(args.latency_ms, args.max_messages_per_connection, args.rate_limit, args.domain_rate_limit)
+        server = SmtpStandinServer((args.host, args.port), state, build_tls_context(Path(directory)))
+        print(f"SMTP stand-in: {server.host}:{server.port} (STARTTLS, any login is accepted)")
+        print("Recipients containing 'reject' get 550, passwords containing 'reject' get 535. Set SMTP_HOST/SMTP_PORT with SSL off to point the app at it.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
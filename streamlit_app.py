@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import queue
 import re
 import secrets
 import smtplib
 import sqlite3
+import threading
 import time
 import json
 import hashlib
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import partial
 from io import BytesIO
+from itertools import chain, islice
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -16,10 +22,13 @@ from datetime import datetime, time as datetime_time, timedelta, timezone
 from email.message import EmailMessage
 from pathlib import Path
 from string import Template
+from types import MappingProxyType
 from urllib.parse import quote
 from zoneinfo import ZoneInfo
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import streamlit as st
 import streamlit.components.v1 as components
 
@@ -33,14 +42,21 @@ try:
 except Exception:
     st_autorefresh = None
 
+try:
+    import aiosmtplib
+except Exception:
+    aiosmtplib = None
+
 
 ROOT = Path(__file__).resolve().parent
 DATA_DIR = ROOT / "data"
 DB_PATH = DATA_DIR / "mailer.sqlite3"
 APP_TIMEZONE = ZoneInfo("Asia/Tokyo")
+YOUTUBE_QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
 CONTACT_STATUS_OPTIONS = ["未確認", "メール確認済み", "送信対象", "返信あり", "見込みあり", "除外"]
 SENDABLE_CONTACT_STATUSES = {"未確認", "メール確認済み", "送信対象"}
 
+DEFAULT_YOUTUBE_API_BASE_URL = "https://www.googleapis.com/youtube/v3/"
 YOUTUBE_VIDEO_CATEGORIES = {
     "エンターテイメント": "24",
     "ゲーム": "20",
@@ -58,6 +74,18 @@ YOUTUBE_VIDEO_CATEGORIES = {
     "非営利団体と社会活動": "29",
     "旅行とイベント": "19",
 }
+YOUTUBE_REGIONS = {
+    "日本": "JP",
+    "アメリカ": "US",
+    "イギリス": "GB",
+    "韓国": "KR",
+    "台湾": "TW",
+    "インド": "IN",
+    "ブラジル": "BR",
+    "ドイツ": "DE",
+    "フランス": "FR",
+    "インドネシア": "ID",
+}
 
 DEFAULT_CAMPAIGN_NAME = "初回案内"
 DEFAULT_CAMPAIGN_SUBJECT = "${channel}へのご連絡"
@@ -154,8 +182,13 @@ def format_jst_datetime(value: str) -> str:
         return value
 
 
-def today_key() -> str:
-    return datetime.now(APP_TIMEZONE).strftime("%Y-%m-%d")
+def youtube_quota_day_key() -> str:
+    return datetime.now(YOUTUBE_QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+
+def next_youtube_quota_reset(moment: datetime | None = None) -> datetime:
+    local_moment = (moment or datetime.now(timezone.utc)).astimezone(YOUTUBE_QUOTA_TIMEZONE)
+    return datetime.combine(local_moment.date() + timedelta(days=1), datetime_time(0, 0), YOUTUBE_QUOTA_TIMEZONE)
 
 
 def campaign_key(campaign_name: str) -> str:
@@ -572,6 +605,35 @@ def get_secret(name: str, default: str = "") -> str:
         return os.getenv(name, default)
 
 
+def normalize_blocked_targets(db: sqlite3.Connection, user_id: str | None = None) -> None:
+    scope = "" if user_id is None else "user_id = ? and "
+    params = () if user_id is None else (user_id,)
+    for column, key in [("email", "lower(trim(email))"), ("youtube_channel_id", "trim(youtube_channel_id)")]:
+        db.execute(
+            f"""
+            update blocked_targets set {column} = ''
+            where id in (
+                select id from (
+                    select id, row_number() over (partition by user_id, {key} order by id) as position
+                    from blocked_targets
+                    where {scope}{key} != ''
+                )
+                where position > 1
+            )
+            """,
+            params,
+        )
+    db.execute(
+        f"""
+        update blocked_targets
+        set email = lower(trim(email)), youtube_channel_id = trim(youtube_channel_id)
+        where {scope}(email != lower(trim(email)) or youtube_channel_id != trim(youtube_channel_id))
+        """,
+        params,
+    )
+    db.execute(f"delete from blocked_targets where {scope}email = '' and youtube_channel_id = ''", params)
+
+
 def init_db() -> None:
     DATA_DIR.mkdir(exist_ok=True)
     with sqlite3.connect(DB_PATH) as db:
@@ -595,6 +657,7 @@ def init_db() -> None:
                 unsubscribed integer not null default 0,
                 contact_status text not null default '送信対象',
                 replied_at text not null default '',
+                youtube_stats_updated_at text not null default '',
                 token text not null unique,
                 created_at text not null
             );
@@ -628,10 +691,70 @@ def init_db() -> None:
                 smtp_port text not null default '587',
                 smtp_ssl integer not null default 0,
                 smtp_pass text not null default '',
+                weight integer not null default 1,
+                daily_cap integer not null default 0,
                 created_at text not null,
                 updated_at text not null
             );
 
+            create table if not exists smtp_account_usage (
+                user_id text not null default 'local-user',
+                account_id integer not null,
+                usage_date text not null,
+                sent_count integer not null default 0,
+                exhausted integer not null default 0,
+                last_used_at text not null default '',
+                primary key (user_id, account_id, usage_date)
+            );
+
+            create table if not exists smtp_throttle_state (
+                user_id text not null default 'local-user',
+                scope_key text not null,
+                rate_factor real not null default 1,
+                strikes integer not null default 0,
+                paused_until text not null default '',
+                auth_error text not null default '',
+                auth_paused_until text not null default '',
+                updated_at text not null default '',
+                primary key (user_id, scope_key)
+            );
+
+            create table if not exists send_jobs (
+                id integer primary key autoincrement,
+                user_id text not null default 'local-user',
+                campaign_key text not null default '',
+                campaign_name text not null default '',
+                smtp_account_id integer not null default 0,
+                window_start text not null default '00:00',
+                window_end text not null default '23:59',
+                delay_seconds integer not null default 0,
+                total_count integer not null default 0,
+                status text not null default 'queued',
+                created_at text not null,
+                finished_at text not null default ''
+            );
+
+            create table if not exists send_queue (
+                id integer primary key autoincrement,
+                user_id text not null default 'local-user',
+                job_id integer not null,
+                send_id integer not null default 0,
+                contact_id integer not null default 0,
+                smtp_account_id integer not null default 0,
+                to_email text not null default '',
+                subject text not null default '',
+                body text not null default '',
+                status text not null default 'pending',
+                error text not null default '',
+                attempts integer not null default 0,
+                scheduled_at text not null,
+                locked_at text not null default '',
+                sent_at text not null default ''
+            );
+
+            create index if not exists idx_send_queue_due
+                on send_queue(status, scheduled_at);
+
             create table if not exists youtube_candidates (
                 id integer primary key autoincrement,
                 user_id text not null default 'local-user',
@@ -644,6 +767,7 @@ def init_db() -> None:
                 view_count integer not null default 0,
                 description text not null default '',
                 keyword text not null default '',
+                stats_updated_at text not null default '',
                 created_at text not null
             );
 
@@ -654,6 +778,103 @@ def init_db() -> None:
                 primary key (user_id, usage_date)
             );
 
+            create table if not exists youtube_search_cache (
+                user_id text not null default 'local-user',
+                cache_key text not null,
+                page_index integer not null,
+                channel_ids text not null default '[]',
+                channels text not null default '[]',
+                next_page_token text not null default '',
+                created_at text not null,
+                last_used_at text not null,
+                primary key (user_id, cache_key, page_index)
+            );
+
+            create table if not exists youtube_search_jobs (
+                id integer primary key autoincrement,
+                user_id text not null default 'local-user',
+                search_mode text not null default 'キーワード',
+                keyword text not null default '',
+                category_id text not null default '',
+                region_code text not null default 'JP',
+                label text not null default '',
+                min_subs integer not null default 0,
+                max_subs integer not null default 0,
+                max_results integer not null default 50,
+                status text not null default 'queued',
+                next_page_index integer not null default 0,
+                next_page_token text not null default '',
+                found integer not null default 0,
+                saved integer not null default 0,
+                units_used integer not null default 0,
+                error text not null default '',
+                not_before text not null default '',
+                created_at text not null,
+                updated_at text not null
+            );
+
+            create table if not exists youtube_api_calls (
+                id integer primary key autoincrement,
+                user_id text not null default 'local-user',
+                usage_date text not null,
+                endpoint text not null default '',
+                units integer not null default 0,
+                search_mode text not null default '',
+                keyword text not null default '',
+                called_at text not null
+            );
+
+            create index if not exists idx_youtube_api_calls_user_date
+                on youtube_api_calls(user_id, usage_date);
+
+            create table if not exists youtube_crawl_frontier (
+                id integer primary key autoincrement,
+                user_id text not null default 'local-user',
+                channel_id text not null,
+                source_channel_id text not null default '',
+                depth integer not null default 0,
+                status text not null default 'new',
+                created_at text not null,
+                updated_at text not null,
+                unique(user_id, channel_id)
+            );
+
+            create index if not exists idx_youtube_crawl_frontier_status
+                on youtube_crawl_frontier(user_id, status, depth, id);
+
+            create table if not exists contact_import_checkpoints (
+                user_id text not null default 'local-user',
+                file_key text not null,
+                file_name text not null default '',
+                rows_done integer not null default 0,
+                added integer not null default 0,
+                skipped integer not null default 0,
+                mapping text not null default '{}',
+                staged integer not null default 0,
+                committed_rows integer not null default 0,
+                status text not null default 'staging',
+                auto_commit integer not null default 0,
+                progress real not null default 0,
+                error text not null default '',
+                file_path text not null default '',
+                notified integer not null default 1,
+                updated_at text not null,
+                primary key (user_id, file_key)
+            );
+
+            create table if not exists contact_import_rows (
+                user_id text not null default 'local-user',
+                file_key text not null,
+                row_number integer not null,
+                email text not null default '',
+                name text not null default '',
+                channel text not null default '',
+                valid integer not null default 0,
+                first_seen integer not null default 0,
+                token text not null,
+                primary key (user_id, file_key, row_number)
+            );
+
             create table if not exists blocked_targets (
                 id integer primary key autoincrement,
                 user_id text not null default 'local-user',
@@ -714,20 +935,68 @@ def init_db() -> None:
             "youtube_description": "alter table contacts add column youtube_description text not null default ''",
             "contact_status": "alter table contacts add column contact_status text not null default '送信対象'",
             "replied_at": "alter table contacts add column replied_at text not null default ''",
+            "youtube_stats_updated_at": "alter table contacts add column youtube_stats_updated_at text not null default ''",
         }
         for column, statement in migrations.items():
             if column not in columns:
                 db.execute(statement)
-        for table in ["sends", "settings", "youtube_candidates", "youtube_api_usage", "blocked_targets", "campaign_templates", "smtp_accounts", "unsubscribe_events", "scenarios", "scenario_steps"]:
+        for table in ["sends", "settings", "youtube_candidates", "youtube_api_usage", "youtube_api_calls", "youtube_search_jobs", "blocked_targets", "campaign_templates", "smtp_accounts", "unsubscribe_events", "scenarios", "scenario_steps"]:
             table_columns = [row[1] for row in db.execute(f"pragma table_info({table})").fetchall()]
             if "user_id" not in table_columns:
                 db.execute(f"alter table {table} add column user_id text not null default 'local-user'")
         candidate_columns = [row[1] for row in db.execute("pragma table_info(youtube_candidates)").fetchall()]
         if "email" not in candidate_columns:
             db.execute("alter table youtube_candidates add column email text not null default ''")
+        if "stats_updated_at" not in candidate_columns:
+            db.execute("alter table youtube_candidates add column stats_updated_at text not null default ''")
+        checkpoint_columns = [row[1] for row in db.execute("pragma table_info(contact_import_checkpoints)").fetchall()]
+        checkpoint_migrations = {
+            "staged": "alter table contact_import_checkpoints add column staged integer not null default 0",
+            "committed_rows": "alter table contact_import_checkpoints add column committed_rows integer not null default 0",
+            "status": "alter table contact_import_checkpoints add column status text not null default 'staging'",
+            "auto_commit": "alter table contact_import_checkpoints add column auto_commit integer not null default 0",
+            "progress": "alter table contact_import_checkpoints add column progress real not null default 0",
+            "error": "alter table contact_import_checkpoints add column error text not null default ''",
+            "file_path": "alter table contact_import_checkpoints add column file_path text not null default ''",
+            "notified": "alter table contact_import_checkpoints add column notified integer not null default 1",
+        }
+        for column, statement in checkpoint_migrations.items():
+            if column not in checkpoint_columns:
+                db.execute(statement)
+        job_columns = [row[1] for row in db.execute("pragma table_info(youtube_search_jobs)").fetchall()]
+        if "region_code" not in job_columns:
+            db.execute("alter table youtube_search_jobs add column region_code text not null default 'JP'")
         sends_columns = [row[1] for row in db.execute("pragma table_info(sends)").fetchall()]
         if "campaign_key" not in sends_columns:
             db.execute("alter table sends add column campaign_key text not null default ''")
+        if "smtp_account_id" not in sends_columns:
+            db.execute("alter table sends add column smtp_account_id integer not null default 0")
+        smtp_account_columns = [row[1] for row in db.execute("pragma table_info(smtp_accounts)").fetchall()]
+        if "weight" not in smtp_account_columns:
+            db.execute("alter table smtp_accounts add column weight integer not null default 1")
+        if "daily_cap" not in smtp_account_columns:
+            db.execute("alter table smtp_accounts add column daily_cap integer not null default 0")
+        db.execute("create unique index if not exists idx_youtube_api_usage_date on youtube_api_usage(usage_date)")
+        db.execute("create index if not exists idx_contacts_user_email on contacts(user_id, email)")
+        if not db.execute("select 1 from sqlite_master where type = 'index' and name = 'idx_blocked_targets_email_key'").fetchone():
+            normalize_blocked_targets(db)
+        db.execute("drop index if exists idx_blocked_targets_user_email")
+        db.execute("create unique index if not exists idx_blocked_targets_email_key on blocked_targets(user_id, email) where email != ''")
+        db.execute(
+            "create unique index if not exists idx_blocked_targets_channel_key on blocked_targets(user_id, youtube_channel_id) where youtube_channel_id != ''"
+        )
+        release_blocked_targets = """
+            delete from blocked_targets
+            where user_id = new.user_id
+              and (
+                  (email != '' and new.email != '' and email = lower(trim(new.email)))
+                  or (youtube_channel_id != '' and new.youtube_channel_id != '' and youtube_channel_id = new.youtube_channel_id)
+              );
+        """
+        db.execute(f"create trigger if not exists trg_contacts_insert_release_blocked after insert on contacts begin {release_blocked_targets} end")
+        db.execute(
+            f"create trigger if not exists trg_contacts_update_release_blocked after update of email, youtube_channel_id on contacts begin {release_blocked_targets} end"
+        )
         campaign_columns = [row[1] for row in db.execute("pragma table_info(campaign_templates)").fetchall()]
         if "sort_order" not in campaign_columns:
             db.execute("alter table campaign_templates add column sort_order integer not null default 0")
@@ -812,6 +1081,115 @@ def dataframe_to_xlsx(frame: pd.DataFrame, sheet_name: str = "宛先一覧") ->
     return output.getvalue()
 
 
+COLUMNAR_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+COLUMNAR_EXPORT_QUERIES = {
+    "contacts": """
+        select
+            id, email, name, channel, contact_status, consent, unsubscribed,
+            youtube_channel_id, youtube_channel_url, youtube_subscriber_count,
+            youtube_video_count, youtube_view_count, youtube_keyword, youtube_description,
+            replied_at, created_at
+        from contacts
+        where user_id = ?
+        order by id
+    """,
+    "candidates": """
+        select
+            id, channel_id, email, title, channel_url, subscriber_count,
+            video_count, view_count, keyword, description, stats_updated_at, created_at
+        from youtube_candidates
+        where user_id = ?
+        order by id
+    """,
+    "sends": """
+        select
+            s.id as send_id, s.sent_at, s.status, s.campaign_key,
+            s.contact_id, c.channel, c.email, c.name, s.subject, s.error
+        from sends s
+        left join contacts c on c.id = s.contact_id and c.user_id = s.user_id
+        where s.user_id = ?
+        order by s.id
+    """,
+}
+
+
+COLUMNAR_INTEGER_COLUMNS = {
+    "id",
+    "send_id",
+    "contact_id",
+    "consent",
+    "unsubscribed",
+    "subscriber_count",
+    "video_count",
+    "view_count",
+    "youtube_subscriber_count",
+    "youtube_video_count",
+    "youtube_view_count",
+}
+
+
+def columnar_schema(columns: list[str]) -> pa.Schema:
+    fields = []
+    for column in columns:
+        if column in COLUMNAR_INTEGER_COLUMNS:
+            fields.append(pa.field(column, pa.int64()))
+        elif column.endswith("_at"):
+            fields.append(pa.field(column, pa.timestamp("us", tz="UTC")))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def typed_columnar_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    typed = frame.copy()
+    for column in typed.columns:
+        if column.endswith("_at"):
+            typed[column] = pd.to_datetime(typed[column].replace("", None), utc=True, errors="coerce", format="ISO8601")
+    return typed
+
+
+def write_columnar_frames(frames, file_format: str) -> bytes:
+    sink = pa.BufferOutputStream()
+    writer = None
+    for frame in frames:
+        schema = columnar_schema([str(column) for column in frame.columns])
+        table = pa.Table.from_pandas(typed_columnar_frame(frame), schema=schema, preserve_index=False)
+        if writer is None:
+            if file_format == "parquet":
+                writer = pq.ParquetWriter(sink, schema, compression="zstd")
+            else:
+                writer = pa.ipc.new_file(sink, schema)
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+    return sink.getvalue().to_pybytes()
+
+
+def columnar_export(dataset: str, file_format: str, user_id: str, chunk_rows: int = 50_000) -> bytes:
+    with sqlite3.connect(DB_PATH) as db:
+        frames = pd.read_sql_query(COLUMNAR_EXPORT_QUERIES[dataset], db, params=(user_id,), chunksize=chunk_rows)
+        first = next(frames, None)
+        if first is None:
+            first = pd.read_sql_query(f"select * from ({COLUMNAR_EXPORT_QUERIES[dataset]}) limit 0", db, params=(user_id,))
+        return write_columnar_frames(chain([first], frames), file_format)
+
+
+def columnar_download_buttons(dataset: str, file_stem: str, label: str) -> None:
+    parquet_col, arrow_col = st.columns(2)
+    for column, file_format, format_label in [(parquet_col, "parquet", "Parquet"), (arrow_col, "arrow", "Arrow")]:
+        column.download_button(
+            f"{label}を{format_label}でダウンロード",
+            data=partial(columnar_export, dataset, file_format, current_user_id()),
+            file_name=f"{file_stem}.{file_format}",
+            mime=COLUMNAR_FORMATS[file_format],
+            key=f"{dataset}_{file_format}_download",
+            use_container_width=True,
+        )
+
+
 def execute(query: str, params: tuple = ()) -> None:
     with sqlite3.connect(DB_PATH) as db:
         db.execute(query, params)
@@ -824,8 +1202,10 @@ APP_STATE_TABLES = [
     "sends",
     "settings",
     "smtp_accounts",
+    "smtp_account_usage",
     "youtube_candidates",
     "youtube_api_usage",
+    "youtube_search_jobs",
     "blocked_targets",
     "campaign_templates",
     "unsubscribe_events",
@@ -882,8 +1262,10 @@ def restore_local_app_state(state: dict) -> None:
         "contacts",
         "settings",
         "smtp_accounts",
+        "smtp_account_usage",
         "youtube_candidates",
         "youtube_api_usage",
+        "youtube_search_jobs",
         "blocked_targets",
         "campaign_templates",
         "unsubscribe_events",
@@ -894,8 +1276,10 @@ def restore_local_app_state(state: dict) -> None:
         "contacts",
         "settings",
         "smtp_accounts",
+        "smtp_account_usage",
         "youtube_candidates",
         "youtube_api_usage",
+        "youtube_search_jobs",
         "blocked_targets",
         "campaign_templates",
         "unsubscribe_events",
@@ -930,9 +1314,12 @@ def restore_local_app_state(state: dict) -> None:
                         f"insert or replace into {table} ({', '.join(column_names)}) values ({placeholders})",
                         tuple(clean[column] for column in column_names),
                     )
+            normalize_blocked_targets(db, user_id)
+            cleanup_blocked_targets_for_existing_contacts(db, user_id)
             db.commit()
     finally:
         st.session_state["_restoring_app_state"] = False
+        invalidate_blocklist_index(user_id)
 
 
 def save_app_state_to_supabase() -> None:
@@ -1035,38 +1422,113 @@ def get_youtube_daily_limit() -> int:
         return 10000
 
 
-def estimate_youtube_units(max_results: int, search_mode: str = "キーワード") -> int:
+def estimate_youtube_units(max_results: int, search_mode: str = "キーワード", cached_pages: int = 0) -> int:
     pages = max(1, (max(1, int(max_results)) + 49) // 50)
-    if search_mode == "カテゴリー":
-        return pages * 2
-    return pages * 101
+    pages = max(0, pages - max(0, int(cached_pages)))
+    return pages * calibrated_youtube_page_cost(search_mode)
+
+
+def calibrated_youtube_page_cost(search_mode: str = "キーワード", days: int = 30, min_pages: int = 5) -> int:
+    default_cost = 2 if search_mode == "カテゴリー" else 101
+    page_endpoint = "videos" if search_mode == "カテゴリー" else "search"
+    since = (datetime.now(YOUTUBE_QUOTA_TIMEZONE) - timedelta(days=int(days))).strftime("%Y-%m-%d")
+    result = rows(
+        """
+        select
+            sum(case when endpoint = ? then 1 else 0 end) as page_count,
+            coalesce(sum(units), 0) as total_units
+        from youtube_api_calls
+        where user_id = ? and search_mode = ? and usage_date >= ?
+        """,
+        (page_endpoint, current_user_id(), search_mode, since),
+    )
+    if not result or int(result[0]["page_count"] or 0) < int(min_pages):
+        return default_cost
+    return max(1, -(-int(result[0]["total_units"]) // int(result[0]["page_count"])))
 
 
 def get_youtube_units_used(date_key: str | None = None) -> int:
-    key = date_key or today_key()
+    key = date_key or youtube_quota_day_key()
     scoped_key = f"{current_user_id()}::{key}"
     result = rows("select units from youtube_api_usage where usage_date = ?", (scoped_key,))
     return int(result[0]["units"]) if result else 0
 
 
 def add_youtube_units(units: int, date_key: str | None = None) -> None:
-    key = date_key or today_key()
-    scoped_key = f"{current_user_id()}::{key}"
-    new_total = get_youtube_units_used(key) + int(units)
-    execute("delete from youtube_api_usage where usage_date = ?", (scoped_key,))
-    execute(
-        """
-        insert into youtube_api_usage(user_id, usage_date, units)
-        values(?, ?, ?)
-        """,
-        (current_user_id(), scoped_key, new_total),
-    )
+    record_youtube_api_calls([{"endpoint": "", "units": int(units)}], date_key)
+
+
+def record_youtube_api_calls(calls: list[dict], date_key: str | None = None) -> None:
+    if write_youtube_api_calls(current_user_id(), calls, date_key):
+        mark_app_state_dirty()
+
+
+def write_youtube_api_calls(user_id: str, calls: list[dict], date_key: str | None = None) -> bool:
+    total_units = sum(int(call.get("units", 0)) for call in calls)
+    if not total_units:
+        return False
+    key = date_key or youtube_quota_day_key()
+    scoped_key = f"{user_id}::{key}"
+    called_at = now_iso()
+    with sqlite3.connect(DB_PATH) as db:
+        db.execute(
+            """
+            insert into youtube_api_usage(user_id, usage_date, units)
+            values(?, ?, ?)
+            on conflict(usage_date) do update set units = units + excluded.units
+            """,
+            (user_id, scoped_key, total_units),
+        )
+        db.executemany(
+            """
+            insert into youtube_api_calls(user_id, usage_date, endpoint, units, search_mode, keyword, called_at)
+            values (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    user_id,
+                    key,
+                    str(call.get("endpoint", "")),
+                    int(call.get("units", 0)),
+                    str(call.get("search_mode", "")),
+                    str(call.get("keyword", "")),
+                    called_at,
+                )
+                for call in calls
+                if call.get("endpoint")
+            ],
+        )
+        retention_start = (datetime.now(YOUTUBE_QUOTA_TIMEZONE) - timedelta(days=90)).strftime("%Y-%m-%d")
+        db.execute("delete from youtube_api_calls where user_id = ? and usage_date < ?", (user_id, retention_start))
+        db.commit()
+    return True
+
+
+def fetch_youtube_api_usage_by_keyword(days: int = 7) -> pd.DataFrame:
+    since = (datetime.now(YOUTUBE_QUOTA_TIMEZONE) - timedelta(days=int(days))).strftime("%Y-%m-%d")
+    with sqlite3.connect(DB_PATH) as db:
+        return pd.read_sql_query(
+            """
+            select
+                usage_date,
+                search_mode,
+                keyword,
+                sum(case when endpoint in ('search', 'videos') then 1 else 0 end) as pages,
+                sum(units) as units
+            from youtube_api_calls
+            where user_id = ? and usage_date >= ?
+            group by usage_date, search_mode, keyword
+            order by usage_date desc, units desc
+            """,
+            db,
+            params=(current_user_id(), since),
+        )
 
 
-def get_setting(key: str, default: str = "") -> str:
+def get_setting(key: str, default: str = "", user_id: str | None = None) -> str:
     if not DB_PATH.exists():
         return default
-    scoped_key = f"{current_user_id()}::{key}"
+    scoped_key = f"{user_id or current_user_id()}::{key}"
     with sqlite3.connect(DB_PATH) as db:
         row = db.execute("select value from settings where key = ?", (scoped_key,)).fetchone()
         return str(row[0]) if row else default
@@ -1089,7 +1551,7 @@ def delete_setting(key: str) -> None:
 def fetch_smtp_accounts() -> list[sqlite3.Row]:
     return rows(
         """
-        select id, label, sender_name, sender_email, smtp_host, smtp_port, smtp_ssl, smtp_pass
+        select id, label, sender_name, sender_email, smtp_host, smtp_port, smtp_ssl, smtp_pass, weight, daily_cap
         from smtp_accounts
         where user_id = ?
         order by id asc
@@ -1101,7 +1563,7 @@ def fetch_smtp_accounts() -> list[sqlite3.Row]:
 def get_smtp_account(account_id: int) -> sqlite3.Row | None:
     matches = rows(
         """
-        select id, label, sender_name, sender_email, smtp_host, smtp_port, smtp_ssl, smtp_pass
+        select id, label, sender_name, sender_email, smtp_host, smtp_port, smtp_ssl, smtp_pass, weight, daily_cap
         from smtp_accounts
         where user_id = ? and id = ?
         limit 1
@@ -1120,6 +1582,8 @@ def save_smtp_account(
     smtp_port: str,
     smtp_ssl: bool,
     smtp_pass: str,
+    weight: int = 1,
+    daily_cap: int = 0,
 ) -> int:
     clean_label = label.strip() or sender_email.strip()
     existing_pass = ""
@@ -1127,12 +1591,14 @@ def save_smtp_account(
         existing = get_smtp_account(account_id)
         existing_pass = existing["smtp_pass"] if existing else ""
     password_to_save = smtp_pass or existing_pass
+    if smtp_pass and smtp_pass != existing_pass:
+        clear_smtp_auth_failure(smtp_throttle_account_key({"smtp_host": smtp_host, "sender_email": sender_email}))
     if account_id and get_smtp_account(account_id):
         execute(
             """
             update smtp_accounts
             set label = ?, sender_name = ?, sender_email = ?, smtp_host = ?, smtp_port = ?,
-                smtp_ssl = ?, smtp_pass = ?, updated_at = ?
+                smtp_ssl = ?, smtp_pass = ?, weight = ?, daily_cap = ?, updated_at = ?
             where user_id = ? and id = ?
             """,
             (
@@ -1143,6 +1609,8 @@ def save_smtp_account(
                 smtp_port.strip(),
                 1 if smtp_ssl else 0,
                 password_to_save,
+                max(1, int(weight)),
+                max(0, int(daily_cap)),
                 now_iso(),
                 current_user_id(),
                 int(account_id),
@@ -1152,8 +1620,8 @@ def save_smtp_account(
     execute(
         """
         insert into smtp_accounts
-        (user_id, label, sender_name, sender_email, smtp_host, smtp_port, smtp_ssl, smtp_pass, created_at, updated_at)
-        values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        (user_id, label, sender_name, sender_email, smtp_host, smtp_port, smtp_ssl, smtp_pass, weight, daily_cap, created_at, updated_at)
+        values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             current_user_id(),
@@ -1164,6 +1632,8 @@ def save_smtp_account(
             smtp_port.strip(),
             1 if smtp_ssl else 0,
             password_to_save,
+            max(1, int(weight)),
+            max(0, int(daily_cap)),
             now_iso(),
             now_iso(),
         ),
@@ -1193,17 +1663,23 @@ def active_smtp_account() -> dict[str, str | int]:
             pass
     if accounts:
         return dict(accounts[0])
-    sender_name = get_setting("SENDER_NAME", "")
-    sender_email = get_setting("SMTP_USER", "")
+    return settings_smtp_account()
+
+
+def settings_smtp_account(user_id: str | None = None) -> dict[str, str | int]:
+    sender_name = get_setting("SENDER_NAME", "", user_id)
+    sender_email = get_setting("SMTP_USER", "", user_id)
     return {
         "id": 0,
         "label": sender_email or "送信元設定",
         "sender_name": sender_name,
         "sender_email": sender_email,
-        "smtp_host": get_setting("SMTP_HOST", "smtp.gmail.com"),
-        "smtp_port": get_setting("SMTP_PORT", "587"),
-        "smtp_ssl": 1 if get_setting("SMTP_SSL", "false").lower() in {"1", "true", "yes"} else 0,
-        "smtp_pass": get_setting("SMTP_PASS", ""),
+        "smtp_host": get_setting("SMTP_HOST", "smtp.gmail.com", user_id),
+        "smtp_port": get_setting("SMTP_PORT", "587", user_id),
+        "smtp_ssl": 1 if get_setting("SMTP_SSL", "false", user_id).lower() in {"1", "true", "yes"} else 0,
+        "smtp_pass": get_setting("SMTP_PASS", "", user_id),
+        "weight": 1,
+        "daily_cap": 0,
     }
 
 
@@ -1446,42 +1922,73 @@ def reset_campaign_template_session(name: str, subject: str, body: str) -> None:
     st.session_state["loaded_campaign_template"] = name
 
 
+@st.cache_resource
+def blocklist_index_registry() -> dict:
+    return {"lock": threading.Lock(), "indexes": {}, "versions": {}}
+
+
+def load_blocklist_index(user_id: str) -> dict[str, set[str]]:
+    with sqlite3.connect(DB_PATH) as db:
+        records = db.execute(
+            "select email, youtube_channel_id from blocked_targets where user_id = ?",
+            (user_id,),
+        ).fetchall()
+    return {
+        "emails": {str(email).strip().lower() for email, _ in records if str(email or "").strip()},
+        "channel_ids": {str(channel_id).strip() for _, channel_id in records if str(channel_id or "").strip()},
+    }
+
+
+def blocklist_index(user_id: str | None = None) -> dict[str, set[str]]:
+    user_id = user_id or current_user_id()
+    registry = blocklist_index_registry()
+    with registry["lock"]:
+        index = registry["indexes"].get(user_id)
+        version = registry["versions"].get(user_id, 0)
+    if index is not None:
+        return index
+    index = load_blocklist_index(user_id)
+    with registry["lock"]:
+        if registry["versions"].get(user_id, 0) == version:
+            registry["indexes"][user_id] = index
+    return index
+
+
+def invalidate_blocklist_index(user_id: str | None = None) -> None:
+    user_id = user_id or current_user_id()
+    registry = blocklist_index_registry()
+    with registry["lock"]:
+        registry["indexes"].pop(user_id, None)
+        registry["versions"][user_id] = registry["versions"].get(user_id, 0) + 1
+
+
 def block_target(email: str = "", youtube_channel_id: str = "", channel: str = "", reason: str = "") -> None:
     normalized_email = email.strip().lower()
     channel_id = youtube_channel_id.strip()
     if not normalized_email and not channel_id:
         return
-    duplicate = rows(
-        """
-        select id from blocked_targets
-        where user_id = ? and ((email != '' and email = ?) or (youtube_channel_id != '' and youtube_channel_id = ?))
-        """,
-        (current_user_id(), normalized_email, channel_id),
-    )
-    if duplicate:
-        return
-    execute(
-        """
-        insert into blocked_targets(user_id, email, youtube_channel_id, channel, reason, created_at)
-        values (?, ?, ?, ?, ?, ?)
-        """,
-        (current_user_id(), normalized_email, channel_id, channel.strip(), reason, now_iso()),
-    )
+    with sqlite3.connect(DB_PATH) as db:
+        inserted = db.execute(
+            """
+            insert or ignore into blocked_targets(user_id, email, youtube_channel_id, channel, reason, created_at)
+            values (?, ?, ?, ?, ?, ?)
+            """,
+            (current_user_id(), normalized_email, channel_id, channel.strip(), reason, now_iso()),
+        ).rowcount
+    if inserted > 0:
+        mark_app_state_dirty()
+        invalidate_blocklist_index()
 
 
-def is_blocked(email: str = "", youtube_channel_id: str = "") -> bool:
+def is_blocked(email: str = "", youtube_channel_id: str = "", user_id: str | None = None) -> bool:
     normalized_email = email.strip().lower()
     channel_id = youtube_channel_id.strip()
     if not normalized_email and not channel_id:
         return False
+    index = blocklist_index(user_id)
     return bool(
-        rows(
-            """
-            select id from blocked_targets
-            where user_id = ? and ((email != '' and email = ?) or (youtube_channel_id != '' and youtube_channel_id = ?))
-            """,
-            (current_user_id(), normalized_email, channel_id),
-        )
+        (normalized_email and normalized_email in index["emails"])
+        or (channel_id and channel_id in index["channel_ids"])
     )
 
 
@@ -1514,16 +2021,12 @@ def unblock_target(email: str = "", youtube_channel_id: str = "") -> None:
         """,
         (current_user_id(), normalized_email, channel_id),
     )
+    invalidate_blocklist_index()
 
 
 def unblock_target_by_id(blocked_id: int) -> None:
-    blocked = rows(
-        "select email, youtube_channel_id from blocked_targets where user_id = ? and id = ?",
-        (current_user_id(), int(blocked_id)),
-    )
-    if blocked:
-        unblock_target(str(blocked[0]["email"] or ""), str(blocked[0]["youtube_channel_id"] or ""))
     execute("delete from blocked_targets where user_id = ? and id = ?", (current_user_id(), int(blocked_id)))
+    invalidate_blocklist_index()
 
 
 def restore_blocked_target_by_id(blocked_id: int) -> tuple[bool, str]:
@@ -1559,8 +2062,8 @@ def restore_blocked_target_by_id(blocked_id: int) -> tuple[bool, str]:
     return False, "除外は解除しましたが、宛先一覧への復元はできませんでした。メールアドレスやチャンネルの重複を確認してください。"
 
 
-def cleanup_blocked_targets_for_existing_contacts() -> None:
-    execute(
+def cleanup_blocked_targets_for_existing_contacts(db: sqlite3.Connection, user_id: str) -> int:
+    cursor = db.execute(
         """
         delete from blocked_targets
         where user_id = ?
@@ -1578,8 +2081,21 @@ def cleanup_blocked_targets_for_existing_contacts() -> None:
               ))
           )
         """,
-        (current_user_id(), current_user_id(), current_user_id()),
+        (user_id, user_id, user_id),
     )
+    return cursor.rowcount
+
+
+def maybe_reconcile_blocked_targets() -> None:
+    reconciled_at = get_setting("BLOCKLIST_RECONCILED_AT", "")
+    if reconciled_at and datetime.fromisoformat(reconciled_at) > datetime.now(timezone.utc) - timedelta(days=1):
+        return
+    with sqlite3.connect(DB_PATH) as db:
+        removed = cleanup_blocked_targets_for_existing_contacts(db, current_user_id())
+        db.commit()
+    if removed:
+        invalidate_blocklist_index()
+    save_setting("BLOCKLIST_RECONCILED_AT", now_iso())
 
 
 def delete_contact(contact_id: int, block: bool = False, reason: str = "") -> None:
@@ -1703,6 +2219,7 @@ def update_contact(contact_id: int, email: str, name: str, channel: str, consent
         """,
         (normalized_email, name.strip(), channel.strip(), 1 if consent else 0, clean_status, current_user_id(), contact_id),
     )
+    invalidate_blocklist_index()
     return True, "宛先を更新しました"
 
 
@@ -1729,12 +2246,17 @@ def set_contact_status(contact_id: int, contact_status: str) -> None:
     )
 
 
-def youtube_api_get(path: str, params: dict[str, str | int]) -> dict:
-    api_key = get_secret("YOUTUBE_API_KEY", "")
+def youtube_api_base_url() -> str:
+    base_url = read_secret("YOUTUBE_API_BASE_URL") or os.getenv("YOUTUBE_API_BASE_URL", "") or DEFAULT_YOUTUBE_API_BASE_URL
+    return base_url.rstrip("/") + "/"
+
+
+def youtube_api_get(path: str, params: dict[str, str | int], api_key: str = "") -> dict:
+    api_key = api_key or get_secret("YOUTUBE_API_KEY", "")
     if not api_key:
         raise RuntimeError("YouTube APIキーが未設定です")
     query = urllib.parse.urlencode({**params, "key": api_key})
-    url = f"https://www.googleapis.com/youtube/v3/{path}?{query}"
+    url = f"{youtube_api_base_url()}{path}?{query}"
     try:
         with urllib.request.urlopen(url, timeout=30) as response:
             import json
@@ -1746,161 +2268,1286 @@ def youtube_api_get(path: str, params: dict[str, str | int]) -> dict:
 
 
 def save_candidate(candidate: dict, keyword: str) -> bool:
-    channel_id = candidate["channel_id"]
-    if is_blocked(youtube_channel_id=channel_id):
-        return False
-    if youtube_channel_in_contacts(channel_id) or youtube_channel_in_candidates(channel_id):
-        return False
-    execute(
-        """
-        insert or ignore into youtube_candidates
-        (user_id, channel_id, email, title, channel_url, subscriber_count, video_count, view_count, description, keyword, created_at)
-        values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            current_user_id(),
-            channel_id,
-            candidate.get("email", ""),
-            candidate["title"],
-            candidate["channel_url"],
-            int(candidate.get("subscriber_count", 0)),
-            int(candidate.get("video_count", 0)),
-            int(candidate.get("view_count", 0)),
-            candidate.get("description", ""),
-            keyword,
-            now_iso(),
-        ),
-    )
-    return True
+    return save_candidates([candidate], keyword) == 1
 
 
-def search_youtube_channels(
-    keyword: str,
-    min_subs: int,
-    max_subs: int,
-    max_results: int,
-    search_mode: str = "キーワード",
-    category_id: str = "",
-    display_label: str = "",
-) -> tuple[int, int, int]:
-    found = 0
-    saved = 0
-    units_used = 0
-    page_token = ""
-    max_results = max(1, min(max_results, 200))
-    max_pages = max(1, (max_results + 49) // 50)
-    checked_pages = 0
-    candidate_label = display_label or keyword
-
-    while found < max_results and checked_pages < max_pages:
-        checked_pages += 1
-        if search_mode == "カテゴリー":
-            units_used += 1
-            video_data = youtube_api_get(
-                "videos",
-                {
-                    "part": "snippet",
-                    "chart": "mostPopular",
-                    "regionCode": "JP",
-                    "videoCategoryId": category_id,
-                    "maxResults": min(50, max_results - found),
-                    "pageToken": page_token,
-                },
-            )
-            keyword_filter = keyword.strip().lower()
-            raw_channel_ids = []
-            for item in video_data.get("items", []):
-                snippet = item.get("snippet", {})
-                searchable_text = " ".join(
-                    [
-                        snippet.get("title", ""),
-                        snippet.get("channelTitle", ""),
-                        snippet.get("description", ""),
-                    ]
-                ).lower()
-                if keyword_filter and keyword_filter not in searchable_text:
-                    continue
-                channel_id = snippet.get("channelId", "")
-                if channel_id:
-                    raw_channel_ids.append(channel_id)
-            page_token = video_data.get("nextPageToken", "")
-        else:
-            units_used += 100
-            search_params = {
-                "part": "snippet",
-                "maxResults": min(50, max_results - found),
-                "pageToken": page_token,
-                "type": "channel",
-                "q": keyword,
-            }
-            search_data = youtube_api_get(
-                "search",
-                search_params,
+def existing_youtube_channel_ids(db: sqlite3.Connection, channel_ids: list[str]) -> set[str]:
+    user_id = current_user_id()
+    blocked_channel_ids = blocklist_index(user_id)["channel_ids"]
+    existing = {channel_id for channel_id in channel_ids if channel_id in blocked_channel_ids}
+    for start in range(0, len(channel_ids), 300):
+        chunk = channel_ids[start : start + 300]
+        placeholders = ", ".join(["?"] * len(chunk))
+        existing.update(
+            str(row[0])
+            for row in db.execute(
+                f"""
+                select youtube_channel_id from contacts
+                where user_id = ? and youtube_channel_id in ({placeholders})
+                union
+                select channel_id from youtube_candidates
+                where user_id = ? and channel_id in ({placeholders})
+                """,
+                (user_id, *chunk, user_id, *chunk),
             )
-            raw_channel_ids = [
-                item["snippet"]["channelId"]
-                for item in search_data.get("items", [])
-                if item.get("snippet", {}).get("channelId")
-            ]
-            page_token = search_data.get("nextPageToken", "")
+        )
+    return existing
 
-        channel_ids = list(dict.fromkeys(raw_channel_ids))
-        if not channel_ids:
-            if page_token:
-                continue
-            break
 
-        units_used += 1
-        channel_data = youtube_api_get(
-            "channels",
-            {
-                "part": "snippet,statistics",
-                "id": ",".join(channel_ids),
-                "maxResults": 50,
-            },
+def save_candidates(candidates: list[dict], keyword: str) -> int:
+    unique_candidates = list({candidate["channel_id"]: candidate for candidate in candidates if candidate["channel_id"]}.values())
+    if not unique_candidates:
+        return 0
+    user_id = current_user_id()
+    created_at = now_iso()
+    with sqlite3.connect(DB_PATH) as db:
+        existing = existing_youtube_channel_ids(db, [candidate["channel_id"] for candidate in unique_candidates])
+        new_rows = [
+            (
+                user_id,
+                candidate["channel_id"],
+                candidate.get("email", ""),
+                candidate["title"],
+                candidate["channel_url"],
+                int(candidate.get("subscriber_count", 0)),
+                int(candidate.get("video_count", 0)),
+                int(candidate.get("view_count", 0)),
+                candidate.get("description", ""),
+                keyword,
+                created_at,
+            )
+            for candidate in unique_candidates
+            if candidate["channel_id"] not in existing
+        ]
+        if not new_rows:
+            return 0
+        db.executemany(
+            """
+            insert or ignore into youtube_candidates
+            (user_id, channel_id, email, title, channel_url, subscriber_count, video_count, view_count, description, keyword, created_at)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            new_rows,
         )
+        db.commit()
+    mark_app_state_dirty()
+    return len(new_rows)
 
-        for item in channel_data.get("items", []):
-            stats = item.get("statistics", {})
-            snippet = item.get("snippet", {})
-            subscriber_count = int(stats.get("subscriberCount", 0))
-            if subscriber_count < min_subs:
-                continue
-            if max_subs and subscriber_count > max_subs:
-                continue
 
-            channel_id = item["id"]
-            was_saved = save_candidate(
-                {
-                    "channel_id": channel_id,
-                    "title": snippet.get("title", ""),
-                    "channel_url": f"https://www.youtube.com/channel/{channel_id}",
-                    "subscriber_count": subscriber_count,
-                    "video_count": int(stats.get("videoCount", 0)),
-                    "view_count": int(stats.get("viewCount", 0)),
-                    "description": snippet.get("description", ""),
-                },
-                candidate_label,
-            )
-            if was_saved:
-                saved += 1
+def get_youtube_search_cache_ttl_hours() -> int:
+    value = get_setting("YOUTUBE_SEARCH_CACHE_TTL_HOURS", "24")
+    try:
+        return max(0, int(value))
+    except ValueError:
+        return 24
 
-        found += len(channel_ids)
-        if not page_token:
-            break
 
-    add_youtube_units(units_used)
-    return found, saved, units_used
+def get_youtube_search_cache_max_pages() -> int:
+    value = get_setting("YOUTUBE_SEARCH_CACHE_MAX_PAGES", "500")
+    try:
+        return max(0, int(value))
+    except ValueError:
+        return 500
 
 
-def rows(query: str, params: tuple = ()) -> list[sqlite3.Row]:
-    with sqlite3.connect(DB_PATH) as db:
-        db.row_factory = sqlite3.Row
+def youtube_search_cache_key(search_mode: str, keyword: str, category_id: str = "", region_code: str = "JP") -> str:
+    parts = [search_mode, category_id.strip(), " ".join(keyword.strip().lower().split())]
+    if search_mode == "カテゴリー":
+        parts.append(region_code.strip().upper())
+    normalized = "|".join(parts)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def youtube_search_cache_cutoff() -> str:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=get_youtube_search_cache_ttl_hours())
+    return cutoff.isoformat(timespec="seconds")
+
+
+def get_cached_youtube_search_page(cache_key: str, page_index: int) -> dict | None:
+    if get_youtube_search_cache_ttl_hours() <= 0 or get_youtube_search_cache_max_pages() <= 0:
+        return None
+    with sqlite3.connect(DB_PATH) as db:
+        db.row_factory = sqlite3.Row
+        cached = db.execute(
+            """
+            select channel_ids, channels, next_page_token
+            from youtube_search_cache
+            where user_id = ? and cache_key = ? and page_index = ? and created_at >= ?
+            """,
+            (current_user_id(), cache_key, int(page_index), youtube_search_cache_cutoff()),
+        ).fetchone()
+        if not cached:
+            return None
+        db.execute(
+            """
+            update youtube_search_cache
+            set last_used_at = ?
+            where user_id = ? and cache_key = ? and page_index = ?
+            """,
+            (now_iso(), current_user_id(), cache_key, int(page_index)),
+        )
+        db.commit()
+    try:
+        return {
+            "channel_ids": json.loads(cached["channel_ids"]),
+            "channels": json.loads(cached["channels"]),
+            "next_page_token": str(cached["next_page_token"] or ""),
+        }
+    except ValueError:
+        return None
+
+
+def save_youtube_search_page(
+    cache_key: str,
+    page_index: int,
+    channel_ids: list[str],
+    channels: list[dict],
+    next_page_token: str,
+) -> None:
+    max_pages = get_youtube_search_cache_max_pages()
+    if get_youtube_search_cache_ttl_hours() <= 0 or max_pages <= 0:
+        return
+    user_id = current_user_id()
+    with sqlite3.connect(DB_PATH) as db:
+        db.execute(
+            """
+            insert or replace into youtube_search_cache
+            (user_id, cache_key, page_index, channel_ids, channels, next_page_token, created_at, last_used_at)
+            values (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id,
+                cache_key,
+                int(page_index),
+                json.dumps(channel_ids),
+                json.dumps(channels, ensure_ascii=False),
+                next_page_token,
+                now_iso(),
+                now_iso(),
+            ),
+        )
+        db.execute(
+            "delete from youtube_search_cache where user_id = ? and created_at < ?",
+            (user_id, youtube_search_cache_cutoff()),
+        )
+        db.execute(
+            """
+            delete from youtube_search_cache
+            where user_id = ?
+              and rowid not in (
+                  select rowid
+                  from youtube_search_cache
+                  where user_id = ?
+                  order by last_used_at desc, created_at desc
+                  limit ?
+              )
+            """,
+            (user_id, user_id, max_pages),
+        )
+        db.commit()
+
+
+def count_cached_youtube_search_pages(
+    search_mode: str,
+    keyword: str,
+    category_id: str,
+    max_results: int,
+    region_code: str = "JP",
+) -> int:
+    if get_youtube_search_cache_ttl_hours() <= 0 or get_youtube_search_cache_max_pages() <= 0:
+        return 0
+    max_pages = max(1, (max(1, min(int(max_results), 200)) + 49) // 50)
+    result = rows(
+        """
+        select count(*) as count
+        from youtube_search_cache
+        where user_id = ? and cache_key = ? and page_index < ? and created_at >= ?
+        """,
+        (
+            current_user_id(),
+            youtube_search_cache_key(search_mode, keyword, category_id, region_code),
+            max_pages,
+            youtube_search_cache_cutoff(),
+        ),
+    )
+    return int(result[0]["count"] or 0) if result else 0
+
+
+def clear_youtube_search_cache() -> None:
+    with sqlite3.connect(DB_PATH) as db:
+        db.execute("delete from youtube_search_cache where user_id = ?", (current_user_id(),))
+        db.commit()
+
+
+def fetch_youtube_search_page(
+    search_mode: str,
+    keyword: str,
+    category_id: str,
+    page_token: str,
+    api_key: str = "",
+    region_code: str = "JP",
+) -> tuple[list[str], str, int]:
+    if search_mode == "カテゴリー":
+        video_data = youtube_api_get(
+            "videos",
+            {
+                "part": "snippet",
+                "chart": "mostPopular",
+                "regionCode": region_code,
+                "videoCategoryId": category_id,
+                "maxResults": 50,
+                "pageToken": page_token,
+            },
+            api_key,
+        )
+        keyword_filter = keyword.strip().lower()
+        raw_channel_ids = []
+        for item in video_data.get("items", []):
+            snippet = item.get("snippet", {})
+            searchable_text = " ".join(
+                [
+                    snippet.get("title", ""),
+                    snippet.get("channelTitle", ""),
+                    snippet.get("description", ""),
+                ]
+            ).lower()
+            if keyword_filter and keyword_filter not in searchable_text:
+                continue
+            channel_id = snippet.get("channelId", "")
+            if channel_id:
+                raw_channel_ids.append(channel_id)
+        return raw_channel_ids, video_data.get("nextPageToken", ""), 1
+
+    search_data = youtube_api_get(
+        "search",
+        {
+            "part": "snippet",
+            "maxResults": 50,
+            "pageToken": page_token,
+            "type": "channel",
+            "q": keyword,
+        },
+        api_key,
+    )
+    raw_channel_ids = [
+        item["snippet"]["channelId"]
+        for item in search_data.get("items", [])
+        if item.get("snippet", {}).get("channelId")
+    ]
+    return raw_channel_ids, search_data.get("nextPageToken", ""), 100
+
+
+def fetch_youtube_channel_details(channel_ids: list[str], api_key: str = "") -> list[dict]:
+    if not channel_ids:
+        return []
+    channel_data = youtube_api_get(
+        "channels",
+        {
+            "part": "snippet,statistics",
+            "id": ",".join(channel_ids),
+            "maxResults": 50,
+        },
+        api_key,
+    )
+    channels = []
+    for item in channel_data.get("items", []):
+        stats = item.get("statistics", {})
+        snippet = item.get("snippet", {})
+        channels.append(
+            {
+                "channel_id": item["id"],
+                "title": snippet.get("title", ""),
+                "subscriber_count": int(stats.get("subscriberCount", 0)),
+                "video_count": int(stats.get("videoCount", 0)),
+                "view_count": int(stats.get("viewCount", 0)),
+                "description": snippet.get("description", ""),
+            }
+        )
+    return channels
+
+
+def save_youtube_channel_page(
+    channels: list[dict],
+    channel_ids: list[str],
+    min_subs: int,
+    max_subs: int,
+    candidate_label: str,
+) -> int:
+    wanted_ids = set(channel_ids)
+    return save_candidates(
+        [
+            {
+                **channel,
+                "channel_url": f"https://www.youtube.com/channel/{channel['channel_id']}",
+            }
+            for channel in channels
+            if channel["channel_id"] in wanted_ids
+            and int(channel["subscriber_count"]) >= min_subs
+            and not (max_subs and int(channel["subscriber_count"]) > max_subs)
+        ],
+        candidate_label,
+    )
+
+
+def youtube_search_query(
+    search_mode: str,
+    keyword: str,
+    category_id: str = "",
+    label: str = "",
+    region_code: str = "JP",
+) -> dict[str, str]:
+    return {
+        "search_mode": search_mode,
+        "keyword": keyword.strip(),
+        "category_id": category_id,
+        "label": label or keyword.strip(),
+        "region_code": region_code or "JP",
+    }
+
+
+def collect_youtube_search_pages(
+    query: dict[str, str],
+    max_results: int,
+    cached_pages: dict[int, dict],
+    api_key: str,
+    details_pool: ThreadPoolExecutor,
+) -> dict:
+    pages = []
+    error = ""
+    failure: Exception | None = None
+    found = 0
+    page_token = ""
+    max_pages = max(1, (max_results + 49) // 50)
+    try:
+        for page_index in range(max_pages):
+            if found >= max_results:
+                break
+            cached = cached_pages.get(page_index)
+            if cached is not None:
+                page = {**cached, "page_index": page_index, "units": 0, "calls": [], "cached": True}
+            else:
+                raw_channel_ids, next_page_token, units = fetch_youtube_search_page(
+                    query["search_mode"],
+                    query["keyword"],
+                    query["category_id"],
+                    page_token,
+                    api_key,
+                    query["region_code"],
+                )
+                channel_ids = list(dict.fromkeys(raw_channel_ids))
+                page = {
+                    "page_index": page_index,
+                    "channel_ids": channel_ids,
+                    "channels": details_pool.submit(fetch_youtube_channel_details, channel_ids, api_key) if channel_ids else [],
+                    "next_page_token": next_page_token,
+                    "units": units,
+                    "calls": [{"endpoint": "videos" if query["search_mode"] == "カテゴリー" else "search", "units": units}],
+                    "cached": False,
+                }
+            pages.append(page)
+            page_token = page["next_page_token"]
+            page_ids = page["channel_ids"][: max_results - found]
+            if not page_ids:
+                if page_token:
+                    continue
+                break
+            found += len(page_ids)
+            if not page_token:
+                break
+    except Exception as exc:
+        error = str(exc)
+        failure = exc
+
+    for page in pages:
+        if isinstance(page["channels"], Future):
+            try:
+                page["channels"] = page["channels"].result()
+                page["units"] += 1
+                page["calls"].append({"endpoint": "channels", "units": 1})
+            except Exception as exc:
+                page["channels"] = None
+                error = error or str(exc)
+                failure = failure or exc
+    return {"pages": pages, "error": error, "exception": failure}
+
+
+def search_youtube_channels_batch(
+    queries: list[dict[str, str]],
+    min_subs: int,
+    max_subs: int,
+    max_results: int,
+    max_workers: int = 4,
+    progress_callback=None,
+) -> list[dict]:
+    max_results = max(1, min(max_results, 200))
+    max_pages = max(1, (max_results + 49) // 50)
+    max_workers = max(1, int(max_workers))
+    api_key = get_secret("YOUTUBE_API_KEY", "")
+    cached_by_query = []
+    for query in queries:
+        cache_key = youtube_search_cache_key(query["search_mode"], query["keyword"], query["category_id"], query["region_code"])
+        cached_pages = {}
+        for page_index in range(max_pages):
+            cached = get_cached_youtube_search_page(cache_key, page_index)
+            if cached is None:
+                break
+            cached_pages[page_index] = cached
+        cached_by_query.append((cache_key, cached_pages))
+
+    results: list[dict] = [{} for _ in queries]
+    seen_channel_ids: set[str] = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as search_pool, ThreadPoolExecutor(max_workers=max_workers) as details_pool:
+        futures = {
+            search_pool.submit(
+                collect_youtube_search_pages,
+                query,
+                max_results,
+                cached_by_query[index][1],
+                api_key,
+                details_pool,
+            ): index
+            for index, query in enumerate(queries)
+        }
+        for completed, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            query = queries[index]
+            cache_key = cached_by_query[index][0]
+            collected = future.result()
+            found = saved = units_used = duplicates = 0
+            calls = []
+            for page in collected["pages"]:
+                units_used += page["units"]
+                calls.extend(
+                    {**call, "search_mode": query["search_mode"], "keyword": query["label"]}
+                    for call in page["calls"]
+                )
+                if page["channels"] is None:
+                    continue
+                if not page["cached"]:
+                    save_youtube_search_page(
+                        cache_key,
+                        page["page_index"],
+                        page["channel_ids"],
+                        page["channels"],
+                        page["next_page_token"],
+                    )
+                page_ids = page["channel_ids"][: max_results - found]
+                found += len(page_ids)
+                new_ids = [channel_id for channel_id in page_ids if channel_id not in seen_channel_ids]
+                duplicates += len(page_ids) - len(new_ids)
+                seen_channel_ids.update(new_ids)
+                saved += save_youtube_channel_page(page["channels"], new_ids, min_subs, max_subs, query["label"])
+            record_youtube_api_calls(calls)
+            results[index] = {
+                "label": query["label"],
+                "found": found,
+                "saved": saved,
+                "duplicates": duplicates,
+                "units_used": units_used,
+                "error": collected["error"],
+                "exception": collected["exception"],
+            }
+            if progress_callback:
+                progress_callback(completed, len(queries), results[index])
+    return results
+
+
+def search_youtube_channels(
+    keyword: str,
+    min_subs: int,
+    max_subs: int,
+    max_results: int,
+    search_mode: str = "キーワード",
+    category_id: str = "",
+    display_label: str = "",
+    region_code: str = "JP",
+) -> tuple[int, int, int]:
+    result = search_youtube_channels_batch(
+        [youtube_search_query(search_mode, keyword, category_id, display_label, region_code)],
+        min_subs,
+        max_subs,
+        max_results,
+        max_workers=1,
+    )[0]
+    if result["exception"] is not None:
+        raise result["exception"]
+    return result["found"], result["saved"], result["units_used"]
+
+
+def collect_youtube_video_pages(query: dict[str, str], max_results: int, cached_pages: dict[int, dict], api_key: str) -> dict:
+    pages = []
+    error = ""
+    found = 0
+    page_token = ""
+    try:
+        for page_index in range(max(1, (max_results + 49) // 50)):
+            cached = cached_pages.get(page_index)
+            if cached is not None:
+                page = {**cached, "page_index": page_index, "units": 0, "calls": [], "cached": True}
+            else:
+                channel_ids, next_page_token, units = fetch_youtube_search_page(
+                    query["search_mode"],
+                    query["keyword"],
+                    query["category_id"],
+                    page_token,
+                    api_key,
+                    query["region_code"],
+                )
+                page = {
+                    "page_index": page_index,
+                    "channel_ids": list(dict.fromkeys(channel_ids)),
+                    "channels": [],
+                    "next_page_token": next_page_token,
+                    "units": units,
+                    "calls": [{"endpoint": "videos", "units": units}],
+                    "cached": False,
+                }
+            pages.append(page)
+            page_token = page["next_page_token"]
+            found += len(page["channel_ids"])
+            if found >= max_results or not page_token:
+                break
+    except Exception as exc:
+        error = str(exc)
+    return {"pages": pages, "error": error}
+
+
+def youtube_most_popular_queries(category_names: list[str], region_names: list[str], keyword: str = "") -> list[dict[str, str]]:
+    return [
+        youtube_search_query(
+            "カテゴリー",
+            keyword,
+            YOUTUBE_VIDEO_CATEGORIES[category_name],
+            f"カテゴリー: {category_name}" + ("" if region_name == "日本" else f"（{region_name}）"),
+            YOUTUBE_REGIONS[region_name],
+        )
+        for region_name in region_names
+        for category_name in category_names
+    ]
+
+
+def sweep_youtube_most_popular(
+    queries: list[dict[str, str]],
+    min_subs: int,
+    max_subs: int,
+    max_results: int = 50,
+    max_workers: int = 8,
+    progress_callback=None,
+) -> dict:
+    max_results = max(1, min(max_results, 200))
+    max_pages = max(1, (max_results + 49) // 50)
+    api_key = get_secret("YOUTUBE_API_KEY", "")
+    cached_by_query = []
+    for query in queries:
+        cache_key = youtube_search_cache_key(query["search_mode"], query["keyword"], query["category_id"], query["region_code"])
+        cached_pages = {}
+        for page_index in range(max_pages):
+            cached = get_cached_youtube_search_page(cache_key, page_index)
+            if cached is None:
+                break
+            cached_pages[page_index] = cached
+        cached_by_query.append((cache_key, cached_pages))
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+        collected = list(
+            pool.map(
+                lambda index: collect_youtube_video_pages(queries[index], max_results, cached_by_query[index][1], api_key),
+                range(len(queries)),
+            )
+        )
+        known_channels = {
+            channel["channel_id"]: channel
+            for result in collected
+            for page in result["pages"]
+            if page["cached"]
+            for channel in page["channels"]
+        }
+        missing_ids = list(
+            dict.fromkeys(
+                channel_id
+                for result in collected
+                for page in result["pages"]
+                if not page["cached"]
+                for channel_id in page["channel_ids"]
+                if channel_id not in known_channels
+            )
+        )
+        detail_futures = [
+            (missing_ids[start : start + 50], pool.submit(fetch_youtube_channel_details, missing_ids[start : start + 50], api_key))
+            for start in range(0, len(missing_ids), 50)
+        ]
+        details_error = ""
+        failed_ids: set[str] = set()
+        detail_calls = []
+        for batch_ids, future in detail_futures:
+            try:
+                for channel in future.result():
+                    known_channels[channel["channel_id"]] = channel
+                detail_calls.append({"endpoint": "channels", "units": 1, "search_mode": "カテゴリー", "keyword": "カテゴリー一括"})
+            except Exception as exc:
+                details_error = details_error or str(exc)
+                failed_ids.update(batch_ids)
+
+    results = []
+    seen_channel_ids: set[str] = set()
+    calls = list(detail_calls)
+    for index, (query, result) in enumerate(zip(queries, collected), start=1):
+        cache_key = cached_by_query[index - 1][0]
+        found = saved = duplicates = units_used = 0
+        query_error = result["error"]
+        for page in result["pages"]:
+            units_used += page["units"]
+            calls.extend({**call, "search_mode": query["search_mode"], "keyword": query["label"]} for call in page["calls"])
+            page_channels = [known_channels[channel_id] for channel_id in page["channel_ids"] if channel_id in known_channels]
+            if not page["cached"]:
+                if failed_ids.intersection(page["channel_ids"]):
+                    query_error = query_error or details_error
+                    continue
+                save_youtube_search_page(cache_key, page["page_index"], page["channel_ids"], page_channels, page["next_page_token"])
+            page_ids = page["channel_ids"][: max_results - found]
+            found += len(page_ids)
+            new_ids = [channel_id for channel_id in page_ids if channel_id not in seen_channel_ids]
+            duplicates += len(page_ids) - len(new_ids)
+            seen_channel_ids.update(new_ids)
+            saved += save_youtube_channel_page(page_channels, new_ids, min_subs, max_subs, query["label"])
+        results.append(
+            {
+                "label": query["label"],
+                "found": found,
+                "saved": saved,
+                "duplicates": duplicates,
+                "units_used": units_used,
+                "error": query_error,
+            }
+        )
+        if progress_callback:
+            progress_callback(index, len(queries), results[-1])
+    record_youtube_api_calls(calls)
+    return {
+        "results": results,
+        "channel_units": len(detail_calls),
+        "units_used": sum(result["units_used"] for result in results) + len(detail_calls),
+        "unique_channels": len(seen_channel_ids),
+    }
+
+
+@st.cache_resource
+def background_task_registry() -> dict:
+    return {"lock": threading.Lock(), "tasks": {}}
+
+
+def run_background_task(status: dict, target, args: tuple) -> None:
+    try:
+        target(status, *args)
+        status["state"] = "done"
+    except Exception as exc:
+        status["state"] = "failed"
+        status["error"] = str(exc)
+    finally:
+        status["finished_at"] = now_iso()
+
+
+def start_background_task(task_key: str, target, *args) -> bool:
+    registry = background_task_registry()
+    with registry["lock"]:
+        task = registry["tasks"].get(task_key)
+        if task and task["thread"].is_alive():
+            return False
+        status = {"state": "running", "started_at": now_iso(), "finished_at": "", "error": "", "progress": {}}
+        thread = threading.Thread(target=run_background_task, args=(status, target, args), daemon=True)
+        registry["tasks"][task_key] = {"thread": thread, "status": status}
+        thread.start()
+    return True
+
+
+def background_task_status(task_key: str) -> dict:
+    task = background_task_registry()["tasks"].get(task_key)
+    return task["status"] if task else {}
+
+
+YOUTUBE_STATS_REFRESH_MODE = "統計更新"
+
+
+def get_youtube_stats_refresh_days() -> int:
+    value = get_setting("YOUTUBE_STATS_REFRESH_DAYS", "7")
+    try:
+        return max(1, int(value))
+    except ValueError:
+        return 7
+
+
+def get_youtube_stats_refresh_share() -> int:
+    value = get_setting("YOUTUBE_STATS_REFRESH_SHARE", "5")
+    try:
+        return max(0, min(100, int(value)))
+    except ValueError:
+        return 5
+
+
+def youtube_stats_refresh_units_used(date_key: str | None = None) -> int:
+    result = rows(
+        """
+        select coalesce(sum(units), 0) as units
+        from youtube_api_calls
+        where user_id = ? and usage_date = ? and search_mode = ?
+        """,
+        (current_user_id(), date_key or youtube_quota_day_key(), YOUTUBE_STATS_REFRESH_MODE),
+    )
+    return int(result[0]["units"] or 0) if result else 0
+
+
+def youtube_stats_refresh_budget() -> int:
+    daily_limit = get_youtube_daily_limit()
+    share_units = daily_limit * get_youtube_stats_refresh_share() // 100
+    remaining_share = share_units - youtube_stats_refresh_units_used()
+    remaining_daily = daily_limit - get_youtube_units_used()
+    return max(0, min(remaining_share, remaining_daily))
+
+
+def youtube_stats_stale_before() -> str:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=get_youtube_stats_refresh_days())
+    return cutoff.isoformat(timespec="seconds")
+
+
+STALE_YOUTUBE_CHANNELS_SQL = """
+    select
+        youtube_channel_id as channel_id,
+        case when coalesce(contact_status, '送信対象') in ('未確認', 'メール確認済み', '送信対象') then 0 else 2 end as priority,
+        coalesce(nullif(youtube_stats_updated_at, ''), created_at) as stats_at
+    from contacts
+    where user_id = ?
+      and youtube_channel_id != ''
+      and coalesce(contact_status, '送信対象') != '除外'
+      and unsubscribed = 0
+      and coalesce(nullif(youtube_stats_updated_at, ''), created_at) < ?
+    union all
+    select
+        channel_id,
+        1 as priority,
+        coalesce(nullif(stats_updated_at, ''), created_at) as stats_at
+    from youtube_candidates
+    where user_id = ?
+      and channel_id != ''
+      and coalesce(nullif(stats_updated_at, ''), created_at) < ?
+"""
+
+
+def stale_youtube_channel_ids(db: sqlite3.Connection, user_id: str, stale_before: str, limit: int = 50) -> list[str]:
+    return [
+        str(row[0])
+        for row in db.execute(
+            f"""
+            select channel_id, min(priority) as priority, min(stats_at) as stats_at
+            from ({STALE_YOUTUBE_CHANNELS_SQL})
+            group by channel_id
+            order by priority asc, stats_at asc
+            limit ?
+            """,
+            (user_id, stale_before, user_id, stale_before, int(limit)),
+        )
+    ]
+
+
+def count_stale_youtube_channels(stale_before: str | None = None) -> int:
+    cutoff = stale_before or youtube_stats_stale_before()
+    user_id = current_user_id()
+    with sqlite3.connect(DB_PATH) as db:
+        row = db.execute(
+            f"select count(distinct channel_id) from ({STALE_YOUTUBE_CHANNELS_SQL})",
+            (user_id, cutoff, user_id, cutoff),
+        ).fetchone()
+    return int(row[0] or 0)
+
+
+def apply_youtube_channel_stats(db: sqlite3.Connection, user_id: str, channel_ids: list[str], channels: list[dict]) -> None:
+    updated_at = now_iso()
+    by_id = {channel["channel_id"]: channel for channel in channels}
+    db.executemany(
+        """
+        update youtube_candidates
+        set subscriber_count = ?, video_count = ?, view_count = ?, stats_updated_at = ?
+        where user_id = ? and channel_id = ?
+        """,
+        [
+            (channel["subscriber_count"], channel["video_count"], channel["view_count"], updated_at, user_id, channel_id)
+            for channel_id, channel in by_id.items()
+        ],
+    )
+    db.executemany(
+        """
+        update contacts
+        set youtube_subscriber_count = ?, youtube_video_count = ?, youtube_view_count = ?, youtube_stats_updated_at = ?
+        where user_id = ? and youtube_channel_id = ?
+        """,
+        [
+            (channel["subscriber_count"], channel["video_count"], channel["view_count"], updated_at, user_id, channel_id)
+            for channel_id, channel in by_id.items()
+        ],
+    )
+    missing_ids = [(updated_at, user_id, channel_id) for channel_id in channel_ids if channel_id not in by_id]
+    db.executemany("update youtube_candidates set stats_updated_at = ? where user_id = ? and channel_id = ?", missing_ids)
+    db.executemany("update contacts set youtube_stats_updated_at = ? where user_id = ? and youtube_channel_id = ?", missing_ids)
+    db.commit()
+
+
+def refresh_youtube_channel_stats(status: dict, user_id: str, api_key: str, budget_units: int, stale_before: str) -> None:
+    progress = status["progress"]
+    progress.update({"refreshed": 0, "units_used": 0, "budget_units": int(budget_units)})
+    while progress["units_used"] < int(budget_units):
+        with sqlite3.connect(DB_PATH) as db:
+            channel_ids = stale_youtube_channel_ids(db, user_id, stale_before)
+        if not channel_ids:
+            break
+        channels = fetch_youtube_channel_details(channel_ids, api_key)
+        write_youtube_api_calls(
+            user_id,
+            [{"endpoint": "channels", "units": 1, "search_mode": YOUTUBE_STATS_REFRESH_MODE, "keyword": YOUTUBE_STATS_REFRESH_MODE}],
+        )
+        with sqlite3.connect(DB_PATH) as db:
+            apply_youtube_channel_stats(db, user_id, channel_ids, channels)
+        progress["units_used"] += 1
+        progress["refreshed"] += len(channel_ids)
+
+
+def youtube_stats_refresh_task_key() -> str:
+    return f"youtube_stats_refresh::{current_user_id()}"
+
+
+def start_youtube_stats_refresh() -> bool:
+    api_key = get_secret("YOUTUBE_API_KEY", "")
+    budget_units = youtube_stats_refresh_budget()
+    if not api_key or budget_units <= 0:
+        return False
+    return start_background_task(
+        youtube_stats_refresh_task_key(),
+        refresh_youtube_channel_stats,
+        current_user_id(),
+        api_key,
+        budget_units,
+        youtube_stats_stale_before(),
+    )
+
+
+def sync_youtube_stats_refresh_state() -> None:
+    status = background_task_status(youtube_stats_refresh_task_key())
+    if status.get("state") in ("done", "failed") and status.get("progress", {}).get("units_used") and not status.get("synced"):
+        status["synced"] = True
+        mark_app_state_dirty()
+
+
+def maybe_start_youtube_stats_refresh() -> None:
+    if not parse_bool(get_setting("YOUTUBE_STATS_REFRESH_AUTO", "false")):
+        return
+    status = background_task_status(youtube_stats_refresh_task_key())
+    if status.get("state") == "running":
+        return
+    finished_at = str(status.get("finished_at") or "")
+    if finished_at and datetime.fromisoformat(finished_at) > datetime.now(timezone.utc) - timedelta(hours=1):
+        return
+    start_youtube_stats_refresh()
+
+
+YOUTUBE_CRAWL_MODE = "関連チャンネル"
+
+
+def seed_youtube_crawl_frontier() -> int:
+    user_id = current_user_id()
+    timestamp = now_iso()
+    with sqlite3.connect(DB_PATH) as db:
+        cursor = db.execute(
+            """
+            insert or ignore into youtube_crawl_frontier
+            (user_id, channel_id, source_channel_id, depth, status, created_at, updated_at)
+            select user_id, channel_id, '', 0, 'queued', ?, ?
+            from youtube_candidates
+            where user_id = ? and channel_id != ''
+            """,
+            (timestamp, timestamp, user_id),
+        )
+        db.commit()
+    return max(0, cursor.rowcount)
+
+
+def count_youtube_crawl_frontier(max_depth: int) -> dict[str, int]:
+    result = rows(
+        """
+        select
+            coalesce(sum(case when status = 'new' then 1 else 0 end), 0) as new_count,
+            coalesce(sum(case when status = 'queued' and depth < ? then 1 else 0 end), 0) as queued_count,
+            coalesce(sum(case when status = 'done' then 1 else 0 end), 0) as done_count
+        from youtube_crawl_frontier
+        where user_id = ?
+        """,
+        (int(max_depth), current_user_id()),
+    )
+    row = result[0]
+    return {"new": int(row["new_count"]), "queued": int(row["queued_count"]), "done": int(row["done_count"])}
+
+
+def clear_youtube_crawl_frontier() -> None:
+    with sqlite3.connect(DB_PATH) as db:
+        db.execute("delete from youtube_crawl_frontier where user_id = ?", (current_user_id(),))
+        db.commit()
+
+
+def fetch_youtube_featured_channel_ids(channel_ids: list[str], api_key: str = "") -> dict[str, list[str]]:
+    if not channel_ids:
+        return {}
+    channel_data = youtube_api_get(
+        "channels",
+        {
+            "part": "brandingSettings",
+            "id": ",".join(channel_ids),
+            "maxResults": 50,
+        },
+        api_key,
+    )
+    featured = {}
+    for item in channel_data.get("items", []):
+        urls = item.get("brandingSettings", {}).get("channel", {}).get("featuredChannelsUrls", [])
+        featured[item["id"]] = [str(url) for url in urls if url]
+    return featured
+
+
+def fetch_youtube_section_channel_ids(channel_id: str, api_key: str = "") -> list[str]:
+    section_data = youtube_api_get(
+        "channelSections",
+        {
+            "part": "contentDetails",
+            "channelId": channel_id,
+        },
+        api_key,
+    )
+    related_ids = []
+    for item in section_data.get("items", []):
+        related_ids.extend(str(related_id) for related_id in item.get("contentDetails", {}).get("channels", []) if related_id)
+    return related_ids
+
+
+def expand_youtube_crawl_frontier(
+    db: sqlite3.Connection,
+    user_id: str,
+    budget_units: int,
+    max_depth: int,
+    api_key: str,
+    max_workers: int,
+) -> tuple[int, int, list[dict], str]:
+    batch_size = min(50, budget_units - 1)
+    if batch_size <= 0:
+        return 0, 0, [], ""
+    frontier = db.execute(
+        """
+        select channel_id, depth from youtube_crawl_frontier
+        where user_id = ? and status = 'queued' and depth < ?
+        order by depth asc, id asc
+        limit ?
+        """,
+        (user_id, int(max_depth), batch_size),
+    ).fetchall()
+    if not frontier:
+        return 0, 0, [], ""
+    channel_ids = [str(row[0]) for row in frontier]
+    featured = fetch_youtube_featured_channel_ids(channel_ids, api_key)
+    calls = [{"endpoint": "channels", "units": 1}]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        section_futures = {channel_id: pool.submit(fetch_youtube_section_channel_ids, channel_id, api_key) for channel_id in channel_ids}
+    discovered = []
+    failed_ids = []
+    retry_ids = []
+    for channel_id, depth in frontier:
+        try:
+            related_ids = section_futures[channel_id].result() + featured.get(channel_id, [])
+        except Exception as exc:
+            if "quotaExceeded" in str(exc) or "dailyLimitExceeded" in str(exc):
+                retry_ids.append(channel_id)
+            else:
+                calls.append({"endpoint": "channelSections", "units": 1})
+                failed_ids.append(channel_id)
+            continue
+        calls.append({"endpoint": "channelSections", "units": 1})
+        discovered.extend((channel_id, related_id, int(depth) + 1) for related_id in dict.fromkeys(related_ids) if related_id != channel_id)
+    timestamp = now_iso()
+    before = db.total_changes
+    db.executemany(
+        """
+        insert or ignore into youtube_crawl_frontier
+        (user_id, channel_id, source_channel_id, depth, status, created_at, updated_at)
+        values (?, ?, ?, ?, 'new', ?, ?)
+        """,
+        [(user_id, related_id, source_id, depth, timestamp, timestamp) for source_id, related_id, depth in discovered],
+    )
+    discovered_count = db.total_changes - before
+    db.executemany(
+        "update youtube_crawl_frontier set status = ?, updated_at = ? where user_id = ? and channel_id = ?",
+        [
+            ("failed" if channel_id in failed_ids else "done", timestamp, user_id, channel_id)
+            for channel_id in channel_ids
+            if channel_id not in retry_ids
+        ],
+    )
+    db.commit()
+    error = "YouTube APIの1日上限に達したため、関連チャンネルの探索を中断しました" if retry_ids else ""
+    return len(channel_ids) - len(retry_ids), discovered_count, calls, error
+
+
+def crawl_youtube_related_channels(
+    min_subs: int,
+    max_subs: int,
+    budget_units: int,
+    max_depth: int = 2,
+    max_workers: int = 4,
+    progress_callback=None,
+) -> dict[str, int]:
+    user_id = current_user_id()
+    api_key = get_secret("YOUTUBE_API_KEY", "")
+    seed_youtube_crawl_frontier()
+    summary = {"expanded": 0, "discovered": 0, "checked": 0, "saved": 0, "units_used": 0, "error": ""}
+    while summary["units_used"] < budget_units and not summary["error"]:
+        with sqlite3.connect(DB_PATH) as db:
+            new_ids = [
+                str(row[0])
+                for row in db.execute(
+                    "select channel_id from youtube_crawl_frontier where user_id = ? and status = 'new' order by depth asc, id asc limit 50",
+                    (user_id,),
+                )
+            ]
+        if new_ids:
+            with sqlite3.connect(DB_PATH) as db:
+                existing = existing_youtube_channel_ids(db, new_ids)
+            unknown_ids = [channel_id for channel_id in new_ids if channel_id not in existing]
+            calls = []
+            if unknown_ids:
+                channels = fetch_youtube_channel_details(unknown_ids, api_key)
+                calls.append({"endpoint": "channels", "units": 1})
+                summary["checked"] += len(unknown_ids)
+                summary["saved"] += save_youtube_channel_page(channels, unknown_ids, min_subs, max_subs, YOUTUBE_CRAWL_MODE)
+            with sqlite3.connect(DB_PATH) as db:
+                db.execute(
+                    f"update youtube_crawl_frontier set status = 'queued', updated_at = ? where user_id = ? and channel_id in ({', '.join(['?'] * len(new_ids))})",
+                    (now_iso(), user_id, *new_ids),
+                )
+                db.commit()
+        else:
+            with sqlite3.connect(DB_PATH) as db:
+                expanded, discovered, calls, summary["error"] = expand_youtube_crawl_frontier(
+                    db,
+                    user_id,
+                    budget_units - summary["units_used"],
+                    max_depth,
+                    api_key,
+                    max_workers,
+                )
+            if not calls:
+                break
+            summary["expanded"] += expanded
+            summary["discovered"] += discovered
+        record_youtube_api_calls([{**call, "search_mode": YOUTUBE_CRAWL_MODE, "keyword": YOUTUBE_CRAWL_MODE} for call in calls])
+        summary["units_used"] += sum(call["units"] for call in calls)
+        if progress_callback:
+            progress_callback(summary)
+    return summary
+
+
+def youtube_search_page_cost(search_mode: str) -> int:
+    return 2 if search_mode == "カテゴリー" else 101
+
+
+def load_youtube_search_page(query: dict[str, str], page_index: int, page_token: str) -> tuple[dict, int]:
+    cache_key = youtube_search_cache_key(query["search_mode"], query["keyword"], query["category_id"], query["region_code"])
+    cached = get_cached_youtube_search_page(cache_key, page_index)
+    if cached is not None:
+        return {**cached, "calls": []}, 0
+    raw_channel_ids, next_page_token, units_used = fetch_youtube_search_page(
+        query["search_mode"],
+        query["keyword"],
+        query["category_id"],
+        page_token,
+        region_code=query["region_code"],
+    )
+    calls = [{"endpoint": "videos" if query["search_mode"] == "カテゴリー" else "search", "units": units_used}]
+    channel_ids = list(dict.fromkeys(raw_channel_ids))
+    channels = []
+    if channel_ids:
+        try:
+            channels = fetch_youtube_channel_details(channel_ids)
+        except Exception:
+            record_youtube_api_calls(
+                [{**call, "search_mode": query["search_mode"], "keyword": query["label"]} for call in calls]
+            )
+            raise
+        units_used += 1
+        calls.append({"endpoint": "channels", "units": 1})
+    save_youtube_search_page(cache_key, page_index, channel_ids, channels, next_page_token)
+    return {"channel_ids": channel_ids, "channels": channels, "next_page_token": next_page_token, "calls": calls}, units_used
+
+
+def create_youtube_search_jobs(queries: list[dict[str, str]], min_subs: int, max_subs: int, max_results: int) -> int:
+    created = 0
+    for query in queries:
+        execute(
+            """
+            insert into youtube_search_jobs
+            (user_id, search_mode, keyword, category_id, region_code, label, min_subs, max_subs, max_results, status, created_at, updated_at)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?)
+            """,
+            (
+                current_user_id(),
+                query["search_mode"],
+                query["keyword"],
+                query["category_id"],
+                query["region_code"],
+                query["label"],
+                int(min_subs),
+                int(max_subs),
+                max(1, min(int(max_results), 200)),
+                now_iso(),
+                now_iso(),
+            ),
+        )
+        created += 1
+    return created
+
+
+def fetch_youtube_search_jobs() -> list[sqlite3.Row]:
+    return rows(
+        """
+        select *
+        from youtube_search_jobs
+        where user_id = ?
+        order by id asc
+        """,
+        (current_user_id(),),
+    )
+
+
+def fetch_due_youtube_search_jobs() -> list[sqlite3.Row]:
+    return rows(
+        """
+        select *
+        from youtube_search_jobs
+        where user_id = ? and status in ('queued', 'deferred') and not_before <= ?
+        order by id asc
+        """,
+        (current_user_id(), now_iso()),
+    )
+
+
+def youtube_search_job_remaining_units(job: sqlite3.Row) -> int:
+    if job["status"] in ("done", "failed"):
+        return 0
+    max_pages = max(1, (int(job["max_results"]) + 49) // 50)
+    remaining_pages = max(0, max_pages - int(job["next_page_index"]))
+    return remaining_pages * youtube_search_page_cost(job["search_mode"])
+
+
+def delete_youtube_search_job(job_id: int) -> None:
+    execute("delete from youtube_search_jobs where user_id = ? and id = ?", (current_user_id(), int(job_id)))
+
+
+def delete_finished_youtube_search_jobs() -> None:
+    execute("delete from youtube_search_jobs where user_id = ? and status in ('done', 'failed')", (current_user_id(),))
+
+
+def run_youtube_search_job(job: sqlite3.Row, deadline: float) -> str:
+    query = youtube_search_query(job["search_mode"], job["keyword"], job["category_id"], job["label"], job["region_code"])
+    max_results = int(job["max_results"])
+    max_pages = max(1, (max_results + 49) // 50)
+    page_index = int(job["next_page_index"])
+    page_token = str(job["next_page_token"] or "")
+    found = int(job["found"])
+    saved = int(job["saved"])
+    units_used = int(job["units_used"])
+    status = "queued"
+    not_before = ""
+    error = ""
+
+    while True:
+        if found >= max_results or page_index >= max_pages:
+            status = "done"
+            break
+        if time.monotonic() >= deadline:
+            break
+        cache_key = youtube_search_cache_key(query["search_mode"], query["keyword"], query["category_id"], query["region_code"])
+        page_cost = 0 if get_cached_youtube_search_page(cache_key, page_index) is not None else youtube_search_page_cost(query["search_mode"])
+        if page_cost and get_youtube_units_used() + page_cost > get_youtube_daily_limit():
+            status = "deferred"
+            not_before = next_youtube_quota_reset().astimezone(timezone.utc).isoformat(timespec="seconds")
+            break
+        try:
+            page, page_units = load_youtube_search_page(query, page_index, page_token)
+        except Exception as exc:
+            if "quotaExceeded" in str(exc) or "dailyLimitExceeded" in str(exc):
+                status = "deferred"
+                not_before = next_youtube_quota_reset().astimezone(timezone.utc).isoformat(timespec="seconds")
+            else:
+                status = "failed"
+                error = str(exc)
+            break
+        if page_units:
+            record_youtube_api_calls(
+                [{**call, "search_mode": query["search_mode"], "keyword": query["label"]} for call in page["calls"]]
+            )
+            units_used += page_units
+        page_ids = page["channel_ids"][: max_results - found]
+        saved += save_youtube_channel_page(page["channels"], page_ids, int(job["min_subs"]), int(job["max_subs"]), query["label"])
+        found += len(page_ids)
+        page_index += 1
+        page_token = page["next_page_token"]
+        if not page_token:
+            status = "done"
+            break
+        execute(
+            """
+            update youtube_search_jobs
+            set next_page_index = ?, next_page_token = ?, found = ?, saved = ?, units_used = ?, updated_at = ?
+            where user_id = ? and id = ?
+            """,
+            (page_index, page_token, found, saved, units_used, now_iso(), current_user_id(), int(job["id"])),
+        )
+
+    execute(
+        """
+        update youtube_search_jobs
+        set status = ?, next_page_index = ?, next_page_token = ?, found = ?, saved = ?, units_used = ?,
+            error = ?, not_before = ?, updated_at = ?
+        where user_id = ? and id = ?
+        """,
+        (status, page_index, page_token, found, saved, units_used, error, not_before, now_iso(), current_user_id(), int(job["id"])),
+    )
+    return status
+
+
+def run_youtube_search_jobs(time_budget_seconds: int = 60) -> dict[str, int]:
+    deadline = time.monotonic() + max(1, int(time_budget_seconds))
+    summary = {"done": 0, "deferred": 0, "failed": 0, "queued": 0}
+    for job in fetch_due_youtube_search_jobs():
+        status = run_youtube_search_job(job, deadline)
+        summary[status] = summary.get(status, 0) + 1
+        if time.monotonic() >= deadline:
+            break
+    return summary
+
+
+def youtube_search_job_status_label(status: str) -> str:
+    return {
+        "queued": "実行待ち",
+        "deferred": "翌日に持ち越し",
+        "done": "完了",
+        "failed": "失敗",
+    }.get(str(status or ""), str(status or "不明"))
+
+
+def rows(query: str, params: tuple = ()) -> list[sqlite3.Row]:
+    with sqlite3.connect(DB_PATH) as db:
+        db.row_factory = sqlite3.Row
         return list(db.execute(query, params))
 
 
 def smtp_configured() -> bool:
-    account = active_smtp_account()
+    return smtp_account_configured(active_smtp_account())
+
+
+def smtp_account_configured(account: dict[str, str | int]) -> bool:
     return all(
         str(account.get(key) or "").strip()
         for key in ["smtp_host", "smtp_port", "sender_email", "smtp_pass"]
@@ -1943,186 +3590,1203 @@ def friendly_smtp_error(raw_error: str) -> str:
             ]
         )
 
-    bullet_list = "\n".join(f"- {reason}" for reason in reasons)
-    return f"SMTP送信に失敗しました。\n\n考えられる原因と直し方:\n{bullet_list}\n\n実際のエラー:\n`{message}`"
+    bullet_list = "\n".join(f"- {reason}" for reason in reasons)
+    return f"SMTP送信に失敗しました。\n\n考えられる原因と直し方:\n{bullet_list}\n\n実際のエラー:\n`{message}`"
+
+
+def classify_send_failure(raw_error: str) -> tuple[str, str]:
+    message = str(raw_error or "").strip()
+    lower = message.lower()
+    if not message:
+        return "不明", "送信ログに詳しいエラーが残っていません。送信元設定と宛先を確認してください。"
+    if "535" in lower or "authentication failed" in lower or "authentication unsuccessful" in lower:
+        return "SMTP認証エラー", "送信元メールアドレス、SMTPパスワード、アプリパスワードを確認してください。"
+    if "getaddrinfo" in lower or "name or service not known" in lower or "nodename" in lower:
+        return "SMTPサーバー名エラー", "SMTPサーバー名が正しいか確認してください。Xserverなら sv数字.xserver.jp の形式です。"
+    if "timed out" in lower or "connection refused" in lower or "network is unreachable" in lower:
+        return "接続エラー", "SMTPサーバー、ポート番号、SSL設定の組み合わせを確認してください。"
+    if "wrong version number" in lower or "unknown protocol" in lower or ("ssl" in lower and "wrong" in lower):
+        return "SSL/ポート設定エラー", "587ならSSL OFF、465ならSSL ONにしてください。"
+    if "starttls" in lower:
+        return "STARTTLSエラー", "587でSSL OFF、または465でSSL ONを試してください。"
+    if "sender address rejected" in lower or "relay access denied" in lower or "553" in lower:
+        return "送信元アドレス不一致", "送信元メールアドレスとSMTPアカウントが同じメールか確認してください。"
+    if "recipient address rejected" in lower or "user unknown" in lower or "mailbox unavailable" in lower or "550" in lower:
+        return "宛先メールアドレス不正", "宛先が存在しない、または受信拒否の可能性があります。削除または確認してください。"
+    if "quota" in lower or "rate limit" in lower or "too many" in lower or "daily" in lower or "421" in lower or "450" in lower or "451" in lower or "452" in lower:
+        return "送信制限の可能性", "短時間に送りすぎた可能性があります。件数を減らすか、送信間隔を長くしてください。"
+    if "spam" in lower or "blocked" in lower or "blacklist" in lower or "policy" in lower or "554" in lower:
+        return "迷惑メール判定/ポリシー拒否", "本文、URL、送信頻度、送信元ドメインの信頼性を見直してください。"
+    return "その他の送信エラー", "詳細エラーを確認し、SMTP設定・宛先・送信頻度を順番に確認してください。"
+
+
+def open_smtp_connection(account: dict[str, str | int]) -> smtplib.SMTP:
+    host = str(account.get("smtp_host") or "")
+    port = int(str(account.get("smtp_port") or "587"))
+    use_ssl = int(account.get("smtp_ssl") or 0) == 1
+    smtp = smtplib.SMTP_SSL(host, port, timeout=30) if use_ssl else smtplib.SMTP(host, port, timeout=30)
+    try:
+        if not use_ssl:
+            smtp.ehlo()
+            smtp.starttls()
+            smtp.ehlo()
+        smtp.login(str(account.get("sender_email") or ""), str(account.get("smtp_pass") or ""))
+    except Exception:
+        smtp.close()
+        raise
+    return smtp
+
+
+def check_smtp_login(account: dict[str, str | int] | None = None) -> tuple[bool, str]:
+    account = account or active_smtp_account()
+    if not smtp_account_configured(account):
+        return False, "送信元メール設定が未完了です。SMTPサーバー、ポート、送信元メールアドレス、SMTPパスワードを入力してください。"
+
+    try:
+        with open_smtp_connection(account):
+            pass
+        return True, "SMTPログイン確認OK"
+    except Exception as exc:
+        return False, friendly_smtp_error(str(exc))
+
+
+SMTP_SESSION_MAX_MESSAGES = 100
+SMTP_SESSION_IDLE_SECONDS = 60
+
+
+@st.cache_resource
+def smtp_session_pool() -> dict:
+    return {"lock": threading.Lock(), "idle": {}}
+
+
+def smtp_session_key(account: dict[str, str | int]) -> str:
+    fields = [str(account.get(key) or "") for key in ["smtp_host", "smtp_port", "smtp_ssl", "sender_email", "smtp_pass"]]
+    return hashlib.sha256("\n".join(fields).encode("utf-8")).hexdigest()
+
+
+def smtp_throttle_account_key(account: dict[str, str | int], user_id: str | None = None) -> str:
+    host = str(account.get("smtp_host") or "").strip().lower()
+    sender = str(account.get("sender_email") or "").strip().lower()
+    return f"{user_id or current_user_id()}/{host}/{sender}"
+
+
+def open_smtp_session(account: dict[str, str | int]) -> dict:
+    return {"key": smtp_session_key(account), "smtp": open_smtp_connection(account), "sent": 0, "released_at": 0.0}
+
+
+def close_smtp_session(session: dict) -> None:
+    try:
+        session["smtp"].quit()
+    except Exception:
+        session["smtp"].close()
+
+
+def acquire_smtp_session(account: dict[str, str | int]) -> dict:
+    key = smtp_session_key(account)
+    pool = smtp_session_pool()
+    expired = []
+    session = None
+    with pool["lock"]:
+        idle = pool["idle"].get(key, [])
+        while idle and session is None:
+            candidate = idle.pop()
+            if time.monotonic() - candidate["released_at"] < SMTP_SESSION_IDLE_SECONDS:
+                session = candidate
+            else:
+                expired.append(candidate)
+    for candidate in expired:
+        close_smtp_session(candidate)
+    return session or open_smtp_session(account)
+
+
+def release_smtp_session(session: dict) -> None:
+    if session["smtp"].sock is None or session["sent"] >= SMTP_SESSION_MAX_MESSAGES:
+        close_smtp_session(session)
+        return
+    session["released_at"] = time.monotonic()
+    pool = smtp_session_pool()
+    with pool["lock"]:
+        pool["idle"].setdefault(session["key"], []).append(session)
+
+
+def send_with_smtp_session(account: dict[str, str | int], message: EmailMessage) -> None:
+    session = acquire_smtp_session(account)
+    try:
+        for attempt in range(2):
+            try:
+                if session["sent"] and session["smtp"].rset()[0] != 250:
+                    session["smtp"].close()
+                session["smtp"].send_message(message)
+                session["sent"] += 1
+                return
+            except smtplib.SMTPException:
+                if attempt or session["smtp"].sock is not None:
+                    raise
+                close_smtp_session(session)
+                session = open_smtp_session(account)
+    finally:
+        release_smtp_session(session)
+
+
+def template_values(contact: sqlite3.Row, unsubscribe_url: str) -> dict[str, str]:
+    return {
+        "name": contact["name"] or "ご担当者",
+        "email": contact["email"],
+        "channel": contact["channel"] or "貴チャンネル",
+        "unsubscribe_url": unsubscribe_url,
+    }
+
+
+def ensure_unsubscribe_link_template(body_template: str) -> str:
+    if "${unsubscribe_url}" in body_template:
+        return body_template
+    return body_template.rstrip() + "\n\n不要な場合はこちらから配信停止できます。\n${unsubscribe_url}"
+
+
+def unsubscribe_mailto(reply_to: str, contact: sqlite3.Row) -> str:
+    subject = "配信停止希望"
+    body = (
+        "配信停止を希望します。\n\n"
+        f"対象メールアドレス: {contact['email']}\n"
+        f"チャンネル名: {contact['channel'] or '-'}\n"
+    )
+    return f"mailto:{reply_to}?subject={quote(subject)}&body={quote(body)}"
+
+
+def unsubscribe_reply_to(account: dict | None = None) -> str:
+    account = account or active_smtp_account()
+    return get_secret("UNSUBSCRIBE_EMAIL", "") or str(account.get("sender_email") or "")
+
+
+def unsubscribe_token_base_url() -> str:
+    if not supabase_configured():
+        return ""
+    return f"{supabase_config()['url'].rstrip('/')}/functions/v1/unsubscribe?token="
+
+
+def build_send_context(subject_template: str, body_template: str, account: dict | None = None) -> MappingProxyType:
+    account = dict(account or active_smtp_account())
+    return MappingProxyType(
+        {
+            "account": account,
+            "unsubscribe_base_url": unsubscribe_token_base_url(),
+            "unsubscribe_reply_to": unsubscribe_reply_to(account),
+            "subject": Template(subject_template),
+            "body": Template(ensure_unsubscribe_link_template(body_template)),
+        }
+    )
+
+
+def render_send_message(context: MappingProxyType, contact: sqlite3.Row) -> tuple[str, str]:
+    if context["unsubscribe_base_url"]:
+        unsubscribe_url = context["unsubscribe_base_url"] + quote(str(contact["token"]))
+    else:
+        unsubscribe_url = unsubscribe_mailto(context["unsubscribe_reply_to"], contact)
+    values = template_values(contact, unsubscribe_url)
+    return context["subject"].safe_substitute(values), context["body"].safe_substitute(values)
+
+
+def register_unsubscribe_tokens(contacts: list[sqlite3.Row], user_email: str, batch_size: int = 500) -> None:
+    if not supabase_configured() or not contacts:
+        return
+    updated_at = now_iso()
+    payload = [
+        {
+            "user_email": user_email,
+            "token": str(contact["token"]),
+            "contact_local_id": int(contact["id"]),
+            "contact_email": str(contact["email"] or "").strip().lower(),
+            "youtube_channel_id": str(contact["youtube_channel_id"] or ""),
+            "channel": str(contact["channel"] or ""),
+            "updated_at": updated_at,
+        }
+        for contact in contacts
+    ]
+    for start in range(0, len(payload), batch_size):
+        supabase_request(
+            "POST",
+            "unsubscribe_tokens?on_conflict=token",
+            payload[start : start + batch_size],
+            prefer="resolution=merge-duplicates,return=minimal",
+        )
+
+
+def next_window_start(moment: datetime, window_start: datetime_time) -> datetime:
+    return datetime.combine(moment.date() + timedelta(days=1), window_start, APP_TIMEZONE)
+
+
+def build_send_schedule(
+    send_count: int,
+    delay_seconds: int,
+    window_start: datetime_time,
+    window_end: datetime_time,
+) -> list[datetime]:
+    if send_count <= 0 or window_end <= window_start:
+        return []
+
+    scheduled_times = []
+    cursor = datetime.now(APP_TIMEZONE)
+    today_start = datetime.combine(cursor.date(), window_start, APP_TIMEZONE)
+    today_end = datetime.combine(cursor.date(), window_end, APP_TIMEZONE)
+
+    if cursor < today_start:
+        cursor = today_start
+    elif cursor >= today_end:
+        cursor = next_window_start(cursor, window_start)
+
+    for _ in range(send_count):
+        day_end = datetime.combine(cursor.date(), window_end, APP_TIMEZONE)
+        if cursor >= day_end:
+            cursor = next_window_start(cursor, window_start)
+        scheduled_times.append(cursor.astimezone(timezone.utc))
+        cursor = cursor + timedelta(seconds=int(delay_seconds))
+
+    return scheduled_times
+
+
+def format_local_datetime(value: datetime) -> str:
+    return value.astimezone(APP_TIMEZONE).strftime("%Y-%m-%d %H:%M")
+
+
+def build_email_message(account: dict[str, str | int], to_email: str, subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = smtp_mail_from(account)
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+def send_email(to_email: str, subject: str, body: str, account: dict[str, str | int] | None = None) -> tuple[bool, str]:
+    account = account or active_smtp_account()
+    if not smtp_account_configured(account):
+        return True, "DRY_RUN: SMTP設定がないため実送信はしていません"
+
+    try:
+        send_with_smtp_session(account, build_email_message(account, to_email, subject, body))
+        return True, "送信しました"
+    except Exception as exc:
+        return False, friendly_smtp_error(str(exc))
+
+
+SMTP_THROTTLE_CODES = {421, 450, 451, 452}
+SMTP_THROTTLE_RETRIES = 3
+SMTP_BACKPRESSURE_SECONDS = 30
+SMTP_BACKPRESSURE_MAX_SECONDS = 900
+SMTP_AUTH_PAUSE_SECONDS = 900
+SMTP_ADAPTIVE_MIN_FACTOR = 0.1
+SMTP_ADAPTIVE_RECOVERY_STREAK = 20
+SMTP_ADAPTIVE_RECOVERY_STEP = 1.25
+SMTP_UNLIMITED_THROTTLED_RATE_PER_MINUTE = 600
+
+
+def get_smtp_send_workers(user_id: str | None = None) -> int:
+    value = get_setting("SMTP_SEND_WORKERS", "2", user_id)
+    try:
+        return max(1, min(8, int(value)))
+    except ValueError:
+        return 2
+
+
+def get_smtp_account_rate_per_minute(user_id: str | None = None) -> int:
+    value = get_setting("SMTP_ACCOUNT_RATE_PER_MINUTE", "0", user_id)
+    try:
+        return max(0, int(value))
+    except ValueError:
+        return 0
+
+
+def get_smtp_domain_rate_per_minute(user_id: str | None = None) -> int:
+    value = get_setting("SMTP_DOMAIN_RATE_PER_MINUTE", "0", user_id)
+    try:
+        return max(0, int(value))
+    except ValueError:
+        return 0
+
+
+SMTP_SEND_ENGINES = {"標準（スレッド）": "threads", "高速（asyncio）": "asyncio"}
+SMTP_RESULT_BATCH_SIZE = 100
+SMTP_RESULT_FLUSH_SECONDS = 0.5
+
+
+def get_smtp_send_engine(user_id: str | None = None) -> str:
+    value = get_setting("SMTP_SEND_ENGINE", "threads", user_id)
+    return value if value in SMTP_SEND_ENGINES.values() else "threads"
+
+
+def get_smtp_async_sessions(user_id: str | None = None) -> int:
+    value = get_setting("SMTP_ASYNC_SESSIONS", "8", user_id)
+    try:
+        return max(1, min(64, int(value)))
+    except ValueError:
+        return 8
+
+
+SEND_QUEUE_MODES = {"Supabase（サーバー側で送信）": "supabase", "送信ワーカー（send_worker.py）": "local"}
+LOCAL_SEND_QUEUE_STALE_SECONDS = 600
+LOCAL_SEND_QUEUE_HEARTBEAT_SECONDS = 60
+
+
+def get_send_queue_mode(user_id: str | None = None) -> str:
+    if app_state_can_sync():
+        return "supabase"
+    value = get_setting("SEND_QUEUE_MODE", "", user_id)
+    if value in SEND_QUEUE_MODES.values():
+        return value
+    return "supabase" if supabase_configured() else "local"
+
+
+@st.cache_resource
+def smtp_rate_limiters() -> dict:
+    return {"lock": threading.Lock(), "buckets": {}, "paused_until": {}, "adaptive": {}}
+
+
+def recipient_domain(email: str) -> str:
+    return str(email).rsplit("@", 1)[-1].lower()
+
+
+def smtp_message_scopes(account_key: str, to_email: str) -> list[str]:
+    return [f"account:{account_key}", f"domain:{account_key}/{recipient_domain(to_email)}"]
+
+
+def smtp_adaptive_state(limiters: dict, scope_key: str) -> dict:
+    return limiters["adaptive"].setdefault(
+        scope_key,
+        {"factor": 1.0, "strikes": 0, "streak": 0, "auth_error": "", "auth_until": 0.0, "updated_at": ""},
+    )
+
+
+def reserve_rate_token(bucket_key: str, rate_per_minute: int) -> float:
+    limiters = smtp_rate_limiters()
+    now = time.monotonic()
+    with limiters["lock"]:
+        factor = limiters["adaptive"][bucket_key]["factor"] if bucket_key in limiters["adaptive"] else 1.0
+        if rate_per_minute <= 0:
+            if factor >= 1:
+                return 0.0
+            rate_per_minute = SMTP_UNLIMITED_THROTTLED_RATE_PER_MINUTE
+        rate = max(1.0, rate_per_minute * factor) / 60
+        bucket = limiters["buckets"].get(bucket_key)
+        if bucket is None:
+            bucket = {"tokens": 1.0, "updated_at": now}
+            limiters["buckets"][bucket_key] = bucket
+        bucket["tokens"] = min(1.0, bucket["tokens"] + (now - bucket["updated_at"]) * rate) - 1
+        bucket["updated_at"] = now
+        return max(0.0, -bucket["tokens"] / rate)
+
+
+def smtp_scopes_pause_remaining(scope_keys: list[str]) -> float:
+    limiters = smtp_rate_limiters()
+    with limiters["lock"]:
+        return max(limiters["paused_until"].get(scope_key, 0.0) for scope_key in scope_keys) - time.monotonic()
+
+
+def wait_for_smtp_scopes(scope_keys: list[str], cancelled: threading.Event) -> None:
+    while not cancelled.is_set():
+        remaining = smtp_scopes_pause_remaining(scope_keys)
+        if remaining <= 0:
+            return
+        cancelled.wait(remaining)
+
+
+def record_smtp_throttle(scope_key: str, backoff_seconds: float) -> float:
+    limiters = smtp_rate_limiters()
+    now = time.monotonic()
+    with limiters["lock"]:
+        paused_until = limiters["paused_until"].get(scope_key, 0.0)
+        if paused_until > now:
+            return paused_until - now
+        state = smtp_adaptive_state(limiters, scope_key)
+        seconds = min(SMTP_BACKPRESSURE_MAX_SECONDS, backoff_seconds * 2 ** state["strikes"])
+        state["factor"] = max(SMTP_ADAPTIVE_MIN_FACTOR, state["factor"] / 2)
+        state["strikes"] += 1
+        state["streak"] = 0
+        state["updated_at"] = now_iso()
+        limiters["paused_until"][scope_key] = now + seconds
+        limiters["buckets"][scope_key] = {"tokens": 0.0, "updated_at": now + seconds}
+        return seconds
+
+
+def record_smtp_success(scope_keys: list[str]) -> None:
+    limiters = smtp_rate_limiters()
+    with limiters["lock"]:
+        for scope_key in scope_keys:
+            state = limiters["adaptive"].get(scope_key)
+            if state is None:
+                continue
+            if state["auth_error"]:
+                state["auth_error"] = ""
+                state["updated_at"] = now_iso()
+            if state["factor"] >= 1 and not state["strikes"]:
+                continue
+            state["streak"] += 1
+            if state["streak"] >= SMTP_ADAPTIVE_RECOVERY_STREAK:
+                state["factor"] = min(1.0, state["factor"] * SMTP_ADAPTIVE_RECOVERY_STEP)
+                state["strikes"] = max(0, state["strikes"] - 1)
+                state["streak"] = 0
+                state["updated_at"] = now_iso()
+
+
+def record_smtp_auth_failure(account_key: str, error: str) -> None:
+    limiters = smtp_rate_limiters()
+    with limiters["lock"]:
+        state = smtp_adaptive_state(limiters, f"account:{account_key}")
+        state["auth_error"] = error
+        state["auth_until"] = time.monotonic() + SMTP_AUTH_PAUSE_SECONDS
+        state["updated_at"] = now_iso()
+
+
+def clear_smtp_auth_failure(account_key: str) -> None:
+    scope_key = f"account:{account_key}"
+    updated_at = now_iso()
+    limiters = smtp_rate_limiters()
+    with limiters["lock"]:
+        state = limiters["adaptive"].get(scope_key)
+        if state is not None and state["auth_error"]:
+            state.update(auth_error="", auth_until=0.0, updated_at=updated_at)
+    execute(
+        "update smtp_throttle_state set auth_error = '', auth_paused_until = '', updated_at = ? where user_id = ? and scope_key = ? and auth_error != ''",
+        (updated_at, current_user_id(), scope_key),
+    )
+
+
+def smtp_auth_paused_error(account_key: str) -> str:
+    limiters = smtp_rate_limiters()
+    with limiters["lock"]:
+        state = limiters["adaptive"].get(f"account:{account_key}")
+        if state is None or not state["auth_error"] or state["auth_until"] <= time.monotonic():
+            return ""
+        return state["auth_error"]
+
+
+def fetch_smtp_throttle_state() -> list[sqlite3.Row]:
+    return rows("select * from smtp_throttle_state where user_id = ? order by updated_at desc", (current_user_id(),))
+
+
+def smtp_throttle_scope_label(scope_key: str, account_labels: dict[str, str]) -> str:
+    kind, key = scope_key.split(":", 1)
+    if kind == "account":
+        return f"送信元 {account_labels.get(key) or key.split('/', 1)[-1]}"
+    account_key, domain = key.rsplit("/", 1)
+    return f"宛先ドメイン {domain}（{account_labels.get(account_key) or account_key.rsplit('/', 1)[-1]}）"
+
+
+def smtp_throttle_state_table() -> pd.DataFrame:
+    account_labels = {
+        smtp_throttle_account_key(account): str(account.get("label") or account.get("sender_email"))
+        for account in [active_smtp_account(), *(dict(row) for row in fetch_smtp_accounts())]
+    }
+    return pd.DataFrame(
+        [
+            {
+                "対象": smtp_throttle_scope_label(str(row["scope_key"]), account_labels),
+                "送信ペース": f"{float(row['rate_factor']):.0%}",
+                "送信制限の回数": int(row["strikes"]),
+                "再開予定": format_jst_datetime(max(str(row["paused_until"]), str(row["auth_paused_until"])))
+                if max(remaining_until(str(row["paused_until"])), remaining_until(str(row["auth_paused_until"]))) > 0
+                else "",
+                "停止理由": "SMTP認証エラー" if row["auth_error"] else "",
+            }
+            for row in fetch_smtp_throttle_state()
+        ]
+    )
+
+
+def reset_smtp_throttle_state() -> None:
+    user_id = current_user_id()
+    execute("delete from smtp_throttle_state where user_id = ?", (user_id,))
+    limiters = smtp_rate_limiters()
+    with limiters["lock"]:
+        for store in (limiters["adaptive"], limiters["paused_until"], limiters["buckets"]):
+            for scope_key in [key for key in store if key.split(":", 1)[1].startswith(f"{user_id}/")]:
+                store.pop(scope_key)
+
+
+def smtp_throttle_scope_keys(
+    account: dict[str, str | int],
+    messages: list[dict],
+    fallback_accounts: list[dict] | None = None,
+    user_id: str | None = None,
+) -> set[str]:
+    accounts = [account, *(fallback_accounts or []), *(message.get("account") for message in messages)]
+    account_keys = {smtp_throttle_account_key(item, user_id) for item in accounts if item}
+    domains = {recipient_domain(message["to_email"]) for message in messages}
+    return {f"account:{account_key}" for account_key in account_keys} | {
+        f"domain:{account_key}/{domain}" for account_key in account_keys for domain in domains
+    }
+
+
+def remaining_until(value: str) -> float:
+    if not value:
+        return 0.0
+    return (datetime.fromisoformat(value) - datetime.now(timezone.utc)).total_seconds()
+
+
+def load_smtp_throttle_state(user_id: str, scope_keys: set[str]) -> None:
+    if not scope_keys:
+        return
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        db.row_factory = sqlite3.Row
+        records = db.execute("select * from smtp_throttle_state where user_id = ?", (user_id,)).fetchall()
+    limiters = smtp_rate_limiters()
+    now = time.monotonic()
+    with limiters["lock"]:
+        for record in records:
+            scope_key = str(record["scope_key"])
+            if scope_key not in scope_keys:
+                continue
+            state = smtp_adaptive_state(limiters, scope_key)
+            if state["updated_at"] >= str(record["updated_at"]):
+                continue
+            state.update(
+                factor=max(SMTP_ADAPTIVE_MIN_FACTOR, min(1.0, float(record["rate_factor"]))),
+                strikes=int(record["strikes"]),
+                streak=0,
+                auth_error=str(record["auth_error"]),
+                auth_until=now + remaining_until(str(record["auth_paused_until"])),
+                updated_at=str(record["updated_at"]),
+            )
+            paused = remaining_until(str(record["paused_until"]))
+            if paused > 0:
+                limiters["paused_until"][scope_key] = max(limiters["paused_until"].get(scope_key, 0.0), now + paused)
+
+
+def save_smtp_throttle_state(user_id: str, scope_keys: set[str]) -> None:
+    limiters = smtp_rate_limiters()
+    now = time.monotonic()
+    wall_now = datetime.now(timezone.utc)
+    saved = []
+    cleared = []
+    with limiters["lock"]:
+        for scope_key in scope_keys:
+            state = limiters["adaptive"].get(scope_key)
+            if state is None or not state["updated_at"]:
+                continue
+            paused = limiters["paused_until"].get(scope_key, 0.0) - now
+            auth_paused = state["auth_until"] - now if state["auth_error"] else 0.0
+            if state["factor"] >= 1 and not state["strikes"] and paused <= 0 and auth_paused <= 0:
+                cleared.append((user_id, scope_key, state["updated_at"]))
+                continue
+            saved.append(
+                (
+                    user_id,
+                    scope_key,
+                    state["factor"],
+                    state["strikes"],
+                    (wall_now + timedelta(seconds=paused)).isoformat(timespec="seconds") if paused > 0 else "",
+                    state["auth_error"] if auth_paused > 0 else "",
+                    (wall_now + timedelta(seconds=auth_paused)).isoformat(timespec="seconds") if auth_paused > 0 else "",
+                    state["updated_at"],
+                )
+            )
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        db.executemany(
+            """
+            insert into smtp_throttle_state(user_id, scope_key, rate_factor, strikes, paused_until, auth_error, auth_paused_until, updated_at)
+            values (?, ?, ?, ?, ?, ?, ?, ?)
+            on conflict(user_id, scope_key) do update set
+                rate_factor = excluded.rate_factor,
+                strikes = excluded.strikes,
+                paused_until = excluded.paused_until,
+                auth_error = excluded.auth_error,
+                auth_paused_until = excluded.auth_paused_until,
+                updated_at = excluded.updated_at
+            where excluded.updated_at >= smtp_throttle_state.updated_at
+            """,
+            saved,
+        )
+        db.executemany("delete from smtp_throttle_state where user_id = ? and scope_key = ? and updated_at <= ?", cleared)
+
 
+def smtp_error_code(exc: Exception) -> int:
+    if aiosmtplib is not None and isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return min((int(error.code) for error in exc.recipients), default=0)
+    if aiosmtplib is not None and isinstance(exc, aiosmtplib.SMTPResponseException):
+        return int(exc.code)
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return int(exc.smtp_code)
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return min((int(code) for code, _ in exc.recipients.values()), default=0)
+    return 0
 
-def classify_send_failure(raw_error: str) -> tuple[str, str]:
-    message = str(raw_error or "").strip()
-    lower = message.lower()
-    if not message:
-        return "不明", "送信ログに詳しいエラーが残っていません。送信元設定と宛先を確認してください。"
-    if "535" in lower or "authentication failed" in lower or "authentication unsuccessful" in lower:
-        return "SMTP認証エラー", "送信元メールアドレス、SMTPパスワード、アプリパスワードを確認してください。"
-    if "getaddrinfo" in lower or "name or service not known" in lower or "nodename" in lower:
-        return "SMTPサーバー名エラー", "SMTPサーバー名が正しいか確認してください。Xserverなら sv数字.xserver.jp の形式です。"
-    if "timed out" in lower or "connection refused" in lower or "network is unreachable" in lower:
-        return "接続エラー", "SMTPサーバー、ポート番号、SSL設定の組み合わせを確認してください。"
-    if "wrong version number" in lower or "unknown protocol" in lower or ("ssl" in lower and "wrong" in lower):
-        return "SSL/ポート設定エラー", "587ならSSL OFF、465ならSSL ONにしてください。"
-    if "starttls" in lower:
-        return "STARTTLSエラー", "587でSSL OFF、または465でSSL ONを試してください。"
-    if "sender address rejected" in lower or "relay access denied" in lower or "553" in lower:
-        return "送信元アドレス不一致", "送信元メールアドレスとSMTPアカウントが同じメールか確認してください。"
-    if "recipient address rejected" in lower or "user unknown" in lower or "mailbox unavailable" in lower or "550" in lower:
-        return "宛先メールアドレス不正", "宛先が存在しない、または受信拒否の可能性があります。削除または確認してください。"
-    if "quota" in lower or "rate limit" in lower or "too many" in lower or "daily" in lower or "421" in lower or "450" in lower or "451" in lower or "452" in lower:
-        return "送信制限の可能性", "短時間に送りすぎた可能性があります。件数を減らすか、送信間隔を長くしてください。"
-    if "spam" in lower or "blocked" in lower or "blacklist" in lower or "policy" in lower or "554" in lower:
-        return "迷惑メール判定/ポリシー拒否", "本文、URL、送信頻度、送信元ドメインの信頼性を見直してください。"
-    return "その他の送信エラー", "詳細エラーを確認し、SMTP設定・宛先・送信頻度を順番に確認してください。"
 
+def smtp_failure_is_throttle(exc: Exception) -> bool:
+    return smtp_error_code(exc) in SMTP_THROTTLE_CODES or classify_send_failure(str(exc))[0] == "送信制限の可能性"
 
-def check_smtp_login() -> tuple[bool, str]:
-    if not smtp_configured():
-        return False, "送信元メール設定が未完了です。SMTPサーバー、ポート、送信元メールアドレス、SMTPパスワードを入力してください。"
 
-    account = active_smtp_account()
-    host = str(account.get("smtp_host") or "")
-    port = int(str(account.get("smtp_port") or "587"))
-    use_ssl = int(account.get("smtp_ssl") or 0) == 1
-    sender_email = str(account.get("sender_email") or "")
-    smtp_pass = str(account.get("smtp_pass") or "")
+def smtp_failure_is_auth(exc: Exception) -> bool:
+    if isinstance(exc, smtplib.SMTPAuthenticationError) or classify_send_failure(str(exc))[0] == "SMTP認証エラー":
+        return True
+    return aiosmtplib is not None and isinstance(exc, aiosmtplib.SMTPAuthenticationError)
 
-    try:
-        if use_ssl:
-            with smtplib.SMTP_SSL(host, port, timeout=30) as smtp:
-                smtp.login(sender_email, smtp_pass)
-        else:
-            with smtplib.SMTP(host, port, timeout=30) as smtp:
-                smtp.ehlo()
-                smtp.starttls()
-                smtp.ehlo()
-                smtp.login(sender_email, smtp_pass)
-        return True, "SMTPログイン確認OK"
-    except Exception as exc:
-        return False, friendly_smtp_error(str(exc))
 
+def smtp_throttle_scope(account_key: str, to_email: str, exc: Exception) -> str:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return f"domain:{account_key}/{recipient_domain(to_email)}"
+    if aiosmtplib is not None and isinstance(exc, (aiosmtplib.SMTPRecipientsRefused, aiosmtplib.SMTPRecipientRefused)):
+        return f"domain:{account_key}/{recipient_domain(to_email)}"
+    return f"account:{account_key}"
 
-def render_template(text: str, contact: sqlite3.Row, unsubscribe_url: str) -> str:
-    values = {
-        "name": contact["name"] or "ご担当者",
-        "email": contact["email"],
-        "channel": contact["channel"] or "貴チャンネル",
-        "unsubscribe_url": unsubscribe_url,
-    }
-    return Template(text).safe_substitute(values)
 
+def smtp_failure_needs_failover(exc: Exception) -> bool:
+    if smtp_failure_is_auth(exc):
+        return True
+    lower = str(exc).lower()
+    return smtp_error_code(exc) >= 500 and any(word in lower for word in ("quota", "daily", "limit exceeded"))
 
-def ensure_unsubscribe_link_template(body_template: str) -> str:
-    if "${unsubscribe_url}" in body_template:
-        return body_template
-    return body_template.rstrip() + "\n\n不要な場合はこちらから配信停止できます。\n${unsubscribe_url}"
 
+SMTP_BALANCE_POLICIES = {"重み付きラウンドロビン": "weighted", "最近使っていない順": "lru"}
+
+
+def smtp_usage_date(moment: datetime | None = None) -> str:
+    return (moment or datetime.now(APP_TIMEZONE)).astimezone(APP_TIMEZONE).date().isoformat()
 
-def build_unsubscribe_mailto(contact: sqlite3.Row) -> str:
-    account = active_smtp_account()
-    reply_to = get_secret("UNSUBSCRIBE_EMAIL", "") or str(account.get("sender_email") or "")
-    subject = "配信停止希望"
-    body = (
-        "配信停止を希望します。\n\n"
-        f"対象メールアドレス: {contact['email']}\n"
-        f"チャンネル名: {contact['channel'] or '-'}\n"
-    )
-    return f"mailto:{reply_to}?subject={quote(subject)}&body={quote(body)}"
 
+def fetch_smtp_account_usage(account_ids: list[int], usage_dates: list[str]) -> dict[tuple[int, str], sqlite3.Row]:
+    if not account_ids or not usage_dates:
+        return {}
+    account_placeholders = ", ".join(["?"] * len(account_ids))
+    date_placeholders = ", ".join(["?"] * len(usage_dates))
+    return {
+        (int(row["account_id"]), str(row["usage_date"])): row
+        for row in rows(
+            f"""
+            select account_id, usage_date, sent_count, exhausted, last_used_at
+            from smtp_account_usage
+            where user_id = ? and account_id in ({account_placeholders}) and usage_date in ({date_placeholders})
+            """,
+            (current_user_id(), *account_ids, *usage_dates),
+        )
+    }
 
-def build_unsubscribe_url(contact: sqlite3.Row) -> str:
-    if supabase_configured():
-        base_url = supabase_config()["url"].rstrip("/")
-        return f"{base_url}/functions/v1/unsubscribe?token={quote(str(contact['token']))}"
-    return build_unsubscribe_mailto(contact)
 
+SMTP_ACCOUNT_USAGE_UPSERT = """
+    insert into smtp_account_usage(user_id, account_id, usage_date, sent_count, exhausted, last_used_at)
+    values (?, ?, ?, ?, ?, ?)
+    on conflict(user_id, account_id, usage_date) do update set
+        sent_count = sent_count + excluded.sent_count,
+        exhausted = max(exhausted, excluded.exhausted),
+        last_used_at = case when excluded.sent_count > 0 then excluded.last_used_at else last_used_at end
+"""
 
-def register_unsubscribe_token(contact: sqlite3.Row, user_email: str) -> None:
-    if not supabase_configured():
+
+def record_smtp_account_usage(account_id: int, usage_date: str, sent: int = 1, exhausted: bool = False) -> None:
+    if not account_id:
         return
-    payload = {
-        "user_email": user_email,
-        "token": str(contact["token"]),
-        "contact_local_id": int(contact["id"]),
-        "contact_email": str(contact["email"] or "").strip().lower(),
-        "youtube_channel_id": str(contact["youtube_channel_id"] or ""),
-        "channel": str(contact["channel"] or ""),
-        "updated_at": now_iso(),
+    execute(SMTP_ACCOUNT_USAGE_UPSERT, (current_user_id(), int(account_id), usage_date, int(sent), 1 if exhausted else 0, now_iso()))
+
+
+def assign_smtp_accounts(accounts: list[dict], usage_dates: list[str], policy: str = "weighted") -> list[dict | None]:
+    account_ids = [int(account.get("id") or 0) for account in accounts]
+    usage = fetch_smtp_account_usage(account_ids, sorted(set(usage_dates)))
+    remaining: dict[tuple[int, str], int | None] = {}
+    for account, account_id in zip(accounts, account_ids):
+        cap = int(account.get("daily_cap") or 0)
+        for usage_date in set(usage_dates):
+            record = usage.get((account_id, usage_date))
+            if record is not None and int(record["exhausted"]):
+                remaining[(account_id, usage_date)] = 0
+            else:
+                remaining[(account_id, usage_date)] = max(0, cap - int(record["sent_count"] if record else 0)) if cap else None
+    last_used = {
+        account_id: (0, max((str(record["last_used_at"]) for key, record in usage.items() if key[0] == account_id), default=""))
+        for account_id in account_ids
     }
-    supabase_request(
-        "POST",
-        "unsubscribe_tokens?on_conflict=token",
-        payload,
-        prefer="resolution=merge-duplicates,return=minimal",
-    )
+    current_weight = {account_id: 0 for account_id in account_ids}
+    assigned: list[dict | None] = []
+    for position, usage_date in enumerate(usage_dates):
+        available = [
+            (account, account_id)
+            for account, account_id in zip(accounts, account_ids)
+            if remaining[(account_id, usage_date)] is None or remaining[(account_id, usage_date)] > 0
+        ]
+        if not available:
+            assigned.append(None)
+            continue
+        if policy == "lru":
+            account, account_id = min(available, key=lambda item: (last_used[item[1]], item[1]))
+            last_used[account_id] = (1, str(position).zfill(9))
+        else:
+            total_weight = sum(max(1, int(item[0].get("weight") or 1)) for item in available)
+            for item in available:
+                current_weight[item[1]] += max(1, int(item[0].get("weight") or 1))
+            account, account_id = max(available, key=lambda item: current_weight[item[1]])
+            current_weight[account_id] -= total_weight
+        if remaining[(account_id, usage_date)] is not None:
+            remaining[(account_id, usage_date)] -= 1
+        assigned.append(account)
+    return assigned
+
+
+def smtp_failover_pool(accounts: list[dict], usage_date: str, assigned: list[dict | None]) -> list[dict]:
+    usage = fetch_smtp_account_usage([int(account.get("id") or 0) for account in accounts], [usage_date])
+    pool = []
+    for account in accounts:
+        record = usage.get((int(account.get("id") or 0), usage_date))
+        if record is not None and int(record["exhausted"]):
+            continue
+        cap = int(account.get("daily_cap") or 0)
+        used = (int(record["sent_count"]) if record else 0) + sum(1 for item in assigned if item is account)
+        pool.append({**account, "remaining": max(0, cap - used) if cap else None})
+    return pool
+
+
+def send_messages_rate_limited(
+    account: dict[str, str | int],
+    messages: list[dict],
+    workers: int = 2,
+    account_rate_per_minute: int = 0,
+    domain_rate_per_minute: int = 0,
+    progress_callback=None,
+    backoff_seconds: float = SMTP_BACKPRESSURE_SECONDS,
+    fallback_accounts: list[dict] | None = None,
+    failover_callback=None,
+    cancelled: threading.Event | None = None,
+    user_id: str | None = None,
+) -> list[tuple[bool, str] | None]:
+    results: list[tuple[bool, str] | None] = [None] * len(messages)
+    if not smtp_account_configured(account):
+        for index in range(len(messages)):
+            results[index] = (True, "DRY_RUN: SMTP設定がないため実送信はしていません")
+            if progress_callback:
+                progress_callback(index, *results[index])
+        return results
+
+    user_id = user_id or current_user_id()
+    pending: queue.Queue = queue.Queue()
+    finished: queue.Queue = queue.Queue()
+    cancelled = cancelled or threading.Event()
+    stopped = threading.Event()
+    failover_lock = threading.Lock()
+    failed_accounts: dict[str, str] = {}
+    for index in range(len(messages)):
+        pending.put((index, 0))
+
+    def replacement_account(failed_account: dict, error: str) -> dict | None:
+        with failover_lock:
+            failed_key = smtp_session_key(failed_account)
+            if failed_key not in failed_accounts:
+                failed_accounts[failed_key] = error
+                finished.put(("failover", failed_account, error))
+            for candidate in fallback_accounts or []:
+                candidate_key = smtp_session_key(candidate)
+                if candidate_key in failed_accounts or candidate.get("remaining") == 0 or smtp_auth_paused_error(smtp_throttle_account_key(candidate, user_id)):
+                    continue
+                if candidate.get("remaining") is not None:
+                    candidate["remaining"] -= 1
+                return candidate
+        return None
 
+    def deliver_message(index: int, attempt: int) -> None:
+        message = messages[index]
+        message_account = message.get("account") or account
+        account_key = smtp_session_key(message_account)
+        throttle_key = smtp_throttle_account_key(message_account, user_id)
+        account_error = failed_accounts.get(account_key) or smtp_auth_paused_error(throttle_key)
+        if account_error:
+            replacement = replacement_account(message_account, account_error)
+            if replacement is None:
+                finished.put(("result", index, False, friendly_smtp_error(account_error)))
+            else:
+                message["account"] = replacement
+                pending.put((index, attempt))
+            return
+        scopes = smtp_message_scopes(throttle_key, message["to_email"])
+        wait_for_smtp_scopes(scopes, stopped)
+        delay = max(
+            reserve_rate_token(scopes[0], account_rate_per_minute),
+            reserve_rate_token(scopes[1], domain_rate_per_minute),
+        )
+        if stopped.wait(delay):
+            return
+        try:
+            send_with_smtp_session(
+                message_account,
+                build_email_message(message_account, message["to_email"], message["subject"], message["body"]),
+            )
+            record_smtp_success(scopes)
+            finished.put(("result", index, True, "送信しました"))
+        except Exception as exc:
+            if smtp_failure_is_auth(exc):
+                record_smtp_auth_failure(throttle_key, str(exc))
+            if fallback_accounts is not None and smtp_failure_needs_failover(exc):
+                replacement = replacement_account(message_account, str(exc))
+                if replacement is not None:
+                    message["account"] = replacement
+                    pending.put((index, attempt))
+                    return
+            if smtp_failure_is_throttle(exc):
+                record_smtp_throttle(smtp_throttle_scope(throttle_key, message["to_email"], exc), backoff_seconds)
+                if attempt < SMTP_THROTTLE_RETRIES:
+                    pending.put((index, attempt + 1))
+                    return
+            finished.put(("result", index, False, friendly_smtp_error(str(exc))))
+
+    def deliver() -> None:
+        while True:
+            item = pending.get()
+            if item is None or stopped.is_set() or cancelled.is_set():
+                return
+            index, attempt = item
+            try:
+                deliver_message(index, attempt)
+            except Exception as exc:
+                finished.put(("result", index, False, friendly_smtp_error(str(exc))))
 
-def next_window_start(moment: datetime, window_start: datetime_time) -> datetime:
-    return datetime.combine(moment.date() + timedelta(days=1), window_start, APP_TIMEZONE)
+    def record(event: tuple) -> None:
+        if event[0] == "failover":
+            if failover_callback:
+                failover_callback(event[1], event[2])
+            return
+        _, index, ok, result = event
+        results[index] = (ok, result)
+        if progress_callback:
+            progress_callback(index, ok, result)
 
+    worker_count = max(1, min(int(workers), len(messages)))
+    executor = ThreadPoolExecutor(max_workers=worker_count)
+    try:
+        for _ in range(worker_count):
+            executor.submit(deliver)
+        completed = 0
+        while completed < len(messages) and not cancelled.is_set():
+            try:
+                event = finished.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            completed += event[0] == "result"
+            record(event)
+    finally:
+        stopped.set()
+        for _ in range(worker_count):
+            pending.put(None)
+        executor.shutdown(wait=cancelled.is_set())
+    while not finished.empty():
+        record(finished.get_nowait())
+    return results
+
+
+async def open_async_smtp_client(account: dict[str, str | int]):
+    if aiosmtplib is None:
+        return await asyncio.to_thread(open_smtp_connection, account)
+    use_ssl = int(account.get("smtp_ssl") or 0) == 1
+    client = aiosmtplib.SMTP(
+        hostname=str(account.get("smtp_host") or ""),
+        port=int(str(account.get("smtp_port") or "587")),
+        use_tls=use_ssl,
+        start_tls=not use_ssl,
+        validate_certs=False,
+        timeout=30,
+    )
+    await client.connect()
+    try:
+        await client.login(str(account.get("sender_email") or ""), str(account.get("smtp_pass") or ""))
+    except Exception:
+        client.close()
+        raise
+    return client
 
-def build_send_schedule(
-    send_count: int,
-    delay_seconds: int,
-    window_start: datetime_time,
-    window_end: datetime_time,
-) -> list[datetime]:
-    if send_count <= 0 or window_end <= window_start:
-        return []
 
-    scheduled_times = []
-    cursor = datetime.now(APP_TIMEZONE)
-    today_start = datetime.combine(cursor.date(), window_start, APP_TIMEZONE)
-    today_end = datetime.combine(cursor.date(), window_end, APP_TIMEZONE)
+def async_smtp_client_connected(client) -> bool:
+    if isinstance(client, smtplib.SMTP):
+        return client.sock is not None
+    return client.is_connected
 
-    if cursor < today_start:
-        cursor = today_start
-    elif cursor >= today_end:
-        cursor = next_window_start(cursor, window_start)
 
-    for _ in range(send_count):
-        day_end = datetime.combine(cursor.date(), window_end, APP_TIMEZONE)
-        if cursor >= day_end:
-            cursor = next_window_start(cursor, window_start)
-        scheduled_times.append(cursor.astimezone(timezone.utc))
-        cursor = cursor + timedelta(seconds=int(delay_seconds))
+async def send_with_async_smtp_client(client, message: EmailMessage) -> None:
+    if isinstance(client, smtplib.SMTP):
+        await asyncio.to_thread(client.send_message, message)
+    else:
+        await client.send_message(message)
 
-    return scheduled_times
 
+async def reset_async_smtp_client(client) -> None:
+    try:
+        if isinstance(client, smtplib.SMTP):
+            if (await asyncio.to_thread(client.rset))[0] == 250:
+                return
+        else:
+            await client.rset()
+            return
+    except Exception:
+        pass
+    client.close()
 
-def format_local_datetime(value: datetime) -> str:
-    return value.astimezone(APP_TIMEZONE).strftime("%Y-%m-%d %H:%M")
 
+async def close_async_smtp_client(client) -> None:
+    try:
+        if isinstance(client, smtplib.SMTP):
+            await asyncio.to_thread(client.quit)
+        else:
+            await client.quit()
+    except Exception:
+        client.close()
 
-def send_email(to_email: str, subject: str, body: str) -> tuple[bool, str]:
-    if not smtp_configured():
-        return True, "DRY_RUN: SMTP設定がないため実送信はしていません"
 
-    account = active_smtp_account()
-    message = EmailMessage()
-    message["From"] = smtp_mail_from(account)
-    message["To"] = to_email
-    message["Subject"] = subject
-    message.set_content(body)
+async def wait_or_cancelled(cancelled: threading.Event, seconds: float) -> bool:
+    deadline = time.monotonic() + seconds
+    while not cancelled.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(remaining, 0.2))
+    return True
 
-    host = str(account.get("smtp_host") or "")
-    port = int(str(account.get("smtp_port") or "587"))
-    use_ssl = int(account.get("smtp_ssl") or 0) == 1
-    sender_email = str(account.get("sender_email") or "")
-    smtp_pass = str(account.get("smtp_pass") or "")
 
+async def send_messages_async(
+    account: dict[str, str | int],
+    messages: list[dict],
+    sessions: int = 8,
+    account_rate_per_minute: int = 0,
+    domain_rate_per_minute: int = 0,
+    progress_callback=None,
+    result_writer=None,
+    backoff_seconds: float = SMTP_BACKPRESSURE_SECONDS,
+    fallback_accounts: list[dict] | None = None,
+    failover_callback=None,
+    cancelled: threading.Event | None = None,
+    user_id: str | None = None,
+) -> list[tuple[bool, str] | None]:
+    results: list[tuple[bool, str] | None] = [None] * len(messages)
+    if not messages:
+        return results
+    if not smtp_account_configured(account):
+        for index in range(len(messages)):
+            results[index] = (True, "DRY_RUN: SMTP設定がないため実送信はしていません")
+            if progress_callback:
+                progress_callback(index, *results[index])
+        if result_writer:
+            await asyncio.to_thread(result_writer, [(index, *results[index]) for index in range(len(messages))])
+        return results
+
+    cancelled = cancelled or threading.Event()
+    user_id = user_id or current_user_id()
+    pending: asyncio.Queue = asyncio.Queue()
+    written: asyncio.Queue = asyncio.Queue()
+    failed_accounts: dict[str, str] = {}
+    for index in range(len(messages)):
+        pending.put_nowait((index, 0))
+
+    async def finish(index: int, ok: bool, result: str) -> None:
+        results[index] = (ok, result)
+        if progress_callback:
+            progress_callback(index, ok, result)
+        if result_writer:
+            await written.put((index, ok, result))
+
+    def replacement_account(failed_account: dict, error: str) -> dict | None:
+        failed_key = smtp_session_key(failed_account)
+        if failed_key not in failed_accounts:
+            failed_accounts[failed_key] = error
+            if failover_callback:
+                failover_callback(failed_account, error)
+        for candidate in fallback_accounts or []:
+            candidate_key = smtp_session_key(candidate)
+            if candidate_key in failed_accounts or candidate.get("remaining") == 0 or smtp_auth_paused_error(smtp_throttle_account_key(candidate, user_id)):
+                continue
+            if candidate.get("remaining") is not None:
+                candidate["remaining"] -= 1
+            return candidate
+        return None
+
+    async def deliver(clients: dict[str, dict], index: int, attempt: int) -> None:
+        message = messages[index]
+        message_account = message.get("account") or account
+        account_key = smtp_session_key(message_account)
+        throttle_key = smtp_throttle_account_key(message_account, user_id)
+        account_error = failed_accounts.get(account_key) or smtp_auth_paused_error(throttle_key)
+        if account_error:
+            replacement = replacement_account(message_account, account_error)
+            if replacement is None:
+                await finish(index, False, friendly_smtp_error(account_error))
+            else:
+                message["account"] = replacement
+                pending.put_nowait((index, attempt))
+            return
+        scopes = smtp_message_scopes(throttle_key, message["to_email"])
+        while (remaining := smtp_scopes_pause_remaining(scopes)) > 0:
+            if await wait_or_cancelled(cancelled, remaining):
+                return
+        delay = max(
+            reserve_rate_token(scopes[0], account_rate_per_minute),
+            reserve_rate_token(scopes[1], domain_rate_per_minute),
+        )
+        if await wait_or_cancelled(cancelled, delay):
+            return
+        email_message = build_email_message(message_account, message["to_email"], message["subject"], message["body"])
+        try:
+            session = clients.get(account_key)
+            if session is None or session["sent"] >= SMTP_SESSION_MAX_MESSAGES or not async_smtp_client_connected(session["client"]):
+                if session is not None:
+                    await close_async_smtp_client(session["client"])
+                    clients.pop(account_key)
+                session = clients[account_key] = {"client": await open_async_smtp_client(message_account), "sent": 0}
+            try:
+                await send_with_async_smtp_client(session["client"], email_message)
+            except Exception:
+                if async_smtp_client_connected(session["client"]):
+                    await reset_async_smtp_client(session["client"])
+                    raise
+                clients.pop(account_key)
+                session = clients[account_key] = {"client": await open_async_smtp_client(message_account), "sent": 0}
+                await send_with_async_smtp_client(session["client"], email_message)
+            session["sent"] += 1
+        except Exception as exc:
+            if smtp_failure_is_auth(exc):
+                record_smtp_auth_failure(throttle_key, str(exc))
+            if fallback_accounts is not None and smtp_failure_needs_failover(exc):
+                replacement = replacement_account(message_account, str(exc))
+                if replacement is not None:
+                    message["account"] = replacement
+                    pending.put_nowait((index, attempt))
+                    return
+            if smtp_failure_is_throttle(exc):
+                record_smtp_throttle(smtp_throttle_scope(throttle_key, message["to_email"], exc), backoff_seconds)
+                if attempt < SMTP_THROTTLE_RETRIES:
+                    pending.put_nowait((index, attempt + 1))
+                    return
+            await finish(index, False, friendly_smtp_error(str(exc)))
+            return
+        record_smtp_success(scopes)
+        await finish(index, True, "送信しました")
+
+    async def run_session() -> None:
+        clients: dict[str, dict] = {}
+        try:
+            while True:
+                index, attempt = await pending.get()
+                try:
+                    if not cancelled.is_set():
+                        await deliver(clients, index, attempt)
+                except Exception as exc:
+                    await finish(index, False, friendly_smtp_error(str(exc)))
+                finally:
+                    pending.task_done()
+        finally:
+            for session in clients.values():
+                await close_async_smtp_client(session["client"])
+
+    async def write_results() -> None:
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            item = await written.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + SMTP_RESULT_FLUSH_SECONDS
+            while len(batch) < SMTP_RESULT_BATCH_SIZE:
+                try:
+                    item = await asyncio.wait_for(written.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            await asyncio.to_thread(result_writer, batch)
+
+    writer = asyncio.create_task(write_results()) if result_writer else None
+    tasks = [asyncio.create_task(run_session()) for _ in range(max(1, min(int(sessions), len(messages))))]
     try:
-        if use_ssl:
-            with smtplib.SMTP_SSL(host, port, timeout=30) as smtp:
-                smtp.login(sender_email, smtp_pass)
-                smtp.send_message(message)
-        else:
-            with smtplib.SMTP(host, port, timeout=30) as smtp:
-                smtp.ehlo()
-                smtp.starttls()
-                smtp.ehlo()
-                smtp.login(sender_email, smtp_pass)
-                smtp.send_message(message)
-        return True, "送信しました"
-    except Exception as exc:
-        return False, friendly_smtp_error(str(exc))
+        await pending.join()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if writer:
+            await written.put(None)
+            await writer
+    return results
+
+
+def deliver_messages(
+    account: dict[str, str | int],
+    messages: list[dict],
+    progress_callback=None,
+    result_writer=None,
+    user_id: str | None = None,
+    fallback_accounts: list[dict] | None = None,
+    failover_callback=None,
+    cancelled: threading.Event | None = None,
+) -> list[tuple[bool, str] | None]:
+    state_user_id = user_id or current_user_id()
+    scope_keys = smtp_throttle_scope_keys(account, messages, fallback_accounts, state_user_id)
+    load_smtp_throttle_state(state_user_id, scope_keys)
+    try:
+        if get_smtp_send_engine(user_id) == "asyncio":
+            return asyncio.run(
+                send_messages_async(
+                    account,
+                    messages,
+                    get_smtp_async_sessions(user_id),
+                    get_smtp_account_rate_per_minute(user_id),
+                    get_smtp_domain_rate_per_minute(user_id),
+                    progress_callback,
+                    result_writer,
+                    fallback_accounts=fallback_accounts,
+                    failover_callback=failover_callback,
+                    cancelled=cancelled,
+                    user_id=state_user_id,
+                )
+            )
+
+        def record_result(index: int, ok: bool, result: str) -> None:
+            if result_writer:
+                result_writer([(index, ok, result)])
+            if progress_callback:
+                progress_callback(index, ok, result)
+
+        return send_messages_rate_limited(
+            account,
+            messages,
+            get_smtp_send_workers(user_id),
+            get_smtp_account_rate_per_minute(user_id),
+            get_smtp_domain_rate_per_minute(user_id),
+            record_result,
+            fallback_accounts=fallback_accounts,
+            failover_callback=failover_callback,
+            cancelled=cancelled,
+            user_id=state_user_id,
+        )
+    finally:
+        save_smtp_throttle_state(state_user_id, scope_keys)
+
+
+def write_direct_send_results(
+    user_id: str,
+    campaign_key_value: str,
+    usage_date: str,
+    outgoing: list[dict],
+    batch: list[tuple[int, bool, str]],
+) -> None:
+    sent_at = now_iso()
+    usage: dict[int, int] = {}
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        db.executemany(
+            "insert into sends(user_id, contact_id, campaign_key, subject, status, error, sent_at, smtp_account_id) values (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    user_id,
+                    outgoing[index]["contact"]["id"],
+                    campaign_key_value,
+                    outgoing[index]["subject"],
+                    "sent" if ok else "failed",
+                    "" if ok else result,
+                    sent_at,
+                    int(outgoing[index]["account"].get("id") or 0),
+                )
+                for index, ok, result in batch
+            ],
+        )
+        for index, ok, _ in batch:
+            account_id = int(outgoing[index]["account"].get("id") or 0)
+            if ok and account_id:
+                usage[account_id] = usage.get(account_id, 0) + 1
+        db.executemany(
+            SMTP_ACCOUNT_USAGE_UPSERT,
+            [(user_id, account_id, usage_date, count, 0, sent_at) for account_id, count in usage.items()],
+        )
 
 
 def create_send_job(
@@ -2134,19 +4798,49 @@ def create_send_job(
     delay_seconds: int,
     window_start: datetime_time,
     window_end: datetime_time,
+    accounts: list[dict] | None = None,
+    balance_policy: str = "weighted",
 ) -> tuple[bool, str]:
-    if not supabase_configured():
+    queue_mode = get_send_queue_mode()
+    if queue_mode == "supabase" and not supabase_configured():
         return False, "送信予約にはSupabase設定が必要です"
-    account = active_smtp_account()
-    if not smtp_configured():
-        return False, "送信元メール設定が未完了です"
-    smtp_ok, smtp_message = check_smtp_login()
-    if not smtp_ok:
-        return False, smtp_message
+    accounts = accounts or [active_smtp_account()]
+    if queue_mode == "supabase" and len(accounts) > 1:
+        return False, "複数の送信元への分散は、その場で送信する場合か、送信ワーカー方式の送信予約でだけ使えます"
+    account = accounts[0]
+    for pool_account in accounts:
+        if not smtp_account_configured(pool_account):
+            return False, "送信元メール設定が未完了です"
+        smtp_ok, smtp_message = check_smtp_login(pool_account)
+        if not smtp_ok:
+            return False, f"{pool_account.get('label') or pool_account.get('sender_email')}: {smtp_message}"
     schedule_times = build_send_schedule(len(contacts), int(delay_seconds), window_start, window_end)
     if len(schedule_times) != len(contacts):
         return False, "送信可能時間帯の設定を確認してください。終了時刻は開始時刻より後にしてください。"
+    assigned_accounts = assign_smtp_accounts(accounts, [smtp_usage_date(moment) for moment in schedule_times], balance_policy)
+    scheduled = [
+        (contact, scheduled_at, assigned_account)
+        for contact, scheduled_at, assigned_account in zip(contacts, schedule_times, assigned_accounts)
+        if assigned_account is not None
+    ]
+    if not scheduled:
+        return False, "送信元の1日上限に達しているため、予約できる宛先がありません"
+    skipped = len(contacts) - len(scheduled)
+    skipped_note = f"（{skipped}件は送信元の1日上限のため予約していません）" if skipped else ""
     user_email = current_user_profile()["email"].strip().lower() or current_user_id()
+    send_context = build_send_context(subject_template, body_template, account)
+    register_unsubscribe_tokens([contact for contact, _, _ in scheduled], user_email)
+    if queue_mode == "local":
+        queued = enqueue_local_send_job(
+            campaign_name,
+            campaign_key_value,
+            send_context,
+            scheduled,
+            int(delay_seconds),
+            window_start,
+            window_end,
+        )
+        return True, f"{queued}件の送信予約を作成しました{skipped_note}"
     job_payload = {
         "user_email": user_email,
         "campaign_key": campaign_key_value,
@@ -2161,20 +4855,20 @@ def create_send_job(
         "smtp_ssl": int(account.get("smtp_ssl") or 0) == 1,
         "smtp_pass": str(account.get("smtp_pass") or ""),
         "delay_seconds": int(delay_seconds),
-        "total_count": len(contacts),
+        "total_count": len(scheduled),
         "status": "queued",
         "updated_at": now_iso(),
     }
-    created_job = supabase_request("POST", "send_jobs", job_payload, prefer="return=representation")
+    try:
+        created_job = supabase_request("POST", "send_jobs", job_payload, prefer="return=representation")
+    except Exception as exc:
+        return False, f"送信予約の作成に失敗しました：{exc}"
     if not isinstance(created_job, list) or not created_job:
         return False, "送信予約の作成に失敗しました"
     job_id = created_job[0]["id"]
     queue_rows = []
-    for index, contact in enumerate(contacts):
-        register_unsubscribe_token(contact, user_email)
-        unsubscribe_url = build_unsubscribe_url(contact)
-        subject = render_template(subject_template, contact, unsubscribe_url)
-        body = render_template(ensure_unsubscribe_link_template(body_template), contact, unsubscribe_url)
+    for contact, scheduled_at, _ in scheduled:
+        subject, body = render_send_message(send_context, contact)
         queue_rows.append(
             {
                 "job_id": job_id,
@@ -2187,17 +4881,314 @@ def create_send_job(
                 "subject": subject,
                 "body": body,
                 "status": "pending",
-                "scheduled_at": schedule_times[index].isoformat(),
+                "scheduled_at": scheduled_at.isoformat(),
             }
         )
-    if queue_rows:
-        supabase_request("POST", "send_queue", queue_rows, prefer="return=representation")
-    for row in queue_rows:
+    try:
+        created_rows = supabase_request("POST", "send_queue", queue_rows, prefer="return=representation")
+    except Exception as exc:
+        created_rows = str(exc)
+    if not isinstance(created_rows, list) or len(created_rows) != len(queue_rows):
+        try:
+            supabase_request("DELETE", f"send_queue?job_id=eq.{job_id}")
+            supabase_request("DELETE", f"send_jobs?id=eq.{job_id}")
+        except Exception:
+            pass
+        detail = f"：{created_rows}" if isinstance(created_rows, str) else ""
+        return False, f"送信予約の作成に失敗しました{detail}"
+    for (contact, scheduled_at, assigned_account), row in zip(scheduled, queue_rows):
+        account_id = int(assigned_account.get("id") or 0)
         execute(
-            "insert into sends(user_id, contact_id, campaign_key, subject, status, error, sent_at) values (?, ?, ?, ?, ?, ?, ?)",
-            (current_user_id(), row["contact_local_id"], campaign_key_value, row["subject"], "queued", "", now_iso()),
+            "insert into sends(user_id, contact_id, campaign_key, subject, status, error, sent_at, smtp_account_id) values (?, ?, ?, ?, ?, ?, ?, ?)",
+            (current_user_id(), row["contact_local_id"], campaign_key_value, row["subject"], "queued", "", now_iso(), account_id),
+        )
+        record_smtp_account_usage(account_id, smtp_usage_date(scheduled_at))
+    return True, f"{len(queue_rows)}件の送信予約を作成しました{skipped_note}"
+
+
+def enqueue_local_send_job(
+    campaign_name: str,
+    campaign_key_value: str,
+    send_context: MappingProxyType,
+    scheduled: list[tuple[sqlite3.Row, datetime, dict]],
+    delay_seconds: int,
+    window_start: datetime_time,
+    window_end: datetime_time,
+) -> int:
+    user_id = current_user_id()
+    created_at = now_iso()
+    usage: dict[tuple[int, str], int] = {}
+    with sqlite3.connect(DB_PATH) as db:
+        job_id = db.execute(
+            """
+            insert into send_jobs(user_id, campaign_key, campaign_name, smtp_account_id, window_start, window_end, delay_seconds, total_count, created_at)
+            values (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id,
+                campaign_key_value,
+                campaign_name.strip(),
+                int(send_context["account"].get("id") or 0),
+                f"{window_start:%H:%M}",
+                f"{window_end:%H:%M}",
+                int(delay_seconds),
+                len(scheduled),
+                created_at,
+            ),
+        ).lastrowid
+        for contact, scheduled_at, assigned_account in scheduled:
+            subject, body = render_send_message(send_context, contact)
+            account_id = int(assigned_account.get("id") or 0)
+            send_id = db.execute(
+                "insert into sends(user_id, contact_id, campaign_key, subject, status, error, sent_at, smtp_account_id) values (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_id, int(contact["id"]), campaign_key_value, subject, "queued", "", created_at, account_id),
+            ).lastrowid
+            db.execute(
+                """
+                insert into send_queue(user_id, job_id, send_id, contact_id, smtp_account_id, to_email, subject, body, scheduled_at)
+                values (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    user_id,
+                    job_id,
+                    send_id,
+                    int(contact["id"]),
+                    account_id,
+                    contact["email"],
+                    subject,
+                    body,
+                    scheduled_at.astimezone(timezone.utc).isoformat(timespec="seconds"),
+                ),
+            )
+            usage_key = (account_id, smtp_usage_date(scheduled_at))
+            usage[usage_key] = usage.get(usage_key, 0) + 1
+    for (account_id, usage_date), count in usage.items():
+        record_smtp_account_usage(account_id, usage_date, count)
+    mark_app_state_dirty()
+    return len(scheduled)
+
+
+def local_send_window_resume_at(moment: datetime, window_start: str, window_end: str) -> datetime | None:
+    local_moment = moment.astimezone(APP_TIMEZONE)
+    start_time = datetime_time.fromisoformat(window_start)
+    start = datetime.combine(local_moment.date(), start_time, APP_TIMEZONE)
+    end = datetime.combine(local_moment.date(), datetime_time.fromisoformat(window_end), APP_TIMEZONE)
+    if start <= local_moment < end:
+        return None
+    return start if local_moment < start else next_window_start(local_moment, start_time)
+
+
+def release_stale_local_send_queue(stale_seconds: int = LOCAL_SEND_QUEUE_STALE_SECONDS) -> int:
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=stale_seconds)).isoformat(timespec="seconds")
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        return db.execute(
+            "update send_queue set status = 'pending', locked_at = '' where status = 'sending' and locked_at < ?",
+            (cutoff,),
+        ).rowcount
+
+
+def claim_local_send_queue(limit: int, moment: datetime | None = None) -> tuple[list[sqlite3.Row], int]:
+    moment = moment or datetime.now(timezone.utc)
+    now_text = moment.astimezone(timezone.utc).isoformat(timespec="seconds")
+    claimed = []
+    rescheduled = 0
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        db.row_factory = sqlite3.Row
+        db.execute("begin immediate")
+        due = db.execute(
+            """
+            select q.*, j.window_start, j.window_end,
+                   coalesce(c.unsubscribed, 1) as contact_unsubscribed,
+                   exists (
+                       select 1 from blocked_targets b
+                       where b.user_id = q.user_id and b.email = lower(trim(q.to_email)) and b.email != ''
+                   ) as contact_blocked
+            from send_queue q
+            join send_jobs j on j.id = q.job_id
+            left join contacts c on c.id = q.contact_id and c.user_id = q.user_id
+            where q.status = 'pending' and q.scheduled_at <= ?
+            order by q.scheduled_at asc, q.id asc
+            limit ?
+            """,
+            (now_text, int(limit)),
+        ).fetchall()
+        for row in due:
+            resume_at = local_send_window_resume_at(moment, row["window_start"], row["window_end"])
+            if resume_at is not None:
+                db.execute(
+                    "update send_queue set scheduled_at = ? where id = ?",
+                    (resume_at.astimezone(timezone.utc).isoformat(timespec="seconds"), int(row["id"])),
+                )
+                rescheduled += 1
+                continue
+            db.execute(
+                "update send_queue set status = 'sending', locked_at = ?, attempts = attempts + 1 where id = ?",
+                (now_text, int(row["id"])),
+            )
+            claimed.append(row)
+        if claimed:
+            db.execute(
+                f"update send_jobs set status = 'sending' where status = 'queued' and id in ({', '.join(['?'] * len(claimed))})",
+                tuple(int(row["job_id"]) for row in claimed),
+            )
+    return claimed, rescheduled
+
+
+def load_local_send_accounts(claimed: list[sqlite3.Row]) -> dict[tuple[str, int], dict | None]:
+    accounts: dict[tuple[str, int], dict | None] = {}
+    with sqlite3.connect(DB_PATH) as db:
+        db.row_factory = sqlite3.Row
+        for row in claimed:
+            key = (str(row["user_id"]), int(row["smtp_account_id"] or 0))
+            if key in accounts:
+                continue
+            if key[1]:
+                saved = db.execute("select * from smtp_accounts where user_id = ? and id = ?", key).fetchone()
+                accounts[key] = dict(saved) if saved else None
+            else:
+                settings_account = settings_smtp_account(key[0])
+                accounts[key] = settings_account if smtp_account_configured(settings_account) else None
+    return accounts
+
+
+def finish_local_sends(results: list[tuple[sqlite3.Row, bool, str]]) -> None:
+    sent_at = now_iso()
+    updates = [("sent" if ok else "failed", "" if ok else result, sent_at, row) for row, ok, result in results]
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        db.executemany(
+            "update send_queue set status = ?, error = ?, sent_at = ?, locked_at = '' where id = ?",
+            [(status, error, sent_at, int(row["id"])) for status, error, sent_at, row in updates],
+        )
+        db.executemany(
+            "update sends set status = ?, error = ?, sent_at = ? where id = ?",
+            [(status, error, sent_at, int(row["send_id"])) for status, error, sent_at, row in updates],
+        )
+
+
+def finish_local_send_results(messages: list[dict], batch: list[tuple[int, bool, str]]) -> None:
+    finish_local_sends([(messages[index]["row"], ok, result) for index, ok, result in batch])
+    refresh_local_send_locks([message["row"] for message in messages])
+
+
+def refresh_local_send_locks(claimed: list[sqlite3.Row]) -> None:
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        db.executemany(
+            "update send_queue set locked_at = ? where id = ? and status = 'sending'",
+            [(now_iso(), int(row["id"])) for row in claimed],
+        )
+
+
+def keep_local_send_locks(claimed: list[sqlite3.Row], done: threading.Event) -> None:
+    while not done.wait(LOCAL_SEND_QUEUE_HEARTBEAT_SECONDS):
+        refresh_local_send_locks(claimed)
+
+
+def release_local_send_rows(claimed: list[sqlite3.Row]) -> None:
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        db.executemany(
+            "update send_queue set status = 'pending', locked_at = '', attempts = attempts - 1 where id = ? and status = 'sending'",
+            [(int(row["id"]),) for row in claimed],
+        )
+
+
+def finish_local_send_jobs(job_ids: set[int]) -> None:
+    if not job_ids:
+        return
+    with sqlite3.connect(DB_PATH, timeout=30) as db:
+        db.execute(
+            f"""
+            update send_jobs
+            set status = 'done', finished_at = ?
+            where status != 'done'
+              and id in ({', '.join(['?'] * len(job_ids))})
+              and not exists (
+                  select 1 from send_queue q where q.job_id = send_jobs.id and q.status in ('pending', 'sending')
+              )
+            """,
+            (now_iso(), *job_ids),
+        )
+
+
+def process_local_send_queue(
+    batch_size: int = 50,
+    moment: datetime | None = None,
+    cancelled: threading.Event | None = None,
+) -> int:
+    claimed, rescheduled = claim_local_send_queue(batch_size, moment)
+    if not claimed:
+        return rescheduled
+    accounts = load_local_send_accounts(claimed)
+    skipped = []
+    messages_by_user: dict[str, list[dict]] = {}
+    for row in claimed:
+        account = accounts.get((str(row["user_id"]), int(row["smtp_account_id"] or 0)))
+        if account is None:
+            skipped.append((row, False, "送信元設定が見つかりません。削除された可能性があります。"))
+        elif int(row["contact_unsubscribed"]) or int(row["contact_blocked"]):
+            skipped.append((row, False, "配信停止済み、または削除済みの宛先のため送信しませんでした"))
+        else:
+            messages_by_user.setdefault(str(row["user_id"]), []).append(
+                {"row": row, "account": account, "to_email": row["to_email"], "subject": row["subject"], "body": row["body"]}
+            )
+    if skipped:
+        finish_local_sends(skipped)
+    delivered = threading.Event()
+    heartbeat = threading.Thread(target=keep_local_send_locks, args=(claimed, delivered), daemon=True)
+    heartbeat.start()
+    try:
+        for user_id, messages in messages_by_user.items():
+            results = deliver_messages(
+                messages[0]["account"],
+                messages,
+                result_writer=partial(finish_local_send_results, messages),
+                user_id=user_id,
+                cancelled=cancelled,
+            )
+            unsent = [message["row"] for message, result in zip(messages, results) if result is None]
+            if unsent:
+                release_local_send_rows(unsent)
+    finally:
+        delivered.set()
+        heartbeat.join()
+    finish_local_send_jobs({int(row["job_id"]) for row in claimed})
+    return len(claimed) + rescheduled
+
+
+def next_local_send_due() -> datetime | None:
+    with sqlite3.connect(DB_PATH) as db:
+        row = db.execute("select min(scheduled_at) from send_queue where status = 'pending'").fetchone()
+    return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+
+def run_local_send_worker(stop_event: threading.Event, poll_seconds: float = 5.0, batch_size: int = 50) -> None:
+    release_stale_local_send_queue()
+    while not stop_event.is_set():
+        if process_local_send_queue(batch_size, cancelled=stop_event):
+            continue
+        due = next_local_send_due()
+        wait_seconds = poll_seconds if due is None else (due - datetime.now(timezone.utc)).total_seconds()
+        stop_event.wait(max(0.0, min(poll_seconds, wait_seconds)))
+
+
+def fetch_local_send_jobs(limit: int = 5) -> list[dict]:
+    return [
+        dict(row)
+        for row in rows(
+            """
+            select j.campaign_name, j.total_count,
+                   coalesce(sum(q.status = 'sent'), 0) as sent_count,
+                   coalesce(sum(q.status = 'failed'), 0) as failed_count,
+                   j.status, j.created_at
+            from send_jobs j
+            left join send_queue q on q.job_id = j.id
+            where j.user_id = ?
+            group by j.id
+            order by j.created_at desc, j.id desc
+            limit ?
+            """,
+            (current_user_id(), int(limit)),
         )
-    return True, f"{len(queue_rows)}件の送信予約を作成しました"
+    ]
 
 
 def sync_send_queue_results() -> None:
@@ -2352,6 +5343,8 @@ def sync_unsubscribes_from_supabase() -> None:
 
 
 def fetch_recent_send_jobs() -> list[dict]:
+    if get_send_queue_mode() == "local":
+        return fetch_local_send_jobs()
     if not supabase_configured():
         return []
     user_email = current_user_profile()["email"].strip().lower()
@@ -2751,6 +5744,10 @@ def settings_panel() -> None:
         st.session_state["smtp_port_input"] = str(active_account.get("smtp_port") or "587")
     if "smtp_ssl_input" not in st.session_state:
         st.session_state["smtp_ssl_input"] = int(active_account.get("smtp_ssl") or 0) == 1
+    if "smtp_weight_input" not in st.session_state:
+        st.session_state["smtp_weight_input"] = max(1, int(active_account.get("weight") or 1))
+    if "smtp_daily_cap_input" not in st.session_state:
+        st.session_state["smtp_daily_cap_input"] = max(0, int(active_account.get("daily_cap") or 0))
 
     options = ["新しく作る"] + account_labels
     selected_index = 0
@@ -2771,6 +5768,8 @@ def settings_panel() -> None:
             st.session_state["smtp_host_input"] = account["smtp_host"]
             st.session_state["smtp_port_input"] = account["smtp_port"]
             st.session_state["smtp_ssl_input"] = int(account["smtp_ssl"]) == 1
+            st.session_state["smtp_weight_input"] = max(1, int(account["weight"] or 1))
+            st.session_state["smtp_daily_cap_input"] = max(0, int(account["daily_cap"] or 0))
             save_setting("ACTIVE_SMTP_ACCOUNT_ID", str(account["id"]))
             st.rerun()
 
@@ -2797,6 +5796,9 @@ def settings_panel() -> None:
         type="password",
         placeholder="保存済み" if has_password else "Gmailの場合はアプリパスワード",
     )
+    weight_col, daily_cap_col = st.columns(2)
+    smtp_weight = weight_col.number_input("分散送信の重み", min_value=1, max_value=100, step=1, key="smtp_weight_input")
+    smtp_daily_cap = daily_cap_col.number_input("1日の送信上限（0で上限なし）", min_value=0, max_value=100000, step=50, key="smtp_daily_cap_input")
 
     if save_col.button("保存 / 更新", key="save_smtp_account", use_container_width=True):
         if not sender_email.strip():
@@ -2811,6 +5813,8 @@ def settings_panel() -> None:
                 smtp_port,
                 smtp_ssl,
                 smtp_pass,
+                int(smtp_weight),
+                int(smtp_daily_cap),
             )
             save_setting("ACTIVE_SMTP_ACCOUNT_ID", str(account_id))
             st.session_state["smtp_account_id_input"] = account_id
@@ -2828,6 +5832,76 @@ def settings_panel() -> None:
     if has_password:
         st.caption("パスワードは保存済みです。変更したい時だけ新しいパスワードを入力してください。")
 
+    workers_col, account_rate_col, domain_rate_col = st.columns(3)
+    smtp_send_workers = workers_col.number_input(
+        "同時に送信する数",
+        min_value=1,
+        max_value=8,
+        value=get_smtp_send_workers(),
+        step=1,
+    )
+    smtp_account_rate = account_rate_col.number_input(
+        "送信元ごとの上限（通/分）",
+        min_value=0,
+        value=get_smtp_account_rate_per_minute(),
+        step=1,
+        help="0は上限なしです。送信サービスの上限（例: 1分あたりの送信数）が決まっている場合だけ入れてください。",
+    )
+    smtp_domain_rate = domain_rate_col.number_input(
+        "宛先ドメインごとの上限（通/分）",
+        min_value=0,
+        value=get_smtp_domain_rate_per_minute(),
+        step=1,
+        help="0は上限なしです。gmail.com など同じドメインへ短時間に送りすぎないようにしたい場合に入れてください。",
+    )
+    engine_col, sessions_col = st.columns(2)
+    smtp_engine_labels = list(SMTP_SEND_ENGINES)
+    smtp_engine_label = engine_col.radio(
+        "送信方式",
+        smtp_engine_labels,
+        index=list(SMTP_SEND_ENGINES.values()).index(get_smtp_send_engine()),
+        horizontal=True,
+    )
+    smtp_async_sessions = sessions_col.number_input(
+        "高速方式の同時SMTP接続数",
+        min_value=1,
+        max_value=64,
+        value=get_smtp_async_sessions(),
+        step=1,
+    )
+    if st.button("送信速度を保存", key="save_smtp_send_rate"):
+        save_setting("SMTP_SEND_ENGINE", SMTP_SEND_ENGINES[smtp_engine_label])
+        save_setting("SMTP_ASYNC_SESSIONS", str(int(smtp_async_sessions)))
+        save_setting("SMTP_SEND_WORKERS", str(int(smtp_send_workers)))
+        save_setting("SMTP_ACCOUNT_RATE_PER_MINUTE", str(int(smtp_account_rate)))
+        save_setting("SMTP_DOMAIN_RATE_PER_MINUTE", str(int(smtp_domain_rate)))
+        st.success("送信速度を保存しました")
+    st.caption(
+        "SMTPサーバーから送信制限（421/450/451/452）が返った場合は、その送信元または宛先ドメインの送信ペースを自動で下げ、"
+        "待つ時間を倍々に延ばしてから送り直します。送信が続けて成功すると少しずつ元のペースに戻します。"
+        f"認証エラーになった送信元は{SMTP_AUTH_PAUSE_SECONDS // 60}分間使わずに止めます。"
+    )
+    if fetch_smtp_throttle_state():
+        st.dataframe(smtp_throttle_state_table(), use_container_width=True, hide_index=True)
+        if st.button("送信ペースの自動調整をリセット", key="reset_smtp_throttle_state"):
+            reset_smtp_throttle_state()
+            st.success("送信ペースを設定どおりに戻しました")
+            st.rerun()
+    if app_state_can_sync():
+        st.caption("アプリのデータをSupabaseに保存しているため、送信予約はSupabase（サーバー側で送信）で処理します。送信ワーカー（send_worker.py）はSupabase設定がない環境で使えます。")
+    else:
+        send_queue_label = st.radio(
+            "送信予約の処理方法",
+            list(SEND_QUEUE_MODES),
+            index=list(SEND_QUEUE_MODES.values()).index(get_send_queue_mode()),
+            horizontal=True,
+        )
+        if SEND_QUEUE_MODES[send_queue_label] != get_send_queue_mode():
+            save_setting("SEND_QUEUE_MODE", SEND_QUEUE_MODES[send_queue_label])
+            st.rerun()
+    if get_send_queue_mode() == "local":
+        st.caption("送信予約はこのアプリのデータベースに入ります。`python send_worker.py` を起動している間、予約時刻・送信時間帯・送信速度を守って送信し、結果を送信ログに書き込みます。")
+
     st.divider()
     st.caption("YouTube API設定")
     youtube_api_key = st.text_input(
@@ -2841,11 +5915,50 @@ def settings_panel() -> None:
         value=current_youtube_daily_limit,
         step=100,
     )
+    cache_col, cache_size_col = st.columns(2)
+    youtube_cache_ttl_hours = cache_col.number_input(
+        "検索結果の保存時間（時間、0で保存しない）",
+        min_value=0,
+        value=get_youtube_search_cache_ttl_hours(),
+        step=1,
+    )
+    youtube_cache_max_pages = cache_size_col.number_input(
+        "検索結果の保存ページ数上限",
+        min_value=0,
+        value=get_youtube_search_cache_max_pages(),
+        step=50,
+    )
+    stats_days_col, stats_share_col = st.columns(2)
+    youtube_stats_refresh_days = stats_days_col.number_input(
+        "登録者数を更新する間隔（日）",
+        min_value=1,
+        value=get_youtube_stats_refresh_days(),
+        step=1,
+    )
+    youtube_stats_refresh_share = stats_share_col.number_input(
+        "更新に使う上限の割合（%）",
+        min_value=0,
+        max_value=100,
+        value=get_youtube_stats_refresh_share(),
+        step=1,
+    )
+    youtube_stats_refresh_auto = st.checkbox(
+        "登録者数をバックグラウンドで自動更新する",
+        value=parse_bool(get_setting("YOUTUBE_STATS_REFRESH_AUTO", "false")),
+    )
     if st.button("YouTube API設定を保存"):
         if youtube_api_key:
             save_setting("YOUTUBE_API_KEY", youtube_api_key.strip())
         save_setting("YOUTUBE_DAILY_LIMIT", str(int(youtube_daily_limit)))
+        save_setting("YOUTUBE_SEARCH_CACHE_TTL_HOURS", str(int(youtube_cache_ttl_hours)))
+        save_setting("YOUTUBE_SEARCH_CACHE_MAX_PAGES", str(int(youtube_cache_max_pages)))
+        save_setting("YOUTUBE_STATS_REFRESH_DAYS", str(int(youtube_stats_refresh_days)))
+        save_setting("YOUTUBE_STATS_REFRESH_SHARE", str(int(youtube_stats_refresh_share)))
+        save_setting("YOUTUBE_STATS_REFRESH_AUTO", "true" if youtube_stats_refresh_auto else "false")
         st.success("YouTube API設定を保存しました")
+    if st.button("保存した検索結果を削除", key="clear_youtube_search_cache"):
+        clear_youtube_search_cache()
+        st.success("保存した検索結果を削除しました。次回の検索はYouTube APIから取り直します。")
     if current_youtube_api_key:
         st.caption("YouTube APIキーは保存済みです。変更したい時だけ新しいキーを入力してください。")
 
@@ -2862,33 +5975,149 @@ def find_column(frame: pd.DataFrame, aliases: set[str]) -> str | None:
     return None
 
 
-def guess_email_column(frame: pd.DataFrame) -> str | None:
-    email_pattern = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+EMAIL_VALUE_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+
+def sample_frame_rows(frame: pd.DataFrame, sample_rows: int) -> pd.DataFrame:
+    if len(frame) <= sample_rows:
+        return frame
+    step = len(frame) / sample_rows
+    return frame.iloc[[int(index * step) for index in range(sample_rows)]]
+
+
+def email_column_counts(sample: pd.DataFrame, column: str) -> tuple[int, int]:
+    values = sample[column].fillna("").astype(str).str.strip()
+    if not values.str.contains("@", regex=False).any():
+        return 0, int((values != "").sum())
+    return int(values.str.match(EMAIL_VALUE_PATTERN).sum()), int((values != "").sum())
+
+
+def email_column_ratio(frame: pd.DataFrame, column: str, sample_rows: int = 2000) -> float:
+    count, filled = email_column_counts(sample_frame_rows(frame, sample_rows), column)
+    return count / filled if filled else 0.0
+
+
+def detect_email_column(frame: pd.DataFrame, sample_rows: int = 2000, clear_ratio: float = 0.9) -> tuple[str | None, float]:
+    sample = sample_frame_rows(frame, sample_rows)
     best_column = None
     best_count = 0
+    best_ratio = 0.0
     for column in frame.columns:
-        count = frame[column].fillna("").astype(str).str.strip().apply(
-            lambda value: bool(email_pattern.match(value))
-        ).sum()
+        count, filled = email_column_counts(sample, column)
         if count > best_count:
             best_column = str(column)
-            best_count = int(count)
-    return best_column if best_count else None
+            best_count = count
+            best_ratio = count / filled if filled else 0.0
+            if best_ratio >= clear_ratio and filled >= len(sample) * clear_ratio:
+                break
+    return best_column, best_ratio
+
+
+CONTACT_IMPORT_CHUNK_ROWS = 50_000
+CONTACT_IMPORT_LOW_EMAIL_RATIO = 0.8
+
 
+def contact_import_file_key(uploaded_file) -> str:
+    uploaded_file.seek(0, os.SEEK_END)
+    size = uploaded_file.tell()
+    uploaded_file.seek(0)
+    digest = hashlib.sha256(f"{uploaded_file.name}|{size}|".encode("utf-8"))
+    digest.update(uploaded_file.read(1 << 20))
+    uploaded_file.seek(0)
+    return digest.hexdigest()
 
-def read_contacts_file(uploaded_file) -> pd.DataFrame:
+
+def iter_xlsx_rows(uploaded_file, skip_rows: int, chunk_rows: int):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        sheet_rows = sheet.iter_rows(values_only=True)
+        header = next(sheet_rows, None)
+        if header is None:
+            return
+        columns = [str(value) if value is not None else f"Unnamed: {index}" for index, value in enumerate(header)]
+        total_rows = max(1, int(sheet.max_row or 1) - 1)
+        rows_read = skip_rows
+        buffer = []
+        for values in islice(sheet_rows, skip_rows, None):
+            buffer.append((tuple(values) + (None,) * len(columns))[: len(columns)])
+            if len(buffer) >= chunk_rows:
+                rows_read += len(buffer)
+                yield pd.DataFrame(buffer, columns=columns), min(1.0, rows_read / total_rows)
+                buffer = []
+        if buffer:
+            rows_read += len(buffer)
+            yield pd.DataFrame(buffer, columns=columns), 1.0
+    finally:
+        workbook.close()
+
+
+def iter_contact_file_chunks(uploaded_file, skip_rows: int = 0, chunk_rows: int = CONTACT_IMPORT_CHUNK_ROWS):
     name = uploaded_file.name.lower()
-    if name.endswith(".csv"):
-        return pd.read_csv(uploaded_file).fillna("")
-    if name.endswith(".tsv"):
-        return pd.read_csv(uploaded_file, sep="\t").fillna("")
-    if name.endswith((".xlsx", ".xls")):
-        return pd.read_excel(uploaded_file).fillna("")
-    raise ValueError("対応している形式は CSV / TSV / XLSX / XLS です")
+    uploaded_file.seek(0, os.SEEK_END)
+    size = max(1, uploaded_file.tell())
+    uploaded_file.seek(0)
+    if name.endswith((".csv", ".tsv")):
+        reader = pd.read_csv(
+            uploaded_file,
+            sep="\t" if name.endswith(".tsv") else ",",
+            dtype=str,
+            chunksize=chunk_rows,
+            skiprows=range(1, skip_rows + 1) if skip_rows else None,
+        )
+        for chunk in reader:
+            yield chunk.fillna(""), min(1.0, uploaded_file.tell() / size)
+        return
+    if name.endswith(".xlsx"):
+        for chunk, progress in iter_xlsx_rows(uploaded_file, skip_rows, chunk_rows):
+            yield chunk.fillna(""), progress
+        return
+    if name.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(uploaded_file)
+        total_rows = max(1, parquet_file.metadata.num_rows)
+        rows_read = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            rows_read += batch.num_rows
+            if rows_read <= skip_rows:
+                continue
+            chunk = batch.to_pandas().iloc[max(0, skip_rows - (rows_read - batch.num_rows)) :]
+            yield chunk.fillna(""), min(1.0, rows_read / total_rows)
+        return
+    if name.endswith((".arrow", ".feather")):
+        reader = pa.ipc.open_file(uploaded_file)
+        total_rows = max(1, sum(reader.get_batch(index).num_rows for index in range(reader.num_record_batches)))
+        rows_read = 0
+        buffer = []
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            batch_start = rows_read
+            rows_read += batch.num_rows
+            if rows_read <= skip_rows:
+                continue
+            buffer.append(batch.slice(max(0, skip_rows - batch_start)))
+            if sum(item.num_rows for item in buffer) >= chunk_rows or index == reader.num_record_batches - 1:
+                yield pa.Table.from_batches(buffer).to_pandas().fillna(""), min(1.0, rows_read / total_rows)
+                buffer = []
+        return
+    if name.endswith(".xls"):
+        frame = pd.read_excel(uploaded_file, dtype=str).fillna("")
+        for start in range(skip_rows, len(frame), chunk_rows):
+            yield frame.iloc[start : start + chunk_rows], min(1.0, (start + chunk_rows) / max(1, len(frame)))
+        return
+    raise ValueError("対応している形式は CSV / TSV / XLSX / XLS / Parquet / Arrow です")
+
 
+def fetch_contact_import_checkpoint(file_key: str, user_id: str | None = None) -> sqlite3.Row | None:
+    result = rows(
+        "select * from contact_import_checkpoints where user_id = ? and file_key = ?",
+        (user_id or current_user_id(), file_key),
+    )
+    return result[0] if result else None
 
-def import_contacts_file(uploaded_file) -> tuple[int, int, dict[str, str | None]]:
-    frame = read_contacts_file(uploaded_file)
+
+def contact_import_mapping(frame: pd.DataFrame) -> dict[str, str | float | None]:
     email_column = find_column(
         frame,
         {
@@ -2901,7 +6130,11 @@ def import_contacts_file(uploaded_file) -> tuple[int, int, dict[str, str | None]
             "連絡先",
             "emailaddress",
         },
-    ) or guess_email_column(frame)
+    )
+    if email_column:
+        email_ratio = email_column_ratio(frame, email_column)
+    else:
+        email_column, email_ratio = detect_email_column(frame)
     name_column = find_column(frame, {"name", "名前", "担当者", "担当者名", "contact", "contactname"})
     channel_column = find_column(
         frame,
@@ -2918,29 +6151,390 @@ def import_contacts_file(uploaded_file) -> tuple[int, int, dict[str, str | None]
 
     if not email_column:
         raise ValueError("メールアドレスの列を見つけられませんでした。列名に email または メールアドレス を入れてください。")
+    return {"email": email_column, "name": name_column, "channel": channel_column, "email_ratio": email_ratio}
 
-    added = 0
-    skipped = 0
-    seen_in_file: set[str] = set()
-    for _, row in frame.iterrows():
-        email = str(row.get(email_column, "")).strip().lower()
-        if not email:
-            continue
-        if email in seen_in_file:
-            skipped += 1
-            continue
-        seen_in_file.add(email)
-        was_added = add_contact(
-            email=email,
-            name=str(row.get(name_column, "")) if name_column else "",
-            channel=str(row.get(channel_column, "")) if channel_column else "",
-            consent=True,
+
+def normalize_contact_import_frame(frame: pd.DataFrame, mapping: dict[str, str | None]) -> pd.DataFrame:
+    def text_column(column: str | None) -> pd.Series:
+        if not column:
+            return pd.Series("", index=frame.index, dtype=object)
+        return frame[column].fillna("").astype(str).str.strip()
+
+    emails = text_column(mapping["email"]).str.lower()
+    return pd.DataFrame(
+        {
+            "email": emails,
+            "name": text_column(mapping["name"]),
+            "channel": text_column(mapping["channel"]),
+            "valid": emails.str.match(EMAIL_VALUE_PATTERN).astype(int),
+        }
+    )
+
+
+def save_contact_import_checkpoint(db: sqlite3.Connection, user_id: str, file_key: str, file_name: str, **values) -> None:
+    db.execute(
+        """
+        insert or ignore into contact_import_checkpoints (user_id, file_key, file_name, updated_at)
+        values (?, ?, ?, ?)
+        """,
+        (user_id, file_key, file_name, now_iso()),
+    )
+    assignments = ", ".join(f"{column} = ?" for column in values)
+    db.execute(
+        f"update contact_import_checkpoints set {assignments}, updated_at = ? where user_id = ? and file_key = ?",
+        (*values.values(), now_iso(), user_id, file_key),
+    )
+
+
+def stage_contact_import_file(uploaded_file, progress_callback=None, user_id: str | None = None) -> str:
+    user_id = user_id or current_user_id()
+    file_key = contact_import_file_key(uploaded_file)
+    checkpoint = fetch_contact_import_checkpoint(file_key, user_id)
+    if checkpoint and checkpoint["status"] == "done":
+        discard_contact_import(file_key, user_id)
+        checkpoint = None
+    if checkpoint and int(checkpoint["staged"]):
+        return file_key
+    rows_done = int(checkpoint["rows_done"]) if checkpoint else 0
+    mapping = json.loads(checkpoint["mapping"]) if checkpoint and rows_done else None
+    with sqlite3.connect(DB_PATH) as db:
+        for chunk, progress in iter_contact_file_chunks(uploaded_file, rows_done):
+            if mapping is None:
+                mapping = contact_import_mapping(chunk)
+            contacts = normalize_contact_import_frame(chunk, mapping)
+            db.executemany(
+                """
+                insert or replace into contact_import_rows
+                (user_id, file_key, row_number, email, name, channel, valid, token)
+                values (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                zip(
+                    [user_id] * len(contacts),
+                    [file_key] * len(contacts),
+                    range(rows_done, rows_done + len(contacts)),
+                    contacts["email"],
+                    contacts["name"],
+                    contacts["channel"],
+                    contacts["valid"].tolist(),
+                    (secrets.token_urlsafe(24) for _ in range(len(contacts))),
+                ),
+            )
+            rows_done += len(contacts)
+            save_contact_import_checkpoint(
+                db,
+                user_id,
+                file_key,
+                uploaded_file.name,
+                rows_done=rows_done,
+                mapping=json.dumps(mapping, ensure_ascii=False),
+                status="staging",
+                progress=progress,
+            )
+            db.commit()
+            if progress_callback:
+                progress_callback(progress, f"{rows_done:,}行を読み込みました")
+        if mapping is None:
+            raise ValueError("メールアドレスの列を見つけられませんでした。列名に email または メールアドレス を入れてください。")
+        db.execute(
+            """
+            update contact_import_rows set first_seen = 1
+            where rowid in (
+                select min(rowid) from contact_import_rows
+                where user_id = ? and file_key = ? and email != '' and valid = 1
+                group by email
+            )
+            """,
+            (user_id, file_key),
         )
-        if was_added:
-            added += 1
-        else:
-            skipped += 1
-    return added, skipped, {"email": email_column, "name": name_column, "channel": channel_column}
+        save_contact_import_checkpoint(db, user_id, file_key, uploaded_file.name, staged=1, status="staged", progress=1.0)
+        db.commit()
+    return file_key
+
+
+def contact_import_report(file_key: str) -> dict:
+    user_id = current_user_id()
+    checkpoint = fetch_contact_import_checkpoint(file_key)
+    with sqlite3.connect(DB_PATH) as db:
+        db.row_factory = sqlite3.Row
+        counts = db.execute(
+            """
+            with staged as (
+                select
+                    r.email,
+                    r.valid,
+                    r.first_seen,
+                    exists (
+                        select 1 from blocked_targets b
+                        where b.user_id = r.user_id and b.email != '' and b.email = r.email
+                    ) as blocked,
+                    exists (
+                        select 1 from contacts c
+                        where c.user_id = r.user_id and c.email = r.email
+                    ) as existing
+                from contact_import_rows r
+                where r.user_id = ? and r.file_key = ?
+            )
+            select
+                count(*) as total_rows,
+                coalesce(sum(email = ''), 0) as blank,
+                coalesce(sum(email != '' and valid = 0), 0) as malformed,
+                coalesce(sum(email != '' and valid = 1 and first_seen = 0), 0) as file_duplicates,
+                coalesce(sum(first_seen = 1 and blocked), 0) as blocked,
+                coalesce(sum(first_seen = 1 and not blocked and existing), 0) as existing,
+                coalesce(sum(first_seen = 1 and not blocked and not existing), 0) as new
+            from staged
+            """,
+            (user_id, file_key),
+        ).fetchone()
+        blocked_reasons = pd.read_sql_query(
+            """
+            select reason, count(*) as count
+            from (
+                select (
+                    select b.reason from blocked_targets b
+                    where b.user_id = r.user_id and b.email != '' and b.email = r.email
+                    order by b.id desc
+                    limit 1
+                ) as reason
+                from contact_import_rows r
+                where r.user_id = ? and r.file_key = ? and r.first_seen = 1
+            )
+            where reason is not null
+            group by reason
+            order by count desc
+            """,
+            db,
+            params=(user_id, file_key),
+        )
+    return {
+        **{key: int(counts[key]) for key in counts.keys()},
+        "blocked_reasons": blocked_reasons,
+        "mapping": json.loads(checkpoint["mapping"]) if checkpoint else {},
+        "file_name": checkpoint["file_name"] if checkpoint else "",
+    }
+
+
+def discard_contact_import(file_key: str, user_id: str | None = None) -> None:
+    user_id = user_id or current_user_id()
+    checkpoint = fetch_contact_import_checkpoint(file_key, user_id)
+    with sqlite3.connect(DB_PATH) as db:
+        db.execute("delete from contact_import_rows where user_id = ? and file_key = ?", (user_id, file_key))
+        db.execute("delete from contact_import_checkpoints where user_id = ? and file_key = ?", (user_id, file_key))
+        db.commit()
+    if checkpoint and checkpoint["file_path"]:
+        Path(checkpoint["file_path"]).unlink(missing_ok=True)
+
+
+def commit_contact_import(file_key: str, progress_callback=None, user_id: str | None = None) -> tuple[int, int, dict[str, str | float | None]]:
+    background = user_id is not None
+    user_id = user_id or current_user_id()
+    checkpoint = fetch_contact_import_checkpoint(file_key, user_id)
+    if not checkpoint or not int(checkpoint["staged"]) or checkpoint["status"] == "done":
+        raise ValueError("取り込み内容の確認が終わっていません。もう一度ファイルを読み込んでください。")
+    total_rows = int(checkpoint["rows_done"])
+    committed_rows = int(checkpoint["committed_rows"])
+    added = int(checkpoint["added"])
+    with sqlite3.connect(DB_PATH) as db:
+        while committed_rows < total_rows:
+            chunk_end = min(total_rows, committed_rows + CONTACT_IMPORT_CHUNK_ROWS)
+            cursor = db.execute(
+                """
+                insert into contacts
+                (
+                    user_id, email, name, channel, youtube_channel_id, youtube_channel_url,
+                    youtube_subscriber_count, youtube_video_count, youtube_view_count,
+                    youtube_keyword, youtube_description, source, consent, unsubscribed, token, created_at
+                )
+                select r.user_id, r.email, r.name, r.channel, '', '', 0, 0, 0, '', '', '', 1, 0, r.token, ?
+                from contact_import_rows r
+                where r.user_id = ? and r.file_key = ?
+                  and r.row_number >= ? and r.row_number < ?
+                  and r.first_seen = 1
+                  and not exists (
+                      select 1 from contacts c
+                      where c.user_id = r.user_id and c.email = r.email
+                  )
+                  and not exists (
+                      select 1 from blocked_targets b
+                      where b.user_id = r.user_id and b.email != '' and b.email = r.email
+                  )
+                """,
+                (now_iso(), user_id, file_key, committed_rows, chunk_end),
+            )
+            chunk_added = max(0, cursor.rowcount)
+            added += chunk_added
+            committed_rows = chunk_end
+            save_contact_import_checkpoint(
+                db,
+                user_id,
+                file_key,
+                checkpoint["file_name"],
+                committed_rows=committed_rows,
+                added=added,
+                status="committing",
+                progress=committed_rows / max(1, total_rows),
+            )
+            db.commit()
+            if chunk_added and not background:
+                mark_app_state_dirty()
+            if progress_callback:
+                progress_callback(committed_rows / max(1, total_rows), f"{committed_rows:,}行を確認し、{added:,}件を追加しました")
+        nonblank = int(
+            db.execute(
+                "select count(*) from contact_import_rows where user_id = ? and file_key = ? and email != ''",
+                (user_id, file_key),
+            ).fetchone()[0]
+        )
+        db.execute("delete from contact_import_rows where user_id = ? and file_key = ?", (user_id, file_key))
+        save_contact_import_checkpoint(
+            db,
+            user_id,
+            file_key,
+            checkpoint["file_name"],
+            skipped=nonblank - added,
+            status="done",
+            progress=1.0,
+            notified=0 if background else 1,
+        )
+        db.commit()
+    if checkpoint["file_path"]:
+        Path(checkpoint["file_path"]).unlink(missing_ok=True)
+    return added, nonblank - added, json.loads(checkpoint["mapping"])
+
+
+def import_contacts_file(uploaded_file, progress_callback=None) -> tuple[int, int, dict[str, str | float | None]]:
+    file_key = stage_contact_import_file(
+        uploaded_file,
+        (lambda progress, message: progress_callback(progress / 2, message)) if progress_callback else None,
+    )
+    return commit_contact_import(
+        file_key,
+        (lambda progress, message: progress_callback(0.5 + progress / 2, message)) if progress_callback else None,
+    )
+
+
+CONTACT_IMPORT_ACTIVE_STATUSES = ("queued", "staging", "commit_queued", "committing")
+
+
+def contact_import_task_key(user_id: str, file_key: str) -> str:
+    return f"contact_import::{user_id}::{file_key}"
+
+
+def run_contact_import_job(status: dict, user_id: str, file_key: str) -> None:
+    checkpoint = fetch_contact_import_checkpoint(file_key, user_id)
+    if not checkpoint:
+        return
+    try:
+        if not int(checkpoint["staged"]):
+            source = BytesIO(Path(checkpoint["file_path"]).read_bytes())
+            source.name = checkpoint["file_name"]
+            stage_contact_import_file(source, user_id=user_id)
+        if int(checkpoint["auto_commit"]) or checkpoint["status"] in ("commit_queued", "committing"):
+            commit_contact_import(file_key, user_id=user_id)
+    except Exception as exc:
+        with sqlite3.connect(DB_PATH) as db:
+            save_contact_import_checkpoint(db, user_id, file_key, checkpoint["file_name"], status="failed", error=str(exc))
+            db.commit()
+        raise
+
+
+def start_contact_import_job(uploaded_file, auto_commit: bool = False) -> str:
+    user_id = current_user_id()
+    file_key = contact_import_file_key(uploaded_file)
+    checkpoint = fetch_contact_import_checkpoint(file_key, user_id)
+    if checkpoint and checkpoint["status"] == "done":
+        discard_contact_import(file_key, user_id)
+        checkpoint = None
+    import_dir = DATA_DIR / "imports"
+    import_dir.mkdir(parents=True, exist_ok=True)
+    file_path = import_dir / f"{file_key}{Path(uploaded_file.name).suffix.lower()}"
+    if not file_path.exists():
+        file_path.write_bytes(uploaded_file.getvalue())
+    staged = bool(checkpoint and int(checkpoint["staged"]))
+    with sqlite3.connect(DB_PATH) as db:
+        save_contact_import_checkpoint(
+            db,
+            user_id,
+            file_key,
+            uploaded_file.name,
+            status="commit_queued" if staged and auto_commit else "staged" if staged else "queued",
+            auto_commit=1 if auto_commit else 0,
+            file_path=str(file_path),
+            error="",
+        )
+        db.commit()
+    start_background_task(contact_import_task_key(user_id, file_key), run_contact_import_job, user_id, file_key)
+    return file_key
+
+
+def start_contact_import_commit(file_key: str) -> None:
+    user_id = current_user_id()
+    execute(
+        "update contact_import_checkpoints set status = 'commit_queued', error = '', updated_at = ? where user_id = ? and file_key = ?",
+        (now_iso(), user_id, file_key),
+    )
+    start_background_task(contact_import_task_key(user_id, file_key), run_contact_import_job, user_id, file_key)
+
+
+def retry_contact_import_job(file_key: str) -> None:
+    user_id = current_user_id()
+    job = fetch_contact_import_checkpoint(file_key, user_id)
+    if not job:
+        return
+    if not int(job["staged"]):
+        status = "queued"
+    elif int(job["committed_rows"]) or int(job["auto_commit"]):
+        status = "commit_queued"
+    else:
+        status = "staged"
+    with sqlite3.connect(DB_PATH) as db:
+        save_contact_import_checkpoint(db, user_id, file_key, job["file_name"], status=status, error="")
+        db.commit()
+    if status != "staged":
+        start_background_task(contact_import_task_key(user_id, file_key), run_contact_import_job, user_id, file_key)
+
+
+def fetch_contact_import_jobs() -> list[sqlite3.Row]:
+    return rows(
+        "select * from contact_import_checkpoints where user_id = ? order by updated_at desc",
+        (current_user_id(),),
+    )
+
+
+def resume_contact_import_jobs() -> None:
+    user_id = current_user_id()
+    for job in fetch_contact_import_jobs():
+        if job["status"] in CONTACT_IMPORT_ACTIVE_STATUSES and job["file_path"]:
+            start_background_task(contact_import_task_key(user_id, job["file_key"]), run_contact_import_job, user_id, job["file_key"])
+
+
+def sync_contact_import_jobs() -> None:
+    finished = rows(
+        "select file_key, added from contact_import_checkpoints where user_id = ? and status = 'done' and notified = 0",
+        (current_user_id(),),
+    )
+    if not finished:
+        return
+    with sqlite3.connect(DB_PATH) as db:
+        db.executemany(
+            "update contact_import_checkpoints set notified = 1 where user_id = ? and file_key = ?",
+            [(current_user_id(), job["file_key"]) for job in finished],
+        )
+        db.commit()
+    if any(int(job["added"]) for job in finished):
+        mark_app_state_dirty()
+
+
+def contact_import_status_label(status: str) -> str:
+    return {
+        "queued": "読み込み待ち",
+        "staging": "読み込み中",
+        "staged": "確認待ち",
+        "commit_queued": "取り込み待ち",
+        "committing": "取り込み中",
+        "done": "完了",
+        "failed": "失敗",
+    }.get(status, status)
 
 
 def main() -> None:
@@ -2955,7 +6549,11 @@ def main() -> None:
     ensure_default_campaign_template()
     sync_send_queue_results()
     sync_unsubscribes_from_supabase()
-    cleanup_blocked_targets_for_existing_contacts()
+    maybe_reconcile_blocked_targets()
+    sync_youtube_stats_refresh_state()
+    maybe_start_youtube_stats_refresh()
+    sync_contact_import_jobs()
+    resume_contact_import_jobs()
 
     st.title("Creator Outreach Mailer")
     st.caption("許諾済みの宛先だけに、1件ずつ送信する個人用Webアプリ")
@@ -3033,37 +6631,160 @@ def main() -> None:
                 st.rerun()
 
         st.subheader("ファイル取り込み")
-        uploaded = st.file_uploader("CSV / Excelファイル", type=["csv", "tsv", "xlsx", "xls"])
+        uploaded = st.file_uploader("CSV / Excel / Parquet / Arrowファイル", type=["csv", "tsv", "xlsx", "xls", "parquet", "arrow", "feather"])
         st.caption("email / メールアドレス、channel / チャンネル名、name / 名前 などの列名を自動判別します。取り込んだ宛先は自動的に送信可になります。")
-        if uploaded and st.button("取り込む"):
-            try:
-                added, skipped, mapping = import_contacts_file(uploaded)
-                st.success(f"{added}件を取り込みました。重複や空欄は{skipped}件スキップしました。")
-                st.caption(
-                    f"判別した列: email={mapping['email'] or '-'} / "
-                    f"channel={mapping['channel'] or '-'} / name={mapping['name'] or '-'}"
-                )
-            except Exception as exc:
-                st.error(str(exc))
+        import_jobs = fetch_contact_import_jobs()
+        uploaded_file_key = contact_import_file_key(uploaded) if uploaded else ""
+        uploaded_job = next((job for job in import_jobs if job["file_key"] == uploaded_file_key), None)
+        if uploaded and (uploaded_job is None or uploaded_job["status"] in ("done", "failed")):
+            preview_col, direct_col = st.columns(2)
+            if preview_col.button("取り込み内容を確認", use_container_width=True):
+                start_contact_import_job(uploaded)
+                st.rerun()
+            if direct_col.button("確認せずに取り込む", use_container_width=True):
+                start_contact_import_job(uploaded, auto_commit=True)
+                st.rerun()
+        if any(job["status"] in CONTACT_IMPORT_ACTIVE_STATUSES for job in import_jobs):
+            if st_autorefresh:
+                st_autorefresh(interval=2000, key="contact_import_autorefresh")
+            elif st.button("取り込み状況を更新", key="refresh_contact_imports"):
+                st.rerun()
+        for job in import_jobs:
+            job_key = job["file_key"]
+            with st.container(border=True):
+                st.markdown(f"**{job['file_name']}**　{contact_import_status_label(job['status'])}")
+                if job["status"] in CONTACT_IMPORT_ACTIVE_STATUSES:
+                    st.progress(min(1.0, float(job["progress"])))
+                    if job["status"] in ("queued", "staging"):
+                        st.caption(f"{int(job['rows_done']):,}行を読み込みました。画面を閉じても処理は続き、中断した場合は続きから再開します。")
+                    else:
+                        st.caption(f"{int(job['committed_rows']):,} / {int(job['rows_done']):,}行を確認し、{int(job['added']):,}件を追加しました。")
+                elif job["status"] == "staged":
+                    import_report = contact_import_report(job_key)
+                    email_ratio = import_report["mapping"].get("email_ratio")
+                    st.caption(
+                        f"判別した列: email={import_report['mapping'].get('email') or '-'}"
+                        f"{f'（メールアドレス形式 {email_ratio:.0%}）' if email_ratio is not None else ''} / "
+                        f"channel={import_report['mapping'].get('channel') or '-'} / name={import_report['mapping'].get('name') or '-'}"
+                    )
+                    if email_ratio is not None and email_ratio < CONTACT_IMPORT_LOW_EMAIL_RATIO:
+                        st.warning(
+                            f"email列「{import_report['mapping'].get('email')}」のうちメールアドレスの形式になっているのは{email_ratio:.0%}だけです。"
+                            "列の判別が間違っていないか、ファイルを確認してから取り込んでください。"
+                        )
+                    st.dataframe(
+                        pd.DataFrame(
+                            [
+                                {"内容": "新しく追加", "件数": import_report["new"]},
+                                {"内容": "ファイル内で重複", "件数": import_report["file_duplicates"]},
+                                {"内容": "すでに宛先一覧にある", "件数": import_report["existing"]},
+                                {"内容": "配信停止・削除済み", "件数": import_report["blocked"]},
+                                {"内容": "メールアドレスの形式が不正", "件数": import_report["malformed"]},
+                                {"内容": "メールアドレスが空欄", "件数": import_report["blank"]},
+                            ]
+                        ),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+                    if not import_report["blocked_reasons"].empty:
+                        st.caption("配信停止・削除済みの内訳")
+                        st.dataframe(
+                            import_report["blocked_reasons"].rename(columns={"reason": "理由", "count": "件数"}),
+                            use_container_width=True,
+                            hide_index=True,
+                        )
+                    confirm_col, cancel_col = st.columns(2)
+                    if confirm_col.button(
+                        "この内容で取り込む",
+                        key=f"commit_contact_import_{job_key}",
+                        use_container_width=True,
+                        disabled=import_report["new"] == 0,
+                    ):
+                        start_contact_import_commit(job_key)
+                        st.rerun()
+                    if cancel_col.button("取り込みをやめる", key=f"discard_contact_import_{job_key}", use_container_width=True):
+                        discard_contact_import(job_key)
+                        st.rerun()
+                elif job["status"] == "done":
+                    st.success(f"{int(job['added'])}件を取り込みました。重複や空欄は{int(job['skipped'])}件スキップしました。")
+                    if st.button("閉じる", key=f"close_contact_import_{job_key}"):
+                        discard_contact_import(job_key)
+                        st.rerun()
+                else:
+                    st.error(job["error"] or "取り込みに失敗しました")
+                    retry_col, delete_col = st.columns(2)
+                    if retry_col.button(
+                        "続きから再開",
+                        key=f"retry_contact_import_{job_key}",
+                        use_container_width=True,
+                        disabled=not int(job["staged"]) and not Path(job["file_path"] or ".missing").is_file(),
+                    ):
+                        retry_contact_import_job(job_key)
+                        st.rerun()
+                    if delete_col.button("削除", key=f"delete_contact_import_{job_key}", use_container_width=True):
+                        discard_contact_import(job_key)
+                        st.rerun()
 
         st.subheader("YouTube候補検索")
         st.caption("メールアドレスは取得しません。条件に合うチャンネル候補だけを保存します。")
-        yt_search_mode = st.radio("検索方法", ["カテゴリー", "キーワード"], horizontal=True)
+        yt_search_mode = st.radio("検索方法", ["カテゴリー", "キーワード", "まとめて検索", "人気動画まとめて"], horizontal=True)
         yt_category_name = ""
         yt_category_id = ""
+        yt_batch_workers = 1
         if yt_search_mode == "カテゴリー":
             yt_category_name = st.selectbox("カテゴリー", options=list(YOUTUBE_VIDEO_CATEGORIES.keys()))
             yt_category_id = YOUTUBE_VIDEO_CATEGORIES[yt_category_name]
+            yt_region_name = st.selectbox("地域", options=list(YOUTUBE_REGIONS.keys()))
             yt_keyword = st.text_input("補助キーワード（任意）", placeholder="例: 初心者 / 日本 / レビュー")
             st.caption("カテゴリー検索は、チャンネル自体ではなく、そのカテゴリーの人気動画を出しているチャンネルを候補化します。補助キーワードを入れると動画タイトル・説明文・チャンネル名で絞り込みます。")
+            yt_queries = youtube_most_popular_queries([yt_category_name], [yt_region_name], yt_keyword)
+        elif yt_search_mode == "まとめて検索":
+            yt_batch_keywords = st.text_area("検索キーワード（1行に1つ）", placeholder="例:\n料理 レシピ\nゲーム実況\n英会話", height=120)
+            yt_batch_categories = st.multiselect("カテゴリー（任意）", options=list(YOUTUBE_VIDEO_CATEGORIES.keys()))
+            yt_keyword = st.text_input("カテゴリーの補助キーワード（任意）", placeholder="例: 初心者 / 日本 / レビュー")
+            yt_batch_workers = st.number_input("同時に検索する数", min_value=1, max_value=8, value=4)
+            st.caption("複数のキーワードとカテゴリーを同時に検索します。同じチャンネルが複数の検索で見つかった場合は、最初に見つかった検索の候補として1回だけ保存します。")
+            keyword_lines = list(dict.fromkeys(line.strip() for line in yt_batch_keywords.splitlines() if line.strip()))
+            yt_queries = [youtube_search_query("キーワード", line) for line in keyword_lines] + [
+                youtube_search_query("カテゴリー", yt_keyword, YOUTUBE_VIDEO_CATEGORIES[name], f"カテゴリー: {name}")
+                for name in yt_batch_categories
+            ]
+        elif yt_search_mode == "人気動画まとめて":
+            yt_sweep_categories = st.multiselect(
+                "カテゴリー",
+                options=list(YOUTUBE_VIDEO_CATEGORIES.keys()),
+                default=list(YOUTUBE_VIDEO_CATEGORIES.keys()),
+            )
+            yt_sweep_regions = st.multiselect("地域", options=list(YOUTUBE_REGIONS.keys()), default=["日本"])
+            yt_keyword = st.text_input("補助キーワード（任意）", placeholder="例: 初心者 / 日本 / レビュー")
+            yt_batch_workers = st.number_input("同時に取得する数", min_value=1, max_value=16, value=8)
+            st.caption("選んだカテゴリーと地域の人気動画を同時に取得し、重複するチャンネルをまとめてから登録者数を1回で確認します。1カテゴリーあたり約1〜2 unitsです。")
+            yt_queries = youtube_most_popular_queries(yt_sweep_categories, yt_sweep_regions, yt_keyword)
         else:
             yt_keyword = st.text_input("検索キーワード", placeholder="例: 料理 レシピ / ゲーム実況 / 英会話")
+            yt_queries = [youtube_search_query(yt_search_mode, yt_keyword)]
         yt_min_subs = st.number_input("登録者数 最小", min_value=0, value=1000, step=1000)
         yt_max_subs = st.number_input("登録者数 最大（0なら上限なし）", min_value=0, value=100000, step=1000)
-        yt_max_results = st.number_input("最大取得件数", min_value=1, max_value=200, value=50)
+        yt_max_results = st.number_input(
+            "最大取得件数（検索ごと）" if yt_search_mode in ("まとめて検索", "人気動画まとめて") else "最大取得件数",
+            min_value=1,
+            max_value=200,
+            value=50,
+        )
         daily_limit = get_youtube_daily_limit()
         used_units = get_youtube_units_used()
-        estimated_units = estimate_youtube_units(int(yt_max_results), yt_search_mode)
+        cached_pages = 0
+        estimated_units = 0
+        for query in yt_queries:
+            query_cached_pages = count_cached_youtube_search_pages(
+                query["search_mode"],
+                query["keyword"],
+                query["category_id"],
+                int(yt_max_results),
+                query["region_code"],
+            )
+            cached_pages += query_cached_pages
+            estimated_units += estimate_youtube_units(int(yt_max_results), query["search_mode"], query_cached_pages)
         remaining_units = max(0, daily_limit - used_units)
         usage_ratio = min(1.0, used_units / daily_limit)
         st.progress(usage_ratio)
@@ -3072,18 +6793,93 @@ def main() -> None:
             f"残り目安 {remaining_units:,} units、今回予定 約{estimated_units:,} units"
         )
         st.caption("目安: キーワード検索は50件ごとに約101 unitsです。カテゴリー検索は人気動画から拾う方式なので50件ごとに約2 unitsです。")
+        if cached_pages:
+            st.caption(f"同じ条件の検索結果が{cached_pages}ページ分保存されています。保存済みのページは登録者数の条件を変えても0 unitsで再利用します。")
         if used_units >= daily_limit:
             st.error("今日の推定上限に達しています。Google側のリセット後に再度試してください。")
         elif used_units + estimated_units > daily_limit:
             st.warning("この検索を実行すると、今日の推定上限を超える可能性があります。取得件数を減らしてください。")
         elif used_units / daily_limit >= 0.8:
             st.warning("YouTube API使用量が上限に近づいています。")
-        yt_submitted = st.button("候補を検索して保存")
+        usage_by_keyword = fetch_youtube_api_usage_by_keyword()
+        if not usage_by_keyword.empty:
+            with st.expander("YouTube API使用量の内訳（直近7日）"):
+                st.caption("検索ごとの実際の使用量です。日付は米国太平洋時間（YouTube APIの上限リセット基準）です。今回予定の見積もりは、この履歴の1ページあたり平均から計算しています。")
+                st.dataframe(
+                    usage_by_keyword.rename(
+                        columns={
+                            "usage_date": "日付",
+                            "search_mode": "検索方法",
+                            "keyword": "検索",
+                            "pages": "ページ数",
+                            "units": "使用量 units",
+                        }
+                    ),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+        search_button_col, schedule_button_col = st.columns(2)
+        yt_submitted = search_button_col.button("候補を検索して保存", use_container_width=True)
+        yt_scheduled = schedule_button_col.button("予約検索に追加", use_container_width=True)
+        if yt_scheduled:
+            if not yt_queries or (yt_search_mode == "キーワード" and not yt_keyword.strip()):
+                st.error("検索キーワードかカテゴリーを1つ以上入力してください")
+            else:
+                created_jobs = create_youtube_search_jobs(yt_queries, int(yt_min_subs), int(yt_max_subs), int(yt_max_results))
+                st.success(f"{created_jobs}件の検索を予約しました。今日の上限を超える分は、YouTube APIの上限リセット後（米国太平洋時間の0時）に続きから実行します。")
         if yt_submitted:
             if yt_search_mode == "キーワード" and not yt_keyword.strip():
                 st.error("検索キーワードを入力してください")
-            elif get_youtube_units_used() + estimate_youtube_units(int(yt_max_results), yt_search_mode) > get_youtube_daily_limit():
+            elif not yt_queries:
+                st.error("検索キーワードかカテゴリーを1つ以上入力してください")
+            elif get_youtube_units_used() + estimated_units > get_youtube_daily_limit():
                 st.error("推定上限を超えるため検索を止めました。最大取得件数を減らすか、明日以降に実行してください。")
+            elif yt_search_mode in ("まとめて検索", "人気動画まとめて"):
+                batch_progress = st.progress(0.0)
+                batch_status = st.empty()
+                batch_rows = []
+
+                def show_batch_progress(completed: int, total: int, result: dict) -> None:
+                    batch_rows.append(
+                        {
+                            "検索": result["label"],
+                            "確認": result["found"],
+                            "新規保存": result["saved"],
+                            "他の検索と重複": result["duplicates"],
+                            "使用量 units": result["units_used"],
+                            "エラー": result["error"] or "-",
+                        }
+                    )
+                    batch_progress.progress(completed / max(total, 1))
+                    batch_status.dataframe(pd.DataFrame(batch_rows), use_container_width=True, hide_index=True)
+
+                if yt_search_mode == "人気動画まとめて":
+                    sweep = sweep_youtube_most_popular(
+                        yt_queries,
+                        int(yt_min_subs),
+                        int(yt_max_subs),
+                        int(yt_max_results),
+                        int(yt_batch_workers),
+                        show_batch_progress,
+                    )
+                    batch_results = sweep["results"]
+                    total_units = sweep["units_used"]
+                else:
+                    batch_results = search_youtube_channels_batch(
+                        yt_queries,
+                        int(yt_min_subs),
+                        int(yt_max_subs),
+                        int(yt_max_results),
+                        int(yt_batch_workers),
+                        show_batch_progress,
+                    )
+                    total_units = sum(result["units_used"] for result in batch_results)
+                total_checked = sum(result["found"] for result in batch_results)
+                total_saved = sum(result["saved"] for result in batch_results)
+                failed_labels = [result["label"] for result in batch_results if result["error"]]
+                st.success(f"{len(batch_results)}件の検索で{total_checked}件を確認し、新規候補を{total_saved}件保存しました。推定使用量: {total_units} units")
+                if failed_labels:
+                    st.error(f"一部の検索に失敗しました: {' / '.join(failed_labels)}")
             else:
                 try:
                     checked, saved, units_used = search_youtube_channels(
@@ -3093,12 +6889,141 @@ def main() -> None:
                         int(yt_max_results),
                         yt_search_mode,
                         yt_category_id,
-                        f"カテゴリー: {yt_category_name}" if yt_search_mode == "カテゴリー" else yt_keyword.strip(),
+                        yt_queries[0]["label"],
+                        yt_queries[0]["region_code"],
                     )
                     st.success(f"{checked}件を確認し、新規候補を{saved}件保存しました。推定使用量: {units_used} units")
                 except Exception as exc:
                     st.error(str(exc))
 
+        youtube_search_jobs = fetch_youtube_search_jobs()
+        if youtube_search_jobs:
+            pending_jobs = [job for job in youtube_search_jobs if job["status"] in ("queued", "deferred")]
+            with st.expander(f"予約検索（未完了 {len(pending_jobs)}件）", expanded=bool(pending_jobs)):
+                st.caption("予約した検索は、YouTube APIの1日上限の範囲で少しずつ実行します。上限を超える分は、米国太平洋時間の0時のリセット後に前回の続きのページから再開します。この画面を開いている間は10分ごとに自動で進みます。")
+                job_run_col, job_clear_col = st.columns(2)
+                run_jobs_now = job_run_col.button("予約検索を今すぐ進める", use_container_width=True, disabled=not pending_jobs)
+                if job_clear_col.button("完了・失敗した予約を削除", use_container_width=True):
+                    delete_finished_youtube_search_jobs()
+                    st.rerun()
+                if pending_jobs and st_autorefresh:
+                    st_autorefresh(interval=600_000, key="youtube_search_jobs_autorefresh")
+                last_auto_run = float(st.session_state.setdefault("_youtube_search_jobs_last_run", time.time()))
+                if pending_jobs and (run_jobs_now or time.time() - last_auto_run >= 600):
+                    st.session_state["_youtube_search_jobs_last_run"] = time.time()
+                    with st.spinner("予約検索を実行しています"):
+                        job_summary = run_youtube_search_jobs()
+                    if job_summary["done"] or job_summary["failed"] or job_summary["deferred"]:
+                        st.rerun()
+                st.dataframe(
+                    pd.DataFrame(
+                        [
+                            {
+                                "検索": job["label"] or job["keyword"],
+                                "状態": youtube_search_job_status_label(job["status"]),
+                                "確認済み": f"{int(job['found'])} / {int(job['max_results'])}件",
+                                "新規保存": int(job["saved"]),
+                                "使用量 units": int(job["units_used"]),
+                                "残り予定 units": youtube_search_job_remaining_units(job),
+                                "再開予定": format_jst_datetime(job["not_before"]) if job["status"] == "deferred" else "-",
+                                "エラー": job["error"] or "-",
+                            }
+                            for job in youtube_search_jobs
+                        ]
+                    ),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+                job_options = {f"#{job['id']} {job['label'] or job['keyword']}": int(job["id"]) for job in youtube_search_jobs}
+                delete_job_col, delete_job_button_col = st.columns([2.0, 1.0])
+                selected_job_label = delete_job_col.selectbox("予約を選択", list(job_options.keys()), key="youtube_search_job_select")
+                if delete_job_button_col.button("この予約を削除", key="delete_youtube_search_job", use_container_width=True):
+                    delete_youtube_search_job(job_options[selected_job_label])
+                    st.rerun()
+
+        with st.expander("関連チャンネルから探す"):
+            st.caption(
+                "保存済みの候補を起点に、チャンネルのセクションやおすすめチャンネルをたどって新しい候補を探します。"
+                "1チャンネルの確認が1 unitで、キーワード検索（1ページ100 units）よりも少ない使用量で候補を増やせます。"
+                "登録者数の条件は上の検索と同じものを使います。"
+            )
+            crawl_budget_col, crawl_depth_col = st.columns(2)
+            crawl_budget = crawl_budget_col.number_input(
+                "今回使う上限 units",
+                min_value=2,
+                max_value=max(2, get_youtube_daily_limit()),
+                value=min(200, max(2, get_youtube_daily_limit())),
+                step=50,
+                key="youtube_crawl_budget",
+            )
+            crawl_depth = crawl_depth_col.number_input("たどる深さ", min_value=1, max_value=5, value=2, step=1, key="youtube_crawl_depth")
+            crawl_counts = count_youtube_crawl_frontier(int(crawl_depth))
+            st.caption(
+                f"探索待ち {crawl_counts['queued']}件 / 情報取得待ち {crawl_counts['new']}件 / 探索済み {crawl_counts['done']}件"
+            )
+            crawl_run_col, crawl_clear_col = st.columns(2)
+            if crawl_run_col.button("関連チャンネルを探す", key="run_youtube_crawl", use_container_width=True):
+                crawl_remaining = get_youtube_daily_limit() - get_youtube_units_used()
+                if crawl_remaining < 2:
+                    st.error("今日のYouTube API上限を使い切っています")
+                else:
+                    crawl_progress = st.empty()
+                    try:
+                        crawl_summary = crawl_youtube_related_channels(
+                            int(yt_min_subs),
+                            int(yt_max_subs),
+                            min(int(crawl_budget), crawl_remaining),
+                            int(crawl_depth),
+                            progress_callback=lambda summary: crawl_progress.caption(
+                                f"探索 {summary['expanded']}件 / 発見 {summary['discovered']}件 / 新規保存 {summary['saved']}件 / {summary['units_used']} units"
+                            ),
+                        )
+                        st.success(
+                            f"{crawl_summary['expanded']}チャンネルをたどり、{crawl_summary['discovered']}件を発見、"
+                            f"新規候補を{crawl_summary['saved']}件保存しました。使用量: {crawl_summary['units_used']} units"
+                        )
+                        if crawl_summary["error"]:
+                            st.warning(crawl_summary["error"])
+                    except Exception as exc:
+                        st.error(str(exc))
+            if crawl_clear_col.button("探索の記録をリセット", key="clear_youtube_crawl", use_container_width=True):
+                clear_youtube_crawl_frontier()
+                st.success("探索の記録をリセットしました。次回は保存済みの候補から探索し直します。")
+
+        stats_refresh_status = background_task_status(youtube_stats_refresh_task_key())
+        with st.expander("登録者数の更新", expanded=stats_refresh_status.get("state") == "running"):
+            st.caption(
+                f"登録者数・動画数・再生回数が{get_youtube_stats_refresh_days()}日以上前のチャンネルを、"
+                f"1日上限の{get_youtube_stats_refresh_share()}%の範囲で50件ずつ更新します（50件で1 unit）。"
+                "送信対象の宛先を優先し、次に候補を更新します。"
+            )
+            stats_progress = stats_refresh_status.get("progress", {})
+            stale_col, budget_col = st.columns(2)
+            stale_col.metric("更新待ち", f"{count_stale_youtube_channels()}件")
+            budget_col.metric("今日の残り", f"{youtube_stats_refresh_budget()} units")
+            if stats_refresh_status.get("state") == "running":
+                st.info(f"更新中: {int(stats_progress.get('refreshed', 0))}件 / {int(stats_progress.get('units_used', 0))} units")
+            elif stats_refresh_status.get("state") == "done":
+                st.success(
+                    f"前回の更新: {int(stats_progress.get('refreshed', 0))}件 / {int(stats_progress.get('units_used', 0))} units"
+                    f"（{format_jst_datetime(stats_refresh_status.get('finished_at', ''))}）"
+                )
+            elif stats_refresh_status.get("state") == "failed":
+                st.error(f"前回の更新に失敗しました: {stats_refresh_status.get('error', '')}")
+            refresh_col, reload_col = st.columns(2)
+            if refresh_col.button(
+                "今すぐ更新",
+                key="start_youtube_stats_refresh",
+                use_container_width=True,
+                disabled=stats_refresh_status.get("state") == "running",
+            ):
+                if start_youtube_stats_refresh():
+                    st.success("バックグラウンドで登録者数の更新を開始しました")
+                else:
+                    st.warning("YouTube APIキーが未設定か、今日の更新用の上限を使い切っています")
+            if reload_col.button("状態を再読み込み", key="reload_youtube_stats_refresh", use_container_width=True):
+                st.rerun()
+
     with right:
         st.subheader("メール作成")
         current_campaign_name = get_setting("CURRENT_CAMPAIGN_NAME", DEFAULT_CAMPAIGN_NAME)
@@ -3376,6 +7301,23 @@ def main() -> None:
         if send_window_end <= send_window_start:
             st.warning("メールを送ってよい時間は、「この時間まで」を「この時間から」より後にしてください。")
         st.caption("この時間帯の外では送信しません。時間を超えた分は、翌日の「この時間から」に自動で持ち越します。")
+        pool_accounts = {int(account["id"]): dict(account) for account in fetch_smtp_accounts()}
+        send_accounts = [active_smtp_account()]
+        balance_policy = "weighted"
+        if len(pool_accounts) >= 2 and st.checkbox("複数の送信元に分散して送る", key="use_smtp_account_pool"):
+            pool_account_ids = st.multiselect(
+                "使う送信元",
+                list(pool_accounts),
+                default=list(pool_accounts),
+                format_func=lambda account_id: f"{pool_accounts[account_id]['label']} / {pool_accounts[account_id]['sender_email']}",
+                key="smtp_account_pool_ids",
+            )
+            balance_label = st.radio("振り分け方", list(SMTP_BALANCE_POLICIES), horizontal=True, key="smtp_balance_policy")
+            balance_policy = SMTP_BALANCE_POLICIES[balance_label]
+            send_accounts = [pool_accounts[account_id] for account_id in pool_account_ids] or send_accounts
+            st.caption("送信元ごとの1日上限と重みは送信元メール設定で変えられます。上限に達した送信元や、認証・上限エラーになった送信元は外して、残りの送信元で送ります。")
+            if get_send_queue_mode() == "supabase":
+                st.caption("Supabase方式の送信予約では分散できません。その場で送信するか、送信ワーカー方式の送信予約を使ってください。")
         if int(send_limit) > 300:
             st.warning("今回の送信件数が多めです。送信先の反応、迷惑メール判定、サーバー制限を確認しながら少しずつ増やしてください。")
         confirmed = st.checkbox("送信対象が許諾済み、または法的に送信可能な宛先であることを確認しました")
@@ -3493,12 +7435,9 @@ def main() -> None:
                 st.write("プレビューできる送信対象がありません。宛先一覧、配信名、送信済み状況を確認してください。")
             else:
                 preview_contact = preview_contacts[0]
-                preview_unsubscribe_url = build_unsubscribe_url(preview_contact)
-                preview_subject = render_template(effective_subject_template, preview_contact, preview_unsubscribe_url)
-                preview_body = render_template(
-                    ensure_unsubscribe_link_template(effective_body_template),
+                preview_subject, preview_body = render_send_message(
+                    build_send_context(effective_subject_template, effective_body_template),
                     preview_contact,
-                    preview_unsubscribe_url,
                 )
                 st.caption(
                     f"送信対象の先頭1件で確認しています: "
@@ -3726,13 +7665,17 @@ def main() -> None:
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                     use_container_width=True,
                 )
+                columnar_download_buttons("sends", export_name, "送信ログ（全件）")
 
         test_button, send_button = st.columns(2)
         with test_button:
             run_test = st.button("最初の1件でテスト", use_container_width=True)
         with send_button:
             run_all = st.button("指定件数を送信予約", type="primary", use_container_width=True)
-        st.info("送信予約を作成すると、送信処理はサーバー側で進みます。予約後はこのタブを閉じても、パソコンの電源を切っても、設定した間隔で送信が続きます。進捗は「最近の送信予約」で確認できます。すべて完了すると、ログイン中のGoogleメールアドレスに完了メールが届きます。")
+        if get_send_queue_mode() == "local":
+            st.info("送信予約を作成すると、送信ワーカー（send_worker.py）が設定した間隔で送信します。ワーカーを起動している間はこのタブを閉じても送信が続きます。進捗は「最近の送信予約」で確認できます。")
+        else:
+            st.info("送信予約を作成すると、送信処理はサーバー側で進みます。予約後はこのタブを閉じても、パソコンの電源を切っても、設定した間隔で送信が続きます。進捗は「最近の送信予約」で確認できます。すべて完了すると、ログイン中のGoogleメールアドレスに完了メールが届きます。")
 
         if run_test or run_all:
             preflight_errors = []
@@ -3772,30 +7715,39 @@ def main() -> None:
                         int(delay),
                         send_window_start,
                         send_window_end,
+                        send_accounts,
+                        balance_policy,
                     )
                     if ok:
                         st.success(message)
-                        st.caption("送信予約はサーバー側で処理されます。タブやPCを閉じても、定期実行が有効なら送信が続きます。")
+                        if get_send_queue_mode() == "local":
+                            st.caption("送信予約は送信ワーカーが処理します。`python send_worker.py` が起動していることを確認してください。")
+                        else:
+                            st.caption("送信予約はサーバー側で処理されます。タブやPCを閉じても、定期実行が有効なら送信が続きます。")
                     else:
                         st.error(message)
                 else:
                     progress = st.progress(0)
                     log = st.empty()
-                    sent = failed = 0
+                    completed = []
                     failed_contacts = []
                     user_email = current_user_profile()["email"].strip().lower() or current_user_id()
-                    for index, contact in enumerate(contacts):
-                        register_unsubscribe_token(contact, user_email)
-                        unsubscribe_url = build_unsubscribe_url(contact)
-                        subject = render_template(effective_subject_template, contact, unsubscribe_url)
-                        body = render_template(ensure_unsubscribe_link_template(effective_body_template), contact, unsubscribe_url)
-                        ok, result = send_email(contact["email"], subject, body)
-                        execute(
-                            "insert into sends(user_id, contact_id, campaign_key, subject, status, error, sent_at) values (?, ?, ?, ?, ?, ?, ?)",
-                            (current_user_id(), contact["id"], current_campaign_key, subject, "sent" if ok else "failed", "" if ok else result, now_iso()),
-                        )
-                        sent += 1 if ok else 0
-                        failed += 0 if ok else 1
+                    usage_date = smtp_usage_date()
+                    assigned_accounts = assign_smtp_accounts(send_accounts, [usage_date] * len(contacts), balance_policy)
+                    send_context = build_send_context(effective_subject_template, effective_body_template)
+                    outgoing = []
+                    for contact, assigned_account in zip(contacts, assigned_accounts):
+                        if assigned_account is None:
+                            continue
+                        subject, body = render_send_message(send_context, contact)
+                        outgoing.append({"contact": contact, "account": assigned_account, "to_email": contact["email"], "subject": subject, "body": body})
+                    register_unsubscribe_tokens([message["contact"] for message in outgoing], user_email)
+                    if len(outgoing) < len(contacts):
+                        st.warning(f"{len(contacts) - len(outgoing)}件は送信元の1日上限に達しているため、今回は送りません。")
+
+                    def record_send_result(index: int, ok: bool, result: str) -> None:
+                        contact = outgoing[index]["contact"]
+                        completed.append(ok)
                         if not ok:
                             failed_contacts.append(
                                 {
@@ -3805,9 +7757,26 @@ def main() -> None:
                                     "error": result,
                                 }
                             )
-                        progress.progress((index + 1) / max(len(contacts), 1))
-                        log.write(f"{index + 1}/{len(contacts)}: {contact['email']} - {result}")
-
+                        progress.progress(len(completed) / max(len(outgoing), 1))
+                        log.write(f"{len(completed)}/{len(outgoing)}: {contact['email']} - {result}")
+
+                    def record_failover(failed_account: dict, error: str) -> None:
+                        category = classify_send_failure(error)[0]
+                        if category != "SMTP認証エラー":
+                            record_smtp_account_usage(int(failed_account.get("id") or 0), usage_date, 0, exhausted=True)
+                        st.warning(f"{failed_account.get('label') or failed_account.get('sender_email')} で送れなかったため、残りは別の送信元で送ります（{category}）。")
+
+                    deliver_messages(
+                        send_accounts[0],
+                        outgoing,
+                        record_send_result,
+                        partial(write_direct_send_results, current_user_id(), current_campaign_key, usage_date, outgoing),
+                        fallback_accounts=smtp_failover_pool(send_accounts, usage_date, assigned_accounts) if len(send_accounts) > 1 else None,
+                        failover_callback=record_failover,
+                    )
+                    mark_app_state_dirty()
+                    sent = sum(completed)
+                    failed = len(completed) - sent
                     st.success(f"処理完了: 成功 {sent} 件 / 失敗 {failed} 件")
                     if failed_contacts:
                         st.error("以下のメールアドレスに送信できませんでした。")
@@ -3832,7 +7801,6 @@ def main() -> None:
 
     st.divider()
     st.subheader("宛先一覧")
-    cleanup_blocked_targets_for_existing_contacts()
     contacts = fetch_contacts()
     blocked_targets = fetch_blocked_targets()
     if not blocked_targets.empty:
@@ -3972,6 +7940,7 @@ def main() -> None:
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             use_container_width=True,
         )
+        columnar_download_buttons("contacts", export_name, "宛先一覧（全件）")
 
         total_contacts = len(contacts)
         page_col, size_col, info_col = st.columns([1.0, 1.0, 2.0])
@@ -4088,6 +8057,8 @@ def main() -> None:
             st.write("検索条件に合う候補はありません。")
             return
 
+        columnar_download_buttons("candidates", datetime.now(APP_TIMEZONE).strftime("candidates_%Y%m%d_%H%M"), "候補一覧（全件）")
+
         total_candidates = len(candidates)
         candidate_page_col, candidate_size_col, candidate_info_col = st.columns([1.0, 1.0, 2.0])
         candidate_page_size = candidate_size_col.selectbox(
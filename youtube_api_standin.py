@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from streamlit_app import YOUTUBE_VIDEO_CATEGORIES
+
+
+ENDPOINT_UNITS = {
+    "search": 100,
+    "videos": 1,
+    "channels": 1,
+    "channelSections": 1,
+}
+TITLE_WORDS = [
+    "料理", "レシピ", "ゲーム", "実況", "英会話", "旅行", "vlog", "猫", "犬", "筋トレ",
+    "メイク", "ファッション", "キャンプ", "釣り", "アニメ", "音楽", "ピアノ", "ギター", "科学", "教育",
+    "cooking", "gaming", "travel", "music", "study", "fitness", "review", "tech", "daily", "news",
+]
+SEARCH_RESULT_CAP = 500
+MOST_POPULAR_CAP = 200
+
+
+def fixture_channel_id(seed: int, index: int) -> str:
+    digest = hashlib.sha256(f"{seed}:channel:{index}".encode("utf-8")).hexdigest()
+    return "UC" + digest[:22]
+
+
+def build_fixture_corpus(channel_count: int = 5000, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    channels = []
+    for index in range(channel_count):
+        words = rng.sample(TITLE_WORDS, 3)
+        subscriber_count = int(10 ** rng.uniform(1, 6.7))
+        video_count = rng.randint(1, 2000)
+        channels.append(
+            {
+                "id": fixture_channel_id(seed, index),
+                "title": f"{words[0]} {words[1]} channel {index}",
+                "description": f"{words[0]}と{words[2]}の動画を投稿しています。",
+                "subscriber_count": subscriber_count,
+                "video_count": video_count,
+                "view_count": subscriber_count * rng.randint(20, 400),
+                "category_id": rng.choice(list(YOUTUBE_VIDEO_CATEGORIES.values())),
+            }
+        )
+    for channel in channels:
+        channel["sections"] = [
+            [related["id"] for related in rng.sample(channels, min(len(channels), rng.randint(1, 8)))]
+            for _ in range(rng.randint(0, 2))
+        ]
+        channel["featured_channel_ids"] = [related["id"] for related in rng.sample(channels, min(len(channels), rng.randint(0, 4)))]
+    videos_by_category: dict[str, list[dict]] = {}
+    for category_id in YOUTUBE_VIDEO_CATEGORIES.values():
+        category_channels = [channel for channel in channels if channel["category_id"] == category_id] or channels
+        videos_by_category[category_id] = [
+            {
+                "id": hashlib.sha256(f"{seed}:video:{category_id}:{index}".encode("utf-8")).hexdigest()[:11],
+                "channel": rng.choice(category_channels),
+            }
+            for index in range(MOST_POPULAR_CAP)
+        ]
+    return {
+        "channels": channels,
+        "channels_by_id": {channel["id"]: channel for channel in channels},
+        "videos_by_category": videos_by_category,
+    }
+
+
+def channel_resource(channel: dict, parts: set[str]) -> dict:
+    resource = {"kind": "youtube#channel", "id": channel["id"]}
+    if "snippet" in parts:
+        resource["snippet"] = {
+            "title": channel["title"],
+            "description": channel["description"],
+        }
+    if "statistics" in parts:
+        resource["statistics"] = {
+            "subscriberCount": str(channel["subscriber_count"]),
+            "videoCount": str(channel["video_count"]),
+            "viewCount": str(channel["view_count"]),
+        }
+    if "brandingSettings" in parts:
+        resource["brandingSettings"] = {
+            "channel": {
+                "title": channel["title"],
+                "featuredChannelsUrls": list(channel["featured_channel_ids"]),
+            }
+        }
+    return resource
+
+
+def page_slice(items: list, params: dict[str, str]) -> tuple[list, str]:
+    try:
+        offset = int(params.get("pageToken", "").removeprefix("P") or 0)
+    except ValueError:
+        offset = 0
+    try:
+        page_size = max(0, min(50, int(params.get("maxResults", "5"))))
+    except ValueError:
+        page_size = 5
+    page = items[offset : offset + page_size]
+    next_offset = offset + page_size
+    return page, f"P{next_offset}" if next_offset < len(items) else ""
+
+
+def search_channels(corpus: dict, query: str) -> list[dict]:
+    terms = [term for term in query.lower().split() if term]
+    matched = [
+        channel
+        for channel in corpus["channels"]
+        if terms and all(term in f"{channel['title']} {channel['description']}".lower() for term in terms)
+    ]
+    matched_ids = {channel["id"] for channel in matched}
+    rng = random.Random(hashlib.sha256(query.encode("utf-8")).hexdigest())
+    filler = [channel for channel in corpus["channels"] if channel["id"] not in matched_ids]
+    rng.shuffle(filler)
+    return (matched + filler)[:SEARCH_RESULT_CAP]
+
+
+class YouTubeStandinState:
+    def __init__(self, corpus: dict, latency_ms: int = 0, jitter_ms: int = 0, quota: int = 0) -> None:
+        self.corpus = corpus
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.quota = quota
+        self.units = 0
+        self.requests: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def charge(self, endpoint: str) -> bool:
+        cost = ENDPOINT_UNITS.get(endpoint, 1)
+        with self.lock:
+            if self.quota and self.units + cost > self.quota:
+                return False
+            self.units += cost
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            return True
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"units": self.units, "requests": dict(self.requests)}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.units = 0
+            self.requests = {}
+
+
+def youtube_error(code: int, reason: str, message: str) -> dict:
+    return {"error": {"code": code, "message": message, "errors": [{"reason": reason, "message": message}]}}
+
+
+class YouTubeStandinHandler(BaseHTTPRequestHandler):
+    server: "YouTubeStandinServer"
+
+    def log_message(self, format: str, *args) -> None:
+        return
+
+    def send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        parsed = urllib.parse.urlparse(self.path)
+        endpoint = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+        params = {key: values[-1] for key, values in urllib.parse.parse_qs(parsed.query).items()}
+        state = self.server.state
+
+        if endpoint == "stats":
+            self.send_json(200, state.stats())
+            return
+        if endpoint not in ENDPOINT_UNITS:
+            self.send_json(404, youtube_error(404, "notFound", f"Unknown endpoint: {endpoint}"))
+            return
+        if not params.get("key"):
+            self.send_json(400, youtube_error(400, "keyInvalid", "API key not valid. Please pass a valid API key."))
+            return
+        if state.latency_ms or state.jitter_ms:
+            time.sleep(max(0, state.latency_ms + random.uniform(-state.jitter_ms, state.jitter_ms)) / 1000)
+        if not state.charge(endpoint):
+            self.send_json(403, youtube_error(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota."))
+            return
+
+        corpus = state.corpus
+        if endpoint == "search":
+            page, next_page_token = page_slice(search_channels(corpus, params.get("q", "")), params)
+            payload = {
+                "kind": "youtube#searchListResponse",
+                "items": [
+                    {
+                        "kind": "youtube#searchResult",
+                        "id": {"kind": "youtube#channel", "channelId": channel["id"]},
+                        "snippet": {
+                            "channelId": channel["id"],
+                            "title": channel["title"],
+                            "description": channel["description"],
+                            "channelTitle": channel["title"],
+                        },
+                    }
+                    for channel in page
+                ],
+            }
+        elif endpoint == "videos":
+            videos = corpus["videos_by_category"].get(params.get("videoCategoryId", ""), [])
+            region_code = params.get("regionCode", "JP")
+            if region_code != "JP":
+                videos = list(videos)
+                random.Random(f"{region_code}:{params.get('videoCategoryId', '')}").shuffle(videos)
+            page, next_page_token = page_slice(videos, params)
+            payload = {
+                "kind": "youtube#videoListResponse",
+                "items": [
+                    {
+                        "kind": "youtube#video",
+                        "id": video["id"],
+                        "snippet": {
+                            "channelId": video["channel"]["id"],
+                            "channelTitle": video["channel"]["title"],
+                            "title": f"{video['channel']['title']} の人気動画",
+                            "description": video["channel"]["description"],
+                        },
+                    }
+                    for video in page
+                ],
+            }
+        elif endpoint == "channelSections":
+            channel = corpus["channels_by_id"].get(params.get("channelId", ""))
+            if channel is None:
+                self.send_json(404, youtube_error(404, "channelNotFound", "The channel specified in the channelId parameter cannot be found."))
+                return
+            next_page_token = ""
+            payload = {
+                "kind": "youtube#channelSectionListResponse",
+                "items": [
+                    {
+                        "kind": "youtube#channelSection",
+                        "id": f"{channel['id']}.section{index}",
+                        "snippet": {"type": "multiplechannels", "channelId": channel["id"], "position": index},
+                        "contentDetails": {"channels": related_ids},
+                    }
+                    for index, related_ids in enumerate(channel["sections"])
+                ],
+            }
+        else:
+            parts = set(params.get("part", "snippet").split(","))
+            channel_ids = [channel_id for channel_id in params.get("id", "").split(",") if channel_id][:50]
+            next_page_token = ""
+            payload = {
+                "kind": "youtube#channelListResponse",
+                "items": [
+                    channel_resource(corpus["channels_by_id"][channel_id], parts)
+                    for channel_id in channel_ids
+                    if channel_id in corpus["channels_by_id"]
+                ],
+            }
+        if next_page_token:
+            payload["nextPageToken"] = next_page_token
+        self.send_json(200, payload)
+
+
+class YouTubeStandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], state: YouTubeStandinState) -> None:
+        super().__init__(address, YouTubeStandinHandler)
+        self.state = state
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/youtube/v3/"
+
+
+def start_standin_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    channel_count: int = 5000,
+    seed: int = 1,
+    latency_ms: int = 0,
+    jitter_ms: int = 0,
+    quota: int = 0,
+) -> YouTubeStandinServer:
+    state = YouTubeStandinState(build_fixture_corpus(channel_count, seed), latency_ms, jitter_ms, quota)
+    server = YouTubeStandinServer((host, port), state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the YouTube Data API search, videos, channels and channelSections endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--channels", type=int, default=5000, help="number of fixture channels to generate")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=int, default=120, help="average delay added to each API response")
+    parser.add_argument("--jitter-ms", type=int, default=40)
+    parser.add_argument("--quota", type=int, default=0, help="units before returning 403 quotaExceeded (0 for no limit)")
+    args = parser.parse_args()
+
+    state = YouTubeStandinState(build_fixture_corpus(args.channels, args.seed), args.latency_ms, args.jitter_ms, args.quota)
+    server = YouTubeStandinServer((args.host, args.port), state)
+    print(f"YouTube API stand-in: {server.base_url}")
+    print(f"Set YOUTUBE_API_BASE_URL={server.base_url} to point the app at it. Usage stats: {server.base_url}stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()